@@ -11,6 +11,7 @@
 #         - wrapper safe shutdown : /usr/local/bin/rbx_safe_shutdown.sh
 #         - service app au boot   : /etc/systemd/system/rbx-app.service
 #         - service bouton GPIO3  : /etc/systemd/system/rbx-gpio3-shutdown.service
+#         - service solveur chaud : /etc/systemd/system/rbx-solver.service
 #     3) (Optionnel) Désactive l’audio onboard (dtparam=audio=off).
 #
 #  Usage :
@@ -187,9 +188,29 @@ WantedBy=multi-user.target
 EOF
   ok "Unit installée : /etc/systemd/system/rbx-gpio3-shutdown.service"
 
+  sudo tee /etc/systemd/system/rbx-solver.service >/dev/null <<EOF
+[Unit]
+Description=Rubiks Robot - Solver daemon (kociemba + twophase chauds)
+After=multi-user.target
+Before=rbx-app.service
+
+[Service]
+Type=simple
+User=root
+WorkingDirectory=${PROJECT_DIR}
+ExecStart=${VENV_PY} ${PROJECT_DIR}/solver_daemon.py
+Restart=on-failure
+RestartSec=2
+Environment=RBX_CONFIG=${PROJECT_DIR}/config.json
+
+[Install]
+WantedBy=multi-user.target
+EOF
+  ok "Unit installée : /etc/systemd/system/rbx-solver.service"
+
   # 3) Reload
   sudo systemctl daemon-reload
-  sudo systemctl reset-failed rbx-app.service rbx-gpio3-shutdown.service 2>/dev/null || true
+  sudo systemctl reset-failed rbx-app.service rbx-gpio3-shutdown.service rbx-solver.service 2>/dev/null || true
   ok "systemd: daemon-reload + reset-failed"
 
   return 0
@@ -198,6 +219,7 @@ EOF
 enable_tools_services() {
   log "Activation + démarrage des services (bouton puis app)…"
   sudo systemctl enable rbx-gpio3-shutdown.service
+  sudo systemctl enable rbx-solver.service
   sudo systemctl enable rbx-app.service
   ok "Services activés"
 
@@ -205,6 +227,7 @@ enable_tools_services() {
   echo "🧪 Validation rapide :"
   echo "  - Logs bouton : sudo journalctl -u rbx-gpio3-shutdown.service -f"
   echo "  - Logs app    : sudo journalctl -u rbx-app.service -n 50 --no-pager"
+  echo "  - Solveur     : python3 solver_daemon.py --ping"
 }
 
 # --------------------------------------------------------------------
@@ -282,6 +305,13 @@ if [ ! -x "$VENV_PY" ]; then
 fi
 log "Python pour les services : $VENV_PY"
 
+# Table de distances (solutions optimales des cubes peu mélangés), best-effort
+if [ ! -f "$PROJECT_DIR/shallow_table.bin" ]; then
+  log "Construction de la table shallow (depth 5, ~5.6 Mo)…"
+  (cd "$PROJECT_DIR" && "$VENV_PY" shallow_table.py build --depth 5) \
+    && ok "Table shallow construite" || warn "Table shallow non construite (solveur seul)"
+fi
+
 # --------------------------------------------------------------------
 # 2.1) Maj du main
 # --------------------------------------------------------------------
@@ -336,6 +366,7 @@ if [ "$INSTALL_TOOLS_MODE" = "yes" ]; then
     warn "Services installés mais NON activés."
     echo "Pour activer plus tard :"
     echo "  sudo systemctl enable --now rbx-gpio3-shutdown.service"
+    echo "  sudo systemctl enable --now rbx-solver.service"
     echo "  sudo systemctl enable --now rbx-app.service"
   fi
 else
@@ -16,6 +16,15 @@
 #         Calibration guidée par clic (Matplotlib) sur des images tmp/{F,R,B,L,U,D}.jpg,
 #         en s’appuyant sur la calibration ROI (calibration_roi.load_calibration).
 #         Sauvegarde rubiks_color_calibration.json via save_color_calibration().
+#         Chaque cellule cliquée est sondée à plusieurs marges (probe_cell_margins) :
+#         avertissement si l’échantillon dépend de la marge (bord, joint, reflet).
+#
+#     - probe_cell_margins(fi, (i,j), margins=CALIB_PROBE_MARGINS) -> dict
+#         Moyennes Lab / HSV / taux de reflets de la cellule à chaque marge, lues
+#         dans les tables intégrales de la face (FaceIntegrals) : 4 lectures par
+#         marge et par table au lieu d’un slice + cvtColor par essai.
+#     - margin_report(roi_data=None, margins=CALIB_PROBE_MARGINS) -> dict
+#         Stabilité des 54 cellules sur tmp/{F,R,B,L,U,D}.jpg (calibration_rubiks).
 #
 #     - load_color_calibration(path="rubiks_color_calibration.json")
 #     - save_color_calibration(color_calibration, filename="rubiks_color_calibration.json")
@@ -28,10 +37,18 @@
 #         Wrapper qui charge automatiquement la calibration JSON, puis appelle
 #         analyze_colors_with_calibration(...).
 #
-#     - analyze_colors_simple(cells, margin=0.25, debug=False)
+#     - analyze_colors_simple(cells, margin=0.25, debug=False, mode=None)
 #         Variante “Cubotino-like” (HSV + correctifs Lab) plus robuste aux reflets,
 #         avec détection de faces à risque et heuristiques anti-confusions.
 #
+#     - estimate_face_wb_gains(cells) / apply_face_wb_gains(warped, gains)
+#         Balance des blancs par face (stickers blancs, sinon grey-world optionnel),
+#         appliquée au warp 300×300 avant classification.
+#
+#     - estimate_vision_mode(camera_controls, frame_bgr, roi) -> (mode, stats)
+#         Choix day/night mesuré (expo x gain verrouillés + luminance 1ère face),
+#         calculé une fois par run ; fallback : nom du profil (_get_vision_mode).
+#
 #  Mesure couleur (sampling) :
 #     - sample_rgb_from_cell_bgr(cell_bgr, margin=0.25)
 #         Mesure robuste sur une ROI cellule (OpenCV BGR) :
@@ -64,6 +81,8 @@
 #     - _is_fake_red_that_should_be_orange(cell_bgr)
 #         Détecte un “faux rouge” dû à un effondrement orange (wrap hue) et corrige.
 #     - Score reflets : _specular_score_cell(...) + détection face brillante.
+#     - Paramètre optionnel fi/ij (FaceIntegrals de face_integrals.py) : les moyennes
+#       Lab / masques reflets sont lues en O(1) au lieu de slice + cvtColor + mean.
 #
 #  UI calibration (clic) :
 #     - FaceSelector : affiche les 6 faces et permet de cliquer une cellule
@@ -95,18 +114,102 @@ import numpy as np
 import cv2
 import math
 from config_manager import get_config
+from face_integrals import FaceIntegrals
+
+# Sondes multi-marges de la calibration (marge de détection = 0.25)
+CALIB_PROBE_MARGINS = (0.10, 0.18, 0.25, 0.32, 0.40)
+PROBE_LAB_SPREAD_MAX = 12.0     # écart Lab max (unités OpenCV 0..255) entre marges
+PROBE_SPEC_MAX = 0.02           # part de pixels reflet tolérée (marge de détection)
 
 # ============================================
 # CHARGEMENT DE LA CONFIGURATION
 # ============================================
 
 def _get_vision_mode() -> str:
+    """Mode déduit du NOM du profil de lock (legacy / fallback)."""
     cfg = get_config()
     profile = cfg.get("camera.lock_profile_active", "")
     profile = str(profile).lower()
     return "night" if ("soir" in profile or "night" in profile) else "day"
 
 
+def _luma_p50_from_frame(frame_bgr: np.ndarray, roi=None) -> Optional[float]:
+    """Médiane de luminance (histogramme 256 bins), restreinte au bbox de la ROI si fournie."""
+    if frame_bgr is None or getattr(frame_bgr, "size", 0) == 0:
+        return None
+
+    img = frame_bgr
+    if roi is not None:
+        h, w = img.shape[:2]
+        if is_quad_roi(roi):
+            pts = quad_to_np(roi)
+            x1, y1 = pts.min(axis=0)
+            x2, y2 = pts.max(axis=0)
+        elif is_bbox_roi(roi):
+            x1, y1, x2, y2 = roi
+        else:
+            x1, y1, x2, y2 = 0, 0, w, h
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(w, int(x2)), min(h, int(y2))
+        if x2 > x1 and y2 > y1:
+            img = img[y1:y2, x1:x2]
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    cdf = np.cumsum(hist)
+    if cdf[-1] <= 0:
+        return None
+    return float(np.searchsorted(cdf, 0.5 * cdf[-1]))
+
+
+def estimate_vision_mode(camera_controls=None, frame_bgr=None, roi=None, debug: bool = False) -> Tuple[str, dict]:
+    """
+    Choix day/night à partir de mesures (à calculer UNE fois par run, 1ère face) :
+      - ExposureTime x AnalogueGain verrouillés (scène sombre => produit élevé)
+      - médiane de luminance de la 1ère face capturée
+
+    config.json :
+      camera.vision_mode : "auto" (défaut) | "day" | "night" | "profile" (nom du profil)
+      camera.vision_auto : night_exp_gain, night_luma_p50
+
+    Retour : (mode, stats)
+    """
+    cfg = get_config()
+    forced = str(cfg.get("camera.vision_mode", "auto") or "auto").lower()
+    stats = {"source": forced}
+
+    if forced in ("day", "night"):
+        return forced, stats
+    if forced == "profile":
+        return _get_vision_mode(), stats
+
+    thr_eg = float(cfg.get("camera.vision_auto.night_exp_gain", 60000.0))
+    thr_luma = float(cfg.get("camera.vision_auto.night_luma_p50", 60.0))
+
+    exp_gain = None
+    if camera_controls:
+        try:
+            exp_gain = float(camera_controls["ExposureTime"]) * float(camera_controls["AnalogueGain"])
+        except (KeyError, TypeError, ValueError):
+            exp_gain = None
+
+    luma_p50 = _luma_p50_from_frame(frame_bgr, roi=roi)
+
+    stats.update({"exp_gain": exp_gain, "luma_p50": luma_p50,
+                  "thr_exp_gain": thr_eg, "thr_luma_p50": thr_luma})
+
+    if exp_gain is None and luma_p50 is None:
+        stats["source"] = "profile"
+        mode = _get_vision_mode()
+    else:
+        dark = (exp_gain is not None and exp_gain >= thr_eg) or (luma_p50 is not None and luma_p50 < thr_luma)
+        mode = "night" if dark else "day"
+
+    if debug:
+        print(f"[VISION] mode={mode} stats={stats}")
+    return mode, stats
+
+
 def _hue_deg_from_rgb(r: float, g: float, b: float) -> float:
     """Hue en degrés [0..360). OpenCV: H en [0..179]."""
     px = np.uint8([[[int(b), int(g), int(r)]]])  # BGR pour OpenCV
@@ -684,9 +787,17 @@ def calibrate_colors_interactive(default_tolerance: float = None) -> Optional[Di
         warped, cells = process_face_with_roi(file_path, roi_data[face], face, show=False, save_intermediates=False)
         if warped is None or not cells or cell_idx >= len(cells):
             print(f"Échec extraction cellules pour {face}"); continue
-        (_ij, roi) = cells[cell_idx]
+        (ij, roi) = cells[cell_idx]
         r,g,b = _avg_center_rgb(roi)
 
+        # Sondes multi-marges (tables intégrales de la face) : échantillon stable ?
+        probe = probe_cell_margins(FaceIntegrals(warped), ij)
+        print(f"Sondes marges {probe['margins']}: ΔLab={probe['lab_spread']:.1f} "
+              f"S={probe['hsv'][:, 1].round(0).tolist()} reflets={probe['spec'][probe['ref']]:.1%}")
+        if not probe["stable"]:
+            print(f"⚠️ Cellule {face}{cell_idx+1} instable (bord, joint ou reflet) : "
+                  "une autre cellule de cette couleur donnera une référence plus fiable")
+
         # 🔹 Nouvelle logique de tolérance
         if default_tolerance is not None:
             tol = float(default_tolerance)
@@ -707,6 +818,66 @@ def calibrate_colors_interactive(default_tolerance: float = None) -> Optional[Di
         print(f"Couleurs calibrées: {list(calib.keys())}")
     return calib if calib else None
 
+# ---------------------------
+# Sondes multi-marges (tables intégrales)
+# ---------------------------
+
+def probe_cell_margins(fi: FaceIntegrals, ij: Tuple[int, int],
+                       margins=CALIB_PROBE_MARGINS, ref_margin: float = 0.25) -> dict:
+    """
+    Moyennes Lab / HSV / reflets d’une cellule pour plusieurs marges internes.
+    - lab_spread : écart max (distance Lab) entre deux marges
+    - stable     : échantillon indépendant de la marge et peu de reflets à ref_margin
+    """
+    margins = tuple(float(m) for m in margins)
+    if ref_margin not in margins:
+        margins = tuple(sorted(margins + (float(ref_margin),)))
+    lab = fi.cell_mean_multi("lab", ij, margins)
+    hsv = fi.cell_mean_multi("hsv", ij, margins)
+    spec = fi.cell_mean_multi("spec", ij, margins)
+    diff = lab[:, None, :] - lab[None, :, :]
+    spread = float(np.sqrt((diff ** 2).sum(axis=2)).max())
+    ref = margins.index(ref_margin)
+    return {
+        "margins": margins, "ref": ref,
+        "lab": lab, "hsv": hsv, "spec": spec,
+        "lab_spread": spread,
+        "stable": spread <= PROBE_LAB_SPREAD_MAX and float(spec[ref]) <= PROBE_SPEC_MAX,
+    }
+
+
+def margin_report(roi_data=None, margins=CALIB_PROBE_MARGINS, faces="URFDLB") -> dict:
+    """
+    Stabilité des cellules de tmp/{face}.jpg (1 FaceIntegrals par face, 9 sondes).
+    Retourne {face: [(index 1..9, lab_spread, spec, stable), ...]} et affiche les cellules instables.
+    """
+    if roi_data is None:
+        from calibration_roi import load_calibration  # import tardif pour éviter cycles
+        roi_data = load_calibration()
+        if roi_data is None:
+            print("Aucune calibration ROI trouvée. Calibrez d'abord les positions.")
+            return {}
+    from process_images_cube import process_face_with_roi  # import tardif
+
+    report = {}
+    for face in faces:
+        path = f"tmp/{face}.jpg"
+        if face not in roi_data or not os.path.exists(path):
+            continue
+        warped, cells = process_face_with_roi(path, roi_data[face], face, show=False, save_intermediates=False)
+        if warped is None or not cells:
+            print(f"Échec extraction cellules pour {face}")
+            continue
+        fi = FaceIntegrals(warped)
+        rows = []
+        for k, (ij, _cell) in enumerate(cells):
+            p = probe_cell_margins(fi, ij, margins)
+            rows.append((k + 1, round(p["lab_spread"], 1), round(float(p["spec"][p["ref"]]), 4), p["stable"]))
+        report[face] = rows
+        bad = [f"{k}(ΔLab={d}, reflets={sp:.1%})" for k, d, sp, ok in rows if not ok]
+        print(f"Face {face}: " + ("OK" if not bad else "instables " + ", ".join(bad)))
+    return report
+
 # ============================================================================
 # Cubotino-like
 # ============================================================================
@@ -793,11 +964,14 @@ def fix_center_by_majority(colors):
     return colors
     
 
-def _specular_score_cell(cell_bgr: np.ndarray, margin: float = 0.25) -> float:
+def _specular_score_cell(cell_bgr: np.ndarray, margin: float = 0.25, fi=None, ij=None) -> float:
     """
     Retourne un score [0..1] = proportion de pixels "specular" (reflets blancs)
     dans la zone interne de la cellule.
     """
+    if fi is not None and ij is not None:
+        return fi.cell_mean("spec", ij, margin)
+
     if cell_bgr is None or cell_bgr.size == 0:
         return 0.0
 
@@ -831,7 +1005,10 @@ def detect_shiny_face(cells, margin: float = 0.25, debug: bool = False) -> bool:
         print(f"[SIMPLE] shiny_score(avg)={avg:.4f} => shiny_mode={shiny}")
     return shiny
 
-def _lab_ab_from_cell(cell_bgr: np.ndarray, margin: float = 0.25):
+def _lab_ab_from_cell(cell_bgr: np.ndarray, margin: float = 0.25, fi=None, ij=None):
+    if fi is not None and ij is not None:
+        L, a, b = fi.cell_mean("lab", ij, margin)
+        return float(L), float(a), float(b)
     h, w = cell_bgr.shape[:2]
     mh, mw = int(h * margin), int(w * margin)
     inner = cell_bgr[mh:h-mh, mw:w-mw]
@@ -860,7 +1037,7 @@ def _hsv_from_rgb(r: float, g: float, b: float):
 # -----------------------------
 # Helper: faux rouge (orange collapse)
 # -----------------------------
-def _is_fake_red_that_should_be_orange(cell_bgr: np.ndarray, margin: float = 0.25) -> bool:
+def _is_fake_red_that_should_be_orange(cell_bgr: np.ndarray, margin: float = 0.25, fi=None, ij=None) -> bool:
     r, g, b = sample_rgb_from_cell_bgr(cell_bgr, margin=margin)
     h_deg, s, v = _hsv_from_rgb(r, g, b)
 
@@ -869,17 +1046,133 @@ def _is_fake_red_that_should_be_orange(cell_bgr: np.ndarray, margin: float = 0.2
         return False
 
     # Orange qui s'effondre vers 0° => Lab(b-a) moins négatif que le vrai rouge
-    _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin)
+    _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin, fi=fi, ij=ij)
     score = b_lab - a_lab  # plus haut => plus jaune/orange
 
     # Très conservateur : si c'est encore très négatif => vrai rouge
     return score >= -8.0
 
 
+# -----------------------------
+# 0) Balance des blancs par face (après warp, avant classification)
+# -----------------------------
+def cell_medians_bgr(cells, margin: float = 0.25) -> np.ndarray:
+    """
+    Médianes BGR des 9 cellules en un seul calcul vectorisé (9,3) float32.
+    Même rejet specular que sample_rgb_from_cell_bgr (V>240 & S<90).
+    """
+    crops = []
+    for (_, _), cell in cells:
+        h, w = cell.shape[:2]
+        mh, mw = int(h * margin), int(w * margin)
+        inner = cell[mh:h-mh, mw:w-mw]
+        crops.append((inner if inner.size else cell).reshape(-1, 3))
+
+    n = min(c.shape[0] for c in crops)
+    px = np.stack([c[:n] for c in crops])                 # (9, N, 3) uint8
+    hsv = cv2.cvtColor(px, cv2.COLOR_BGR2HSV)
+    spec = (hsv[..., 2] > 240) & (hsv[..., 1] < 90)       # (9, N)
+
+    arr = px.astype(np.float32)
+    plain = np.median(arr, axis=1)
+    arr[spec] = np.nan
+    with np.errstate(all="ignore"):
+        med = np.nanmedian(arr, axis=1)
+    few = (~spec).sum(axis=1) <= 20
+    med[few] = plain[few]
+    return med
+
+
+def estimate_face_wb_gains(cells, margin: float = 0.25, mode: Optional[str] = None, debug: bool = False):
+    """
+    Gains BGR par face (diagonale) :
+      - "white"         : stickers blancs identifiés (S bas, V haut) -> ramenés au gris
+      - "white_or_grey" : idem, sinon grey-world atténué sur les 9 cellules
+      - "off"           : pas de correction (défaut)
+
+    Les références de classification (centres Lab, calibration RGB) sont capturées
+    sur des images NON corrigées : n’activer la correction qu’en recalibrant sur
+    des faces corrigées, sinon cellules et références ne sont plus comparables.
+
+    config.json : detection.white_balance.{mode, white_s_max, white_v_min,
+                  max_gain, grey_strength}
+    Retour : (gains np.ndarray(3,) | None, source)
+    """
+    cfg = get_config()
+    if mode is None:
+        mode = str(cfg.get("detection.white_balance.mode", "off") or "off").lower()
+    if mode == "off" or not cells:
+        return None, "off"
+
+    s_max = float(cfg.get("detection.white_balance.white_s_max", 60))
+    v_min = float(cfg.get("detection.white_balance.white_v_min", 90))
+    g_max = float(cfg.get("detection.white_balance.max_gain", 1.35))
+    grey_strength = float(cfg.get("detection.white_balance.grey_strength", 0.5))
+
+    med = cell_medians_bgr(cells, margin=margin)
+    hsv = cv2.cvtColor(np.clip(med, 0, 255).astype(np.uint8)[None, ...], cv2.COLOR_BGR2HSV)[0]
+    white = (hsv[:, 1] < s_max) & (hsv[:, 2] > v_min)
+
+    if white.any():
+        ref = med[white].mean(axis=0)
+        source, strength = f"white x{int(white.sum())}", 1.0
+    elif mode == "white_or_grey":
+        ref = med.mean(axis=0)
+        source, strength = "grey", grey_strength
+    else:
+        return None, "none"
+
+    ref = np.maximum(ref, 1.0)
+    gains = (ref.mean() / ref) ** strength
+    gains = np.clip(gains, 1.0 / g_max, g_max).astype(np.float32)
+
+    if debug:
+        print(f"[WB] source={source} gains(BGR)={np.round(gains, 3).tolist()}")
+
+    if float(np.abs(gains - 1.0).max()) < 0.02:
+        return None, source
+    return gains, source
+
+
+def apply_face_wb_gains(face_bgr: np.ndarray, gains) -> np.ndarray:
+    """Applique les gains BGR via 1 LUT (cv2.LUT), EN PLACE : les cellules (vues) suivent."""
+    lut = np.clip(np.arange(256, dtype=np.float32)[:, None] * np.asarray(gains, np.float32)[None, :], 0, 255)
+    lut = lut.round().astype(np.uint8).reshape(256, 1, 3)
+    cv2.LUT(face_bgr, lut, dst=face_bgr)
+    return face_bgr
+
+
+def color_confidences(med_bgr: np.ndarray, labels: List[str]) -> Optional[List[float]]:
+    """
+    Confiance 0..1 par cellule (marge vs calibration RGB) :
+      conf = 1 - d(label) / d(meilleure autre couleur calibrée), bornée à [0,1].
+    None si pas de calibration couleur.
+    """
+    calib = _get_color_calib_cached()
+    if not calib:
+        return None
+
+    names = list(calib.keys())
+    ref = np.array([[calib[n][0], calib[n][1], calib[n][2]] for n in names], dtype=np.float32)  # RGB
+    rgb = np.asarray(med_bgr, dtype=np.float32)[:, ::-1]
+    d = np.linalg.norm(rgb[:, None, :] - ref[None, :, :], axis=2)                             # (9, K)
+
+    out = []
+    for k, lab in enumerate(labels):
+        if lab not in names:
+            out.append(0.0)
+            continue
+        li = names.index(lab)
+        d_lab = float(d[k, li])
+        d_alt = float(np.delete(d[k], li).min()) if len(names) > 1 else d_lab + 1.0
+        out.append(float(np.clip(1.0 - d_lab / max(d_alt, 1e-6), 0.0, 1.0)))
+    return out
+
+
 # -----------------------------
 # 1) Detect risky face (shiny fallback)
 # -----------------------------
-def detect_risky_face(cells, margin: float = 0.25, debug: bool = False) -> bool:
+def detect_risky_face(cells, margin: float = 0.25, debug: bool = False, fi=None) -> bool:
     """
     Active le mode "shiny" seulement si:
     - assez de cellules dans bandes à risque (rouge wrap / zone orange-jaune),
@@ -888,7 +1181,7 @@ def detect_risky_face(cells, margin: float = 0.25, debug: bool = False) -> bool:
     risky = 0
     shiny_scores = []
 
-    for (_, _), cell in cells:
+    for ij, cell in cells:
         r, g, b = sample_rgb_from_cell_bgr(cell, margin=margin)
         h_deg, s, v = _hsv_from_rgb(r, g, b)
 
@@ -899,6 +1192,9 @@ def detect_risky_face(cells, margin: float = 0.25, debug: bool = False) -> bool:
             risky += 1
 
         # specular : pixels très clairs ET peu saturés (reflets)
+        if fi is not None:
+            shiny_scores.append(fi.cell_mean("shiny", ij, margin))
+            continue
         hh, ww = cell.shape[:2]
         mh, mw = int(hh * margin), int(ww * margin)
         inner = cell[mh:hh-mh, mw:ww-mw]
@@ -926,10 +1222,11 @@ def detect_risky_face(cells, margin: float = 0.25, debug: bool = False) -> bool:
 # -----------------------------
 # 2) Classify (Cubotino-like, simple)
 # -----------------------------
-def classify_color_cubotino_like(cell_bgr, mode: str, margin=0.25, debug=False, shiny=False, yo_centers=None) -> str:
+def classify_color_cubotino_like(cell_bgr, mode: str, margin=0.25, debug=False, shiny=False, yo_centers=None,
+                                 fi=None, ij=None) -> str:
     if mode == "night":
-        return classify_color_cubotino_like_night(cell_bgr, margin, debug, shiny, yo_centers)
-    return classify_color_cubotino_like_day(cell_bgr, margin, debug, shiny, yo_centers)
+        return classify_color_cubotino_like_night(cell_bgr, margin, debug, shiny, yo_centers, fi=fi, ij=ij)
+    return classify_color_cubotino_like_day(cell_bgr, margin, debug, shiny, yo_centers, fi=fi, ij=ij)
 
 # -----------------------------
 # 3) Analyze face (centre-fix + face-fix ultra conservateur)
@@ -945,11 +1242,17 @@ def _get_calib_rgb(color_name: str):
     r, g, b, _ = calib[color_name]
     return (r, g, b)
 
-def analyze_colors_simple(cells, margin: float = 0.25, debug: bool = False):
-    shiny = detect_risky_face(cells, margin=margin, debug=debug)
+def analyze_colors_simple(cells, margin: float = 0.25, debug: bool = False, mode: Optional[str] = None,
+                          fi=None):
+    """
+    mode : "day"/"night" calculé une fois par run (estimate_vision_mode) ; None -> profil.
+    fi   : FaceIntegrals de la face (moyennes Lab / masques reflets en O(1)), optionnel.
+    """
+    shiny = detect_risky_face(cells, margin=margin, debug=debug, fi=fi)
     yo_centers = _get_yo_lab_centers_cached()
 
-    mode = _get_vision_mode()
+    if mode is None:
+        mode = _get_vision_mode()
     if debug:
         print(f"[SIMPLE] mode={mode}")
 
@@ -961,7 +1264,9 @@ def analyze_colors_simple(cells, margin: float = 0.25, debug: bool = False):
             margin=margin,
             debug=debug,
             shiny=shiny,
-            yo_centers=yo_centers
+            yo_centers=yo_centers,
+            fi=fi,
+            ij=(i, j)
         ))
 
     raw2 = raw[:]  # copie
@@ -1002,7 +1307,7 @@ def analyze_colors_simple(cells, margin: float = 0.25, debug: bool = False):
     if (cnt["yellow"] + cnt["orange"]) >= 7 and 1 <= cnt["red"] <= 2:
         fixed = []
         for k, (((i, j), cell), col) in enumerate(zip(cells, raw2)):
-            if col == "red" and _is_fake_red_that_should_be_orange(cell, margin=margin):
+            if col == "red" and _is_fake_red_that_should_be_orange(cell, margin=margin, fi=fi, ij=(i, j)):
                 fixed.append("orange")
                 if debug:
                     print(f"[SIMPLE] FACE-FIX: red->orange on cell {k+1} (fake red)")
@@ -1022,6 +1327,8 @@ def classify_color_cubotino_like_night(
     debug: bool = False,
     shiny: bool = False,
     yo_centers=None,
+    fi=None,
+    ij=None,
 ) -> str:
     r, g, b = sample_rgb_from_cell_bgr(cell_bgr, margin=margin)
     h_deg, s, v = _hsv_from_rgb(r, g, b)
@@ -1052,7 +1359,7 @@ def classify_color_cubotino_like_night(
         if not shiny:
             return "red"
 
-        _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin)
+        _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin, fi=fi, ij=ij)
         score = b_lab - a_lab
         if debug:
             print(f"[SIMPLE] red-zone shiny h={h_deg:.1f} Lab(a)={a_lab:.1f} Lab(b)={b_lab:.1f} (b-a)={score:.1f}")
@@ -1095,6 +1402,8 @@ def classify_color_cubotino_like_day(
     debug: bool = False,
     shiny: bool = False,
     yo_centers=None,   # <-- NOUVEAU
+    fi=None,
+    ij=None,
 ) -> str:
     r, g, b = sample_rgb_from_cell_bgr(cell_bgr, margin=margin)
     h_deg, s, v = _hsv_from_rgb(r, g, b)
@@ -1116,7 +1425,7 @@ def classify_color_cubotino_like_day(
         if not shiny:
             return "red"
 
-        _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin)
+        _, a_lab, b_lab = _lab_ab_from_cell(cell_bgr, margin=margin, fi=fi, ij=ij)
         score = b_lab - a_lab
         if debug:
             print(f"[SIMPLE] red-zone shiny h={h_deg:.1f} Lab(a)={a_lab:.1f} Lab(b)={b_lab:.1f} (b-a)={score:.1f}")
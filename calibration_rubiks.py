@@ -20,7 +20,8 @@
 #           2) lancer la calibration Couleurs,
 #           3) afficher statistiques,
 #           4) afficher contenu complet des calibrations (dump JSON),
-#           5) quitter.
+#           5) vérifier la stabilité des cellules (sondes multi-marges),
+#           6) quitter.
 #
 #     - get_calibration_stats() -> dict | None
 #         Retourne un résumé “prêt à afficher” :
@@ -41,6 +42,7 @@
 #     - calibration_colors.py :
 #         * load_color_calibration()
 #         * calibrate_colors_interactive()
+#         * margin_report()  (sondes Lab/HSV/reflets multi-marges, FaceIntegrals)
 #
 #  Fichiers de calibration manipulés :
 #     - rubiks_calibration.json        (ROI : bbox ou quad pour F,R,B,L,U,D)
@@ -70,6 +72,7 @@ from calibration_roi import (
 from calibration_colors import (
     load_color_calibration,
     calibrate_colors_interactive,
+    margin_report,
 )
 
 __all__ = [
@@ -79,6 +82,7 @@ __all__ = [
     "load_color_calibration",
     "save_color_calibration",
     "calibrate_colors_interactive",
+    "margin_report",
     "get_calibration_stats",
     "calibration_mode",
 ]
@@ -194,8 +198,9 @@ def calibration_mode():
         print("2. Calibration couleurs (RGB/HSV)")
         print("3. Afficher statistiques")
         print("4. Afficher le contenu complet des calibrations")
-        print("5. Quitter")
-        choice = input("Choisissez une option (1/2/3/4/5) : ").strip()
+        print("5. Vérifier la stabilité des cellules (marges)")
+        print("6. Quitter")
+        choice = input("Choisissez une option (1/2/3/4/5/6) : ").strip()
 
         if choice == "1":
             try:
@@ -223,6 +228,11 @@ def calibration_mode():
                     print(f"Calibration couleurs : {col['count']} couleurs → {', '.join(col['labels'])}")
         elif choice == "4":
             show_full_calibration()
+        elif choice == "5":
+            try:
+                margin_report()
+            except Exception as e:
+                print(f"Erreur vérification des marges : {e}")
         else:
             print("Fin du mode calibration.")
             break
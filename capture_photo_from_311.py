@@ -79,6 +79,7 @@ class CameraInterface2:
         self._locked = False
         self._locked_controls = None  # debug
         self._scan_leds_on = False
+        self.last_frame = None  # dernière frame BGR uint8 (archive brute, cf. frame_archive.py)
 
     def lock_for_scan_multiface_cfg(self, flip_cb, profile_name=None, debug=False):
         cfg = get_config()
@@ -555,6 +556,7 @@ class CameraInterface2:
                 elif rotation == 270:
                     frame_bgr = cv2.rotate(frame_bgr, cv2.ROTATE_90_COUNTERCLOCKWISE)
 
+                self.last_frame = frame_bgr
                 cv2.imwrite(filename, frame_bgr)
                 time.sleep(0.3)
 
@@ -585,6 +587,7 @@ class CameraInterface2:
                 elif rotation == 270:
                     frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
 
+                self.last_frame = frame
                 cv2.imwrite(filename, frame)
                 print(f"✅ Image enregistrée : {filename}")
                 return filename
@@ -154,11 +154,23 @@ def main():
     project_files = [
         ("robot_moves_cubotino.py", "Module des mouvements robot"),
         ("Cubotino_T_moves.py", "Module des mouvements robot"),
+        ("move_seq.py", "Représentation compacte des mouvements (MoveSeq)"),
+        ("robot_move_compiler.py", "Compilateur mouvements robot (réentrant)"),
+        ("robot_move_planner.py", "Planificateur mouvements robot (temps servo)"),
+        ("robot_move_peephole.py", "Optimiseur peephole mouvements robot"),
+        ("servo_timing.py", "Modèle de temps servo (coûts, ETA)"),
+        ("servo_motion.py", "Rampes servo minutées matériel (onde pigpio)"),
+        ("servo_profiles.py", "Profils de mouvement servo + réglage"),
+        ("servo_timeline.py", "Exécuteur servo sur ligne de temps"),
+        ("robot_move_sim.py", "Simulateur virtuel des plans robot"),
+        ("robot_plan_cache.py", "Cache des plans robot compilés"),
         ("robot_solver.py", "Module solveur robot"),
         ("calibration_rubiks.py", "Module de calibration"),
         ("process_images_cube.py", "Module de traitement d'images"),
         ("processing_rubiks.py", "Module de processing"),
         ("solver_wrapper.py", "Wrapper du solveur"),
+        ("solver_daemon.py", "Daemon solveur (solveurs chauds)"),
+        ("solver_async.py", "Résolution asynchrone annulable"),
         ("calibration_roi.py", "Calibration ROI"),
     ]
     
@@ -42,7 +42,7 @@
 #  Structure DEFAULT_CONFIG (exemples) :
 #     - leds : enabled, pin, count, brightness, color_temp
 #     - camera : resolution, rotation
-#     - servos : enabled, cube_holder, top_cover (pins + pulses)
+#     - servos : enabled, cube_holder, top_cover (pins + pulses), motion (rampes), profiles (trapèze / S-curve)
 #     - detection : yolo_model, confidence_threshold
 #     - paths : tmp_dir, models_dir, output_dir
 #
@@ -83,6 +83,13 @@ DEFAULT_CONFIG = {
             "pin": 13,
             "min_pulse": 500,
             "max_pulse": 2500
+        },
+        "motion": {
+            "backend": "wave",
+            "frame_us": 20000
+        },
+        "profiles": {
+            "enabled": False
         }
     },
     "detection": {
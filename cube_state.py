@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  cube_state.py
+#  -------------
+#  Objectif :
+#     Représentation **compacte** d’un état de cube : 54 octets (bytearray),
+#     ordre facelets Kociemba URFDLB (U1..U9, R1..R9, F, D, L, B), et tables de
+#     **permutations à 54 index précalculées** :
+#       - rotations de grille d’une face (0/90/180/270°, profils robot),
+#       - profils robot complets ("robot_raw", "robot_cam", "phone_demo"),
+#       - yaw legacy de reorient_cube_for_kociemba (0/90/180/270),
+#       - quarts de tour de faces (U, U', U2, R, ... B2),
+#       - rotations du cube entier (x, y, z, ...) et les 24 orientations,
+#       - les 48 symétries (rotations + réflexions) avec leur map de faces.
+#
+#     Une correction d’orientation + encodage devient UN gather (permuted) suivi
+#     d’un bytes.translate (relabel couleur -> lettre).
+#
+#  Entrées principales :
+#     - CubeState.from_string(s) / CubeState.from_faces(face_results)
+#     - state.permuted(perm) / state.apply(perm)     : gather 54 index
+#     - state.encode_by_centers() -> str             : couleurs -> URFDLB via centres
+#     - compose(p, q) / invert(p)                    : algèbre des permutations
+#     - conversion_perm(mode, yaw)                   : profil robot ∘ yaw (mis en cache)
+#     - MOVE_PERMS, ROTATION_PERMS, ORIENTATIONS, PROFILE_PERMS, YAW_PERMS, SYMMETRIES
+#
+#  Conventions :
+#     - perm = tuple de 54 index ; état' [i] = état[perm[i]] (gather).
+#     - compose(p, q) = appliquer p PUIS q.
+#     - Géométrie : x -> R, y -> U, z -> F ; chaque facelet = (position cubie, normale).
+#
+#  Dépendances :
+#     - Aucune (pur Python). numpy optionnel via as_numpy().
+# ============================================================================
+
+from __future__ import annotations
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+Perm = Tuple[int, ...]
+
+FACES = "URFDLB"
+FACE_BASE = {f: 9 * i for i, f in enumerate(FACES)}
+CENTER_IDX = tuple(9 * i + 4 for i in range(6))
+
+SOLVED = "".join(f * 9 for f in FACES)
+
+# Codes 1 octet pour les couleurs de la vision ('?' = inconnu)
+COLOR_CODES: Dict[str, int] = {
+    "white": ord("W"), "yellow": ord("Y"), "red": ord("R"),
+    "orange": ord("O"), "green": ord("G"), "blue": ord("B"),
+}
+UNKNOWN_CODE = ord("?")
+
+# Rotations de grille 3×3 (row-major, horaire) : nouvelle position -> ancienne
+GRID_ROT_IDX = {
+    0:   (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    90:  (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    180: (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    270: (2, 5, 8, 1, 4, 7, 0, 3, 6),
+}
+
+# Rotations par face selon le profil robot (source unique, utilisée par processing_rubiks)
+ROBOT_ORIENTATION_TABLES = {
+    "robot_raw": {"F": 0, "R": 0, "B": 0,   "L": 0,   "U": 0, "D": 0},
+    "robot_cam": {"F": 180, "R": 180, "B": 0, "L": 0, "U": 180, "D": 180},
+    "phone_demo": {"F": 0, "R": 90, "B": 180, "L": 270, "U": 0, "D": 0},
+}
+
+# Yaw legacy (reorient_cube_for_kociemba) : face source -> face destination
+YAW_FACE_MAPS = {
+    0:   {"F": "F", "R": "R", "B": "B", "L": "L", "U": "U", "D": "D"},
+    90:  {"F": "R", "R": "B", "B": "L", "L": "F", "U": "U", "D": "D"},
+    180: {"F": "B", "R": "L", "B": "F", "L": "R", "U": "U", "D": "D"},
+    270: {"F": "L", "R": "F", "B": "R", "L": "B", "U": "U", "D": "D"},
+}
+
+IDENTITY: Perm = tuple(range(54))
+
+
+# ---------------------------------------------------------------------------
+# Algèbre des permutations
+# ---------------------------------------------------------------------------
+def compose(p: Sequence[int], q: Sequence[int]) -> Perm:
+    """Appliquer p puis q : (s.p).q -> gather combiné."""
+    return tuple(p[i] for i in q)
+
+
+def compose_all(perms: Iterable[Sequence[int]]) -> Perm:
+    out: Perm = IDENTITY
+    for p in perms:
+        out = compose(out, p)
+    return out
+
+
+def invert(p: Sequence[int]) -> Perm:
+    inv = [0] * len(p)
+    for i, j in enumerate(p):
+        inv[j] = i
+    return tuple(inv)
+
+
+@lru_cache(maxsize=4096)
+def _getter(perm: Perm):
+    return itemgetter(*perm)
+
+
+# ---------------------------------------------------------------------------
+# Géométrie des facelets (position cubie + normale)
+# ---------------------------------------------------------------------------
+_NORMALS = {"U": (0, 1, 0), "R": (1, 0, 0), "F": (0, 0, 1),
+            "D": (0, -1, 0), "L": (-1, 0, 0), "B": (0, 0, -1)}
+
+
+def _facelet_pos(face: str, r: int, c: int) -> Tuple[int, int, int]:
+    """Position du cubie portant le facelet (r,c) de la face (vue de l’extérieur)."""
+    if face == "U":
+        return (c - 1, 1, r - 1)
+    if face == "R":
+        return (1, 1 - r, 1 - c)
+    if face == "F":
+        return (c - 1, 1 - r, 1)
+    if face == "D":
+        return (c - 1, -1, 1 - r)
+    if face == "L":
+        return (-1, 1 - r, c - 1)
+    return (1 - c, 1 - r, -1)  # B
+
+
+def _build_geometry():
+    keys = []
+    for f in FACES:
+        for k in range(9):
+            r, c = divmod(k, 3)
+            keys.append((_facelet_pos(f, r, c), _NORMALS[f]))
+    return keys, {key: i for i, key in enumerate(keys)}
+
+
+_FACELET_KEYS, _FACELET_INDEX = _build_geometry()
+
+
+def _cw(axis, v):
+    """Quart de tour horaire (vu depuis +axis) : v' = a(a.v) - a×v."""
+    ax, ay, az = axis
+    vx, vy, vz = v
+    d = ax * vx + ay * vy + az * vz
+    cx, cy, cz = ay * vz - az * vy, az * vx - ax * vz, ax * vy - ay * vx
+    return (ax * d - cx, ay * d - cy, az * d - cz)
+
+
+def _turn_perm(axis, layer_filter) -> Perm:
+    """Permutation (gather) d’un quart de tour des facelets sélectionnés."""
+    perm = list(IDENTITY)
+    for i, (pos, nrm) in enumerate(_FACELET_KEYS):
+        if layer_filter(pos):
+            j = _FACELET_INDEX[(_cw(axis, pos), _cw(axis, nrm))]
+            perm[j] = i
+    return tuple(perm)
+
+
+def _powers(p: Perm) -> Tuple[Perm, Perm, Perm]:
+    p2 = compose(p, p)
+    return p, p2, compose(p2, p)
+
+
+def _build_moves() -> Dict[str, Perm]:
+    moves = {}
+    for f in FACES:
+        n = _NORMALS[f]
+        q = _turn_perm(n, lambda pos, n=n: pos[0] * n[0] + pos[1] * n[1] + pos[2] * n[2] == 1)
+        p1, p2, p3 = _powers(q)
+        moves[f], moves[f + "2"], moves[f + "'"] = p1, p2, p3
+    return moves
+
+
+def _build_rotations() -> Dict[str, Perm]:
+    rots = {}
+    for name, axis in (("x", _NORMALS["R"]), ("y", _NORMALS["U"]), ("z", _NORMALS["F"])):
+        q = _turn_perm(axis, lambda pos: True)
+        p1, p2, p3 = _powers(q)
+        rots[name], rots[name + "2"], rots[name + "'"] = p1, p2, p3
+    return rots
+
+
+MOVE_PERMS: Dict[str, Perm] = _build_moves()
+ROTATION_PERMS: Dict[str, Perm] = _build_rotations()
+
+
+def _build_orientations() -> List[Tuple[str, Perm]]:
+    """Les 24 orientations du cube entier (BFS sur x, y, z), avec un nom court."""
+    seen = {IDENTITY: ""}
+    order = [IDENTITY]
+    k = 0
+    while k < len(order):
+        cur = order[k]
+        k += 1
+        for name in ("y", "x", "z"):
+            nxt = compose(cur, ROTATION_PERMS[name])
+            if nxt not in seen:
+                seen[nxt] = (seen[cur] + " " + name).strip()
+                order.append(nxt)
+    return [(_short_name(seen[p]), p) for p in order]
+
+
+def _short_name(seq: str) -> str:
+    """"y y x" -> "y2 x" ; "y y y" -> "y'"."""
+    out: List[str] = []
+    for tok in seq.split():
+        if out and out[-1][0] == tok:
+            n = {"": 2, "2": 3}.get(out[-1][1:], 4)
+            out[-1] = tok + {2: "2", 3: "'"}.get(n, "")
+            if n == 4:
+                out.pop()
+        else:
+            out.append(tok)
+    return " ".join(out)
+
+
+ORIENTATIONS: List[Tuple[str, Perm]] = _build_orientations()
+
+
+# ---------------------------------------------------------------------------
+# Symétries du cube (24 rotations + 24 réflexions)
+# ---------------------------------------------------------------------------
+class Symmetry(NamedTuple):
+    name: str                   # "" (identité), "y", "x y2", "m", "m y"...  (m = miroir L<->R)
+    perm: Perm                  # gather 54 index (comme ROTATION_PERMS)
+    face_map: Dict[str, str]    # face -> face image (recoloriage des centres)
+    mirror: bool                # réflexion : sens des quarts de tour inversé
+
+
+def _mat_apply(m, v):
+    return tuple(sum(m[r][k] * v[k] for k in range(3)) for r in range(3))
+
+
+def _linear_perm(m) -> Perm:
+    perm = list(IDENTITY)
+    for i, (pos, nrm) in enumerate(_FACELET_KEYS):
+        perm[_FACELET_INDEX[(_mat_apply(m, pos), _mat_apply(m, nrm))]] = i
+    return tuple(perm)
+
+
+def _build_symmetries() -> List[Symmetry]:
+    """Les 48 matrices de permutation signées 3×3 -> (perm facelets, map faces)."""
+    from itertools import permutations, product
+
+    face_of = {n: f for f, n in _NORMALS.items()}
+    rot_names = {p: n for n, p in ORIENTATIONS}
+    mirror_perm = _linear_perm(((-1, 0, 0), (0, 1, 0), (0, 0, 1)))
+
+    rots, mirrors = {}, {}
+    for cols in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            m = tuple(tuple(signs[r] if cols[r] == k else 0 for k in range(3)) for r in range(3))
+            perm = _linear_perm(m)
+            fmap = {f: face_of[_mat_apply(m, n)] for f, n in _NORMALS.items()}
+            if perm in rot_names:
+                rots[perm] = Symmetry(rot_names[perm], perm, fmap, False)
+            else:
+                # réflexion = miroir L<->R puis une rotation
+                r = compose(invert(mirror_perm), perm)
+                name = ("m " + rot_names[r]).strip()
+                mirrors[perm] = Symmetry(name, perm, fmap, True)
+
+    ordered = [rots[p] for _, p in ORIENTATIONS]
+    ordered += [mirrors[compose(mirror_perm, p)] for _, p in ORIENTATIONS]
+    return ordered
+
+
+SYMMETRIES: List[Symmetry] = _build_symmetries()
+
+
+# ---------------------------------------------------------------------------
+# Profils robot / yaw legacy
+# ---------------------------------------------------------------------------
+def face_rotation_perm(face: str, angle: int) -> Perm:
+    """Rotation de la grille d’UNE face (comme rotate_face_grid), autres facelets fixes."""
+    idx = GRID_ROT_IDX[angle % 360]
+    base = FACE_BASE[face]
+    perm = list(IDENTITY)
+    for k in range(9):
+        perm[base + k] = base + idx[k]
+    return tuple(perm)
+
+
+FACE_ROTATION_PERMS: Dict[Tuple[str, int], Perm] = {
+    (f, a): face_rotation_perm(f, a) for f in FACES for a in GRID_ROT_IDX
+}
+
+
+def profile_perm(rotations: Mapping[str, int]) -> Perm:
+    """Profil = rotations par face (dict face -> angle) en une seule permutation."""
+    perm = list(IDENTITY)
+    for f in FACES:
+        idx = GRID_ROT_IDX[rotations.get(f, 0) % 360]
+        base = FACE_BASE[f]
+        for k in range(9):
+            perm[base + k] = base + idx[k]
+    return tuple(perm)
+
+
+PROFILE_PERMS: Dict[str, Perm] = {name: profile_perm(t) for name, t in ROBOT_ORIENTATION_TABLES.items()}
+
+
+def _yaw_perm(m: Mapping[str, str]) -> Perm:
+    perm = list(IDENTITY)
+    for src, dst in m.items():
+        for k in range(9):
+            perm[FACE_BASE[dst] + k] = FACE_BASE[src] + k
+    return tuple(perm)
+
+
+YAW_PERMS: Dict[int, Perm] = {yaw: _yaw_perm(m) for yaw, m in YAW_FACE_MAPS.items()}
+
+
+@lru_cache(maxsize=64)
+def conversion_perm(mode: str = "robot_cam", yaw: int = 0) -> Perm:
+    """Profil robot puis yaw legacy : équivalent apply_robot_orientation_corrections + reorient."""
+    prof = PROFILE_PERMS.get(mode, PROFILE_PERMS["robot_raw"])
+    return compose(prof, YAW_PERMS[yaw % 360])
+
+
+# ---------------------------------------------------------------------------
+# CubeState
+# ---------------------------------------------------------------------------
+class CubeState:
+    """État 54 facelets sur 1 bytearray (symboles 1 octet : lettres URFDLB ou codes couleur)."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        if data is None:
+            self.data = bytearray(SOLVED, "ascii")
+        else:
+            self.data = bytearray(data)
+        if len(self.data) != 54:
+            raise ValueError(f"CubeState: 54 facelets attendus (got {len(self.data)})")
+
+    # --- constructeurs -----------------------------------------------------
+    @classmethod
+    def from_string(cls, s: str) -> "CubeState":
+        return cls(s.encode("ascii"))
+
+    @classmethod
+    def from_faces(cls, face_results, order: str = FACES) -> "CubeState":
+        """FacesDict (couleurs par face, clés = faces caméra) -> codes couleur 1 octet."""
+        data = bytearray(54)
+        for i, f in enumerate(order):
+            fr = face_results.get(f)
+            if fr is None:
+                raise ValueError(f"Face {f} manquante")
+            colors = fr.colors if hasattr(fr, "colors") else fr
+            if len(colors) != 9:
+                raise ValueError(f"Face {f}: 9 couleurs attendues (got {len(colors)})")
+            for k, col in enumerate(colors):
+                data[9 * i + k] = COLOR_CODES.get(str(col).lower().strip(), UNKNOWN_CODE)
+        return cls(data)
+
+    # --- permutations ------------------------------------------------------
+    def permuted(self, perm: Perm) -> "CubeState":
+        """Nouveau CubeState = gather(perm)."""
+        return CubeState(_getter(tuple(perm))(self.data))
+
+    def apply(self, perm: Perm) -> "CubeState":
+        """Gather en place."""
+        self.data[:] = bytes(_getter(tuple(perm))(self.data))
+        return self
+
+    def apply_moves(self, moves: Iterable[str]) -> "CubeState":
+        for m in moves:
+            self.apply(MOVE_PERMS[m])
+        return self
+
+    # --- lecture -----------------------------------------------------------
+    def centers(self) -> bytes:
+        return bytes(_getter(CENTER_IDX)(self.data))
+
+    def face(self, f: str) -> bytes:
+        b = FACE_BASE[f]
+        return bytes(self.data[b:b + 9])
+
+    def relabel(self, table: bytes) -> "CubeState":
+        """Substitution de symboles (bytes.translate, table 256 octets)."""
+        return CubeState(self.data.translate(table))
+
+    def encode_by_centers(self) -> str:
+        """Codes couleur -> lettres URFDLB selon la couleur des centres ('?' si absente)."""
+        table = bytearray(b"?" * 256)
+        for f, code in zip(FACES, self.centers()):
+            if code != UNKNOWN_CODE:
+                table[code] = ord(f)
+        return self.data.translate(bytes(table)).decode("ascii")
+
+    def is_solved(self) -> bool:
+        d = self.data
+        return all(d[9 * i:9 * i + 9].count(d[9 * i + 4]) == 9 for i in range(6))
+
+    def key(self) -> bytes:
+        return bytes(self.data)
+
+    def to_string(self) -> str:
+        return self.data.decode("ascii")
+
+    def as_numpy(self):
+        import numpy as np
+        return np.frombuffer(bytes(self.data), dtype=np.uint8)
+
+    def copy(self) -> "CubeState":
+        return CubeState(self.data)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CubeState) and self.data == other.data
+
+    def __repr__(self) -> str:
+        return f"CubeState({self.to_string()!r})"
+
+    __str__ = to_string
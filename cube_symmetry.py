@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  cube_symmetry.py
+#  ----------------
+#  Objectif :
+#     Forme **canonique** d’une cubestring URFDLB sous les 48 symétries du cube
+#     (24 rotations du cube entier + 24 réflexions), avec le recoloriage associé
+#     (les lettres suivent les centres déplacés), et la transformation inverse
+#     qui ramène une solution calculée sur la forme canonique au cube d’origine.
+#
+#     Usage : clé du cache de solutions (même problème vu sous une autre
+#     orientation de scan -> même entrée) et clé de dédoublonnage d’archive.
+#
+#  Conjugaison par une symétrie g (cube_state.SYMMETRIES[k]) :
+#     conj_g(s)[j] = face_map_g(s[i])  où le facelet i est envoyé en j par g
+#     Si M résout s, alors g(M) résout conj_g(s), avec pour chaque mouvement :
+#       X^n -> face_map_g(X)^n          (rotation)
+#       X^n -> face_map_g(X)^-n         (réflexion : sens inversé)
+#
+#  Entrées principales :
+#     - canonicalize(cube) -> (canonical_cube, sym_index)
+#         canonical_cube = conj_{SYMMETRIES[sym_index]}(cube) (min lexicographique)
+#     - canonical_key(cube) -> str
+#     - conjugate(cube, sym_index) -> str
+#     - map_solution(solution, sym_index) -> str       : g(M)
+#     - solution_from_canonical(solution, sym_index) -> str : g^-1(M), pour le cube d’origine
+#
+#  Notes :
+#     - Formats de solution acceptés : "R U2 F'" (kociemba) et "R1 U2 F3 (3f)"
+#       (twophase) ; le format et les jetons non-mouvements sont conservés.
+#     - Pur Python : 48 gathers + translate, ~0.2 ms par canonicalisation.
+# ============================================================================
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Tuple
+
+from cube_state import FACES, SYMMETRIES, _getter, invert
+
+# Tables par symétrie : (itemgetter du gather, table translate 256 octets)
+_TABLES = []
+for _sym in SYMMETRIES:
+    _tr = bytearray(range(256))
+    for _src, _dst in _sym.face_map.items():
+        _tr[ord(_src)] = ord(_dst)
+    _TABLES.append((_getter(_sym.perm), bytes(_tr)))
+
+# Index de la symétrie inverse
+_INVERSE = [next(k for k, t in enumerate(SYMMETRIES) if t.perm == invert(s.perm)) for s in SYMMETRIES]
+
+# Inversion du sens d’un quart de tour (notations kociemba et twophase)
+_REVERSE_SUFFIX = {"": "'", "'": "", "2": "2", "1": "3", "3": "1"}
+
+
+def conjugate(cube: str, sym_index: int) -> str:
+    """Cube transformé par SYMMETRIES[sym_index] (facelets déplacés + lettres recoloriées)."""
+    get, table = _TABLES[sym_index]
+    return bytes(get(cube.encode("ascii"))).translate(table).decode("ascii")
+
+
+def canonicalize(cube: str) -> Tuple[str, int]:
+    """Représentant minimal sur les 48 symétries + index de la symétrie utilisée."""
+    data = cube.encode("ascii")
+    best, best_k = None, 0
+    for k, (get, table) in enumerate(_TABLES):
+        cand = bytes(get(data)).translate(table)
+        if best is None or cand < best:
+            best, best_k = cand, k
+    return best.decode("ascii"), best_k
+
+
+def canonical_key(cube: str) -> str:
+    return canonicalize(cube)[0]
+
+
+def _map_token(tok: str, sym_index: int) -> str:
+    face, suffix = tok[:1], tok[1:]
+    if face not in FACES or suffix not in _REVERSE_SUFFIX:
+        return tok                      # ex: "(20f)" de twophase
+    sym = SYMMETRIES[sym_index]
+    if sym.mirror:
+        suffix = _REVERSE_SUFFIX[suffix]
+    return sym.face_map[face] + suffix
+
+
+@lru_cache(maxsize=1024)
+def map_solution(solution: str, sym_index: int) -> str:
+    """Si `solution` résout s, le résultat résout conjugate(s, sym_index)."""
+    toks: List[str] = solution.replace("’", "'").split()
+    return " ".join(_map_token(t, sym_index) for t in toks)
+
+
+def solution_from_canonical(solution: str, sym_index: int) -> str:
+    """Solution de la forme canonique -> solution du cube d’origine (sym_index de canonicalize)."""
+    return map_solution(solution, _INVERSE[sym_index])
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for c in sys.argv[1:] or ["UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"]:
+        t0 = time.perf_counter()
+        can, k = canonicalize(c)
+        dt_us = (time.perf_counter() - t0) * 1e6
+        print(f"{c} -> {can} (sym #{k} '{SYMMETRIES[k].name}', {dt_us:.0f} µs)")
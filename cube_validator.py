@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  cube_validator.py
+#  -----------------
+#  Objectif :
+#     Vérifier qu’une cubestring URFDLB (54 caractères) est **physiquement
+#     soluble** AVANT d’appeler le solveur, en la décomposant en cubies
+#     (coins / arêtes : permutation + orientation), comme FaceCube.toCubieCube
+#     de Kociemba. Chaque contrainte violée est nommée, avec les faces suspectes
+#     (utilisables par la logique de re-scan).
+#
+#  Entrées principales :
+#     - check_solvable(cube: str) -> CubeValidation
+#         ok / code / message / suspect_faces / details
+#     - assert_solvable(cube: str) -> None
+#         Lève UnsolvableCube (ValueError) portant le rapport (.report).
+#     - to_cubies(cube: str) -> (cp, co, ep, eo)
+#
+#  Codes d’erreur :
+#     BAD_LENGTH, BAD_LETTERS, BAD_CENTERS, BAD_COUNTS,
+#     BAD_CORNER   : triple de couleurs impossible (ex: 2 faces opposées, miroir)
+#     BAD_EDGE     : paire de couleurs impossible (faces opposées / identiques)
+#     DUP_CORNER / DUP_EDGE : même cubie vu deux fois (donc un autre manque)
+#     CORNER_TWIST : somme des orientations de coins != 0 mod 3 (coin tourné)
+#     EDGE_FLIP    : somme des orientations d’arêtes impaire (arête retournée)
+#     PARITY       : parité permutation coins != parité arêtes (2 pièces échangées)
+#
+#  Dépendances :
+#     - Aucune (pur Python, quelques microsecondes par appel).
+# ============================================================================
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+FACES = "URFDLB"
+
+# Facelets (index 0..53) de chaque position de coin / arête (ordre Kociemba)
+CORNER_NAMES = ("URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB")
+CORNER_FACELETS = (
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51),
+)
+CORNER_COLORS = tuple(tuple(n) for n in CORNER_NAMES)
+
+EDGE_NAMES = ("UR", "UF", "UL", "UB", "DR", "DF", "DL", "DB", "FR", "FL", "BL", "BR")
+EDGE_FACELETS = (
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14),
+)
+EDGE_COLORS = tuple(tuple(n) for n in EDGE_NAMES)
+
+# Lookups précalculés : (c1,c2) après U/D -> index coin ; (a,b) -> (index arête, orientation)
+_CORNER_BY_TAIL = {(c[1], c[2]): j for j, c in enumerate(CORNER_COLORS)}
+_EDGE_LOOKUP: Dict[Tuple[str, str], Tuple[int, int]] = {}
+for _j, (_a, _b) in enumerate(EDGE_COLORS):
+    _EDGE_LOOKUP[(_a, _b)] = (_j, 0)
+    _EDGE_LOOKUP[(_b, _a)] = (_j, 1)
+
+
+@dataclass
+class CubeValidation:
+    """Rapport de validation (structure stable pour UI / re-scan)."""
+    ok: bool
+    code: str = "OK"
+    message: str = ""
+    suspect_faces: List[str] = field(default_factory=list)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ok": self.ok, "code": self.code, "message": self.message,
+                "suspect_faces": list(self.suspect_faces), "details": dict(self.details)}
+
+
+class UnsolvableCube(ValueError):
+    """Cubestring insoluble ; .report = CubeValidation."""
+
+    def __init__(self, report: CubeValidation):
+        super().__init__(f"{report.code}: {report.message}")
+        self.report = report
+
+
+def _faces_of(facelets) -> List[str]:
+    """Faces (lettres) qui portent ces index de facelets, ordre URFDLB, sans doublon."""
+    hit = {FACES[i // 9] for i in facelets}
+    return [f for f in FACES if f in hit]
+
+
+def _fail(code: str, message: str, facelets=(), **details) -> CubeValidation:
+    return CubeValidation(ok=False, code=code, message=message,
+                          suspect_faces=_faces_of(facelets), details=details)
+
+
+def _parity(perm) -> int:
+    """Parité d’une permutation (0 paire, 1 impaire) par comptage des inversions."""
+    n = len(perm)
+    s = 0
+    for i in range(n):
+        pi = perm[i]
+        for j in range(i + 1, n):
+            if perm[j] < pi:
+                s += 1
+    return s & 1
+
+
+def _basic(cube: str) -> Optional[CubeValidation]:
+    if not isinstance(cube, str) or len(cube) != 54:
+        n = len(cube) if isinstance(cube, str) else type(cube).__name__
+        return CubeValidation(False, "BAD_LENGTH", f"54 caractères attendus (got {n})")
+
+    bad = set(cube) - set(FACES)
+    if bad:
+        idx = [i for i, c in enumerate(cube) if c in bad]
+        return _fail("BAD_LETTERS", f"caractères invalides {sorted(bad)}", idx, positions=idx)
+
+    centers = "".join(cube[9 * i + 4] for i in range(6))
+    if centers != FACES:
+        idx = [9 * i + 4 for i in range(6) if cube[9 * i + 4] != FACES[i]]
+        return _fail("BAD_CENTERS", f"centres {centers} != URFDLB", idx, centers=centers)
+
+    cnt = Counter(cube)
+    if any(cnt[f] != 9 for f in FACES):
+        return CubeValidation(False, "BAD_COUNTS", f"comptage invalide {dict(cnt)}",
+                              details={"counts": dict(cnt)})
+    return None
+
+
+def to_cubies(cube: str):
+    """
+    Décomposition cubies.
+    :return: (cp, co, ep, eo) ou lève UnsolvableCube (BAD_CORNER / BAD_EDGE)
+    """
+    cp = [0] * 8
+    co = [0] * 8
+    for i, fl in enumerate(CORNER_FACELETS):
+        cols = (cube[fl[0]], cube[fl[1]], cube[fl[2]])
+        ori = 0
+        while ori < 3 and cols[ori] not in "UD":
+            ori += 1
+        j = None
+        if ori < 3:
+            j = _CORNER_BY_TAIL.get((cols[(ori + 1) % 3], cols[(ori + 2) % 3]))
+        if j is None:
+            raise UnsolvableCube(_fail(
+                "BAD_CORNER", f"coin {CORNER_NAMES[i]} impossible: {''.join(cols)}",
+                fl, position=CORNER_NAMES[i], colors="".join(cols)))
+        cp[i], co[i] = j, ori
+
+    ep = [0] * 12
+    eo = [0] * 12
+    for i, fl in enumerate(EDGE_FACELETS):
+        pair = (cube[fl[0]], cube[fl[1]])
+        hit = _EDGE_LOOKUP.get(pair)
+        if hit is None:
+            raise UnsolvableCube(_fail(
+                "BAD_EDGE", f"arête {EDGE_NAMES[i]} impossible: {''.join(pair)}",
+                fl, position=EDGE_NAMES[i], colors="".join(pair)))
+        ep[i], eo[i] = hit
+
+    return cp, co, ep, eo
+
+
+def check_solvable(cube: str) -> CubeValidation:
+    """Validation complète (basique + cubies). Ne lève pas : retourne le rapport."""
+    rep = _basic(cube)
+    if rep is not None:
+        return rep
+
+    try:
+        cp, co, ep, eo = to_cubies(cube)
+    except UnsolvableCube as e:
+        return e.report
+
+    # Chaque cubie exactement une fois
+    if len(set(cp)) != 8:
+        dup = [j for j, n in Counter(cp).items() if n > 1]
+        pos = [i for i, j in enumerate(cp) if j in dup]
+        fl = [k for i in pos for k in CORNER_FACELETS[i]]
+        return _fail("DUP_CORNER",
+                     f"coin {'/'.join(CORNER_NAMES[j] for j in dup)} vu plusieurs fois "
+                     f"(positions {[CORNER_NAMES[i] for i in pos]})",
+                     fl, duplicated=[CORNER_NAMES[j] for j in dup],
+                     missing=[CORNER_NAMES[j] for j in range(8) if j not in cp])
+    if len(set(ep)) != 12:
+        dup = [j for j, n in Counter(ep).items() if n > 1]
+        pos = [i for i, j in enumerate(ep) if j in dup]
+        fl = [k for i in pos for k in EDGE_FACELETS[i]]
+        return _fail("DUP_EDGE",
+                     f"arête {'/'.join(EDGE_NAMES[j] for j in dup)} vue plusieurs fois "
+                     f"(positions {[EDGE_NAMES[i] for i in pos]})",
+                     fl, duplicated=[EDGE_NAMES[j] for j in dup],
+                     missing=[EDGE_NAMES[j] for j in range(12) if j not in ep])
+
+    # Orientations
+    if sum(eo) % 2 != 0:
+        pos = [i for i in range(12) if eo[i]]
+        fl = [k for i in pos for k in EDGE_FACELETS[i]]
+        return _fail("EDGE_FLIP", "une arête retournée (somme orientations impaire)",
+                     fl, flipped_positions=[EDGE_NAMES[i] for i in pos])
+    if sum(co) % 3 != 0:
+        pos = [i for i in range(8) if co[i]]
+        fl = [k for i in pos for k in CORNER_FACELETS[i]]
+        return _fail("CORNER_TWIST", f"coin tourné (somme orientations = {sum(co) % 3} mod 3)",
+                     fl, twisted_positions=[CORNER_NAMES[i] for i in pos])
+
+    # Parité
+    pc, pe = _parity(cp), _parity(ep)
+    if pc != pe:
+        moved = [k for i in range(8) if cp[i] != i for k in CORNER_FACELETS[i]]
+        moved += [k for i in range(12) if ep[i] != i for k in EDGE_FACELETS[i]]
+        return _fail("PARITY", "parité coins != parité arêtes (2 pièces échangées)",
+                     moved, corner_parity=pc, edge_parity=pe)
+
+    return CubeValidation(ok=True, details={"cp": cp, "co": co, "ep": ep, "eo": eo})
+
+
+def assert_solvable(cube: str) -> None:
+    rep = check_solvable(cube)
+    if not rep.ok:
+        raise UnsolvableCube(rep)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    cubes = sys.argv[1:] or ["UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"]
+    for c in cubes:
+        t0 = time.perf_counter()
+        r = check_solvable(c)
+        dt_us = (time.perf_counter() - t0) * 1e6
+        print(f"{c} -> {r.code} {r.message} suspects={r.suspect_faces} ({dt_us:.0f} µs)")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  face_integrals.py
+#  -----------------
+#  Objectif :
+#     Tables de sommes cumulées (summed-area tables, cv2.integral) calculées
+#     **une seule fois par face redressée** (300×300), pour obtenir la moyenne
+#     de n’importe quel rectangle en 4 lectures (O(1)), quelle que soit la marge.
+#
+#  Tables construites :
+#     - "lab"   : Lab OpenCV (L,a,b en 0..255)              -> 3 canaux
+#     - "hsv"   : HSV OpenCV (H 0..179, S,V 0..255)         -> 3 canaux (S,V : sondes
+#                 calibration ; H moyenné n’a pas de sens autour du rouge 0/179)
+#     - "spec"  : masque reflet (V>235 & S<120)             -> _specular_score_cell
+#     - "shiny" : masque reflet strict (V>245 & S<80)       -> detect_risky_face
+#
+#  Entrées principales :
+#     - FaceIntegrals(face_bgr, grid=3)
+#     - fi.cell_rect((i,j), margin)          -> (x1,y1,x2,y2) identique au slicing legacy
+#     - fi.cell_mean(name, (i,j), margin)    -> moyenne (np.ndarray(C,) ou float)
+#     - fi.cells_mean(name, margin)          -> (9,C) vectorisé (toutes les cellules)
+#     - fi.cell_mean_multi(name, (i,j), margins) -> (len(margins),C) même cellule,
+#       plusieurs marges (stabilité de l’échantillon, outils de calibration)
+#
+#  Utilisateurs :
+#     - process_images_cube : 1 FaceIntegrals par face, passé à analyze_colors_simple
+#       (detect_risky_face, _specular_score_cell, _lab_ab_from_cell) et cells_mean("lab")
+#       pour les features de classification
+#     - calibration_colors.probe_cell_margins / margin_report : sondes multi-marges
+#       Lab / HSV / reflets de la calibration couleurs (calibration_rubiks, option 5)
+#
+#  Notes :
+#     - La géométrie des cellules suit extract_grid (sy=h//3, sx=w//3, row-major).
+#     - Conversion couleur pixel à pixel => moyenne sur sous-rectangle identique
+#       à “slice -> cvtColor -> mean” (sommes entières exactes, CV_32S).
+# ============================================================================
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Tuple
+
+import cv2
+import numpy as np
+
+
+class FaceIntegrals:
+    """Summed-area tables d’une face (Lab, HSV, masques reflets)."""
+
+    def __init__(self, face_bgr: np.ndarray, grid: int = 3):
+        h, w = face_bgr.shape[:2]
+        self.h, self.w = h, w
+        self.grid = grid
+        self.sy, self.sx = h // grid, w // grid
+
+        lab = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2LAB)
+        hsv = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2HSV)
+        S, V = hsv[..., 1], hsv[..., 2]
+
+        spec = ((V > 235) & (S < 120)).astype(np.uint8)
+        shiny = ((V > 245) & (S < 80)).astype(np.uint8)
+
+        self.tables: Dict[str, np.ndarray] = {
+            "lab": cv2.integral(lab),
+            "hsv": cv2.integral(hsv),
+            "spec": cv2.integral(spec),
+            "shiny": cv2.integral(shiny),
+        }
+
+    # ------------------------------------------------------------------
+    # Géométrie
+    # ------------------------------------------------------------------
+    def cell_rect(self, ij: Tuple[int, int], margin: float = 0.25) -> Tuple[int, int, int, int]:
+        """Rectangle interne (x1,y1,x2,y2) de la cellule (i,j), comme cell[mh:h-mh, mw:w-mw]."""
+        i, j = ij
+        mh, mw = int(self.sy * margin), int(self.sx * margin)
+        y1, y2 = i * self.sy + mh, (i + 1) * self.sy - mh
+        x1, x2 = j * self.sx + mw, (j + 1) * self.sx - mw
+        if y2 <= y1 or x2 <= x1:
+            # même fallback que le legacy (inner vide -> cellule complète)
+            y1, y2 = i * self.sy, (i + 1) * self.sy
+            x1, x2 = j * self.sx, (j + 1) * self.sx
+        return x1, y1, x2, y2
+
+    # ------------------------------------------------------------------
+    # Moyennes O(1)
+    # ------------------------------------------------------------------
+    def rect_mean(self, name: str, x1: int, y1: int, x2: int, y2: int):
+        """Moyenne du rectangle [y1:y2, x1:x2] en 4 lectures."""
+        T = self.tables[name]
+        area = float(max(1, (x2 - x1) * (y2 - y1)))
+        s = T[y2, x2] - T[y1, x2] - T[y2, x1] + T[y1, x1]
+        m = np.asarray(s, dtype=np.float64) / area
+        return float(m) if m.ndim == 0 else m
+
+    def cell_mean(self, name: str, ij: Tuple[int, int], margin: float = 0.25):
+        return self.rect_mean(name, *self.cell_rect(ij, margin))
+
+    def cells_mean(self, name: str, margin: float = 0.25) -> np.ndarray:
+        """Moyennes des grid×grid cellules en une passe numpy -> (9,C)."""
+        rects = np.array([self.cell_rect((i, j), margin)
+                          for i in range(self.grid) for j in range(self.grid)])
+        return self._rects_mean(name, rects)
+
+    def cell_mean_multi(self, name: str, ij: Tuple[int, int], margins: Iterable[float]) -> np.ndarray:
+        """Même cellule, plusieurs marges (sondes calibration) -> (len(margins),C)."""
+        rects = np.array([self.cell_rect(ij, m) for m in margins])
+        return self._rects_mean(name, rects)
+
+    def _rects_mean(self, name: str, rects: np.ndarray) -> np.ndarray:
+        T = self.tables[name]
+        x1, y1, x2, y2 = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+        s = (T[y2, x2].astype(np.float64) - T[y1, x2] - T[y2, x1] + T[y1, x1])
+        area = np.maximum(1, (x2 - x1) * (y2 - y1)).astype(np.float64)
+        if s.ndim == 1:
+            return s / area
+        return s / area[:, None]
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  frame_archive.py
+#  ----------------
+#  Objectif :
+#     Archiver les **frames brutes** (uint8 BGR, avant compression JPEG) d’un run
+#     de capture, pour pouvoir rejouer un corpus complet dans la vision
+#     (detect_colors_for_faces) sans décodage JPEG et de façon **bit-exacte**.
+#
+#  Format d’une archive (1 dossier par run) :
+#     <archive_root>/<run_id>/
+#       - frames.npy  : tableau uint8 (N, H, W, 3), 1 “chunk” par face,
+#                       dans l’ordre donné par meta["faces"]
+#       - frames.json : sidecar JSON (faces, shape, dtype, ROI, contrôles caméra
+#                       verrouillés, mode vision, horodatage, extra libre)
+#
+#  Entrées principales :
+#     - save_frame_archive(out_dir, frames, roi_data=None, camera_controls=None,
+#                          vision_mode=None, extra=None) -> str
+#         Écrit frames.npy + frames.json (écriture atomique tmp + os.replace).
+#
+#     - load_frame_archive(archive_dir, mmap=True) -> (frames_dict, meta)
+#         Recharge via np.load(mmap_mode='r') : chaque face est une vue
+#         (aucune copie, aucune lecture disque tant qu’on n’y touche pas).
+#
+#     - replay_frame_archive(archive_dir, roi_data=None, debug="none", strict=False)
+#         Rejoue l’archive dans detect_colors_for_faces(..., frames=...) avec le
+#         mode vision enregistré (même décision day/night que le run d’origine).
+#
+#     - annotate_frame_archive(archive_dir, **fields)
+#         Ajoute des champs à meta["extra"] (ex: cube_string / cube_key après encodage ;
+#         cube_key = forme canonique cube_symmetry -> clé de dédoublonnage du corpus).
+#
+#     - new_run_dir(archive_root="archive") -> str
+#         Dossier horodaté pour un nouveau run.
+#
+#  Dépendances :
+#     - numpy (obligatoire)
+#
+#  Notes :
+#     - Activation côté robot : config.json -> camera.frame_archive.enabled
+#       (dossier : camera.frame_archive.folder). Désactivé par défaut.
+#     - .npz n’est pas mmap-able (zip) : on garde un .npy unique par run.
+# ============================================================================
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+ARCHIVE_VERSION = 1
+FRAMES_FILE = "frames.npy"
+META_FILE = "frames.json"
+DEFAULT_FACE_ORDER = ["U", "B", "D", "F", "R", "L"]
+
+
+def _jsonable(v: Any) -> Any:
+    """Convertit récursivement tuples/np.* en types JSON."""
+    if isinstance(v, dict):
+        return {str(k): _jsonable(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    return v
+
+
+def new_run_dir(archive_root: str = "archive") -> str:
+    """Crée et retourne <archive_root>/run_YYYYMMDD_HHMMSS."""
+    run_id = datetime.datetime.now().strftime("run_%Y%m%d_%H%M%S")
+    path = os.path.join(archive_root, run_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save_frame_archive(out_dir: str,
+                       frames: Mapping[str, np.ndarray],
+                       roi_data: Optional[Mapping[str, Any]] = None,
+                       camera_controls: Optional[Mapping[str, Any]] = None,
+                       vision_mode: Optional[str] = None,
+                       extra: Optional[Mapping[str, Any]] = None) -> str:
+    """
+    Écrit une archive de frames brutes.
+
+    :param frames: dict face -> image BGR uint8 (toutes de même shape)
+    :return: chemin du dossier archive
+    """
+    if not frames:
+        raise ValueError("frame archive vide")
+
+    faces = [f for f in DEFAULT_FACE_ORDER if f in frames]
+    faces += [f for f in frames if f not in faces]
+
+    shape = None
+    for f in faces:
+        img = frames[f]
+        if img is None or img.dtype != np.uint8 or img.ndim != 3:
+            raise ValueError(f"{f}: frame uint8 HxWx3 attendue (got {getattr(img, 'dtype', None)})")
+        if shape is None:
+            shape = img.shape
+        elif img.shape != shape:
+            raise ValueError(f"{f}: shape {img.shape} != {shape}")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 1) frames.npy : pré-alloué puis rempli face par face (pas de np.stack en RAM x2)
+    npy_path = os.path.join(out_dir, FRAMES_FILE)
+    tmp = npy_path + ".tmp"
+    arr = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8, shape=(len(faces),) + tuple(shape))
+    for k, f in enumerate(faces):
+        arr[k] = frames[f]
+    arr.flush()
+    del arr
+    os.replace(tmp, npy_path)
+
+    # 2) sidecar JSON
+    meta = {
+        "version": ARCHIVE_VERSION,
+        "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+        "faces": faces,
+        "shape": list(shape),
+        "dtype": "uint8",
+        "color_order": "BGR",
+        "roi": _jsonable(dict(roi_data)) if roi_data else None,
+        "camera_controls": _jsonable(dict(camera_controls)) if camera_controls else None,
+        "vision_mode": vision_mode,
+        "extra": _jsonable(dict(extra)) if extra else {},
+    }
+    meta_path = os.path.join(out_dir, META_FILE)
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp, meta_path)
+
+    return out_dir
+
+
+def annotate_frame_archive(archive_dir: str, **fields: Any) -> None:
+    """Complète meta["extra"] après coup (ex: cubestring + clé canonique, pour dédoublonner)."""
+    meta_path = os.path.join(archive_dir, META_FILE)
+    with open(meta_path, "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+    meta.setdefault("extra", {}).update(_jsonable(fields))
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp, meta_path)
+
+
+def load_frame_archive(archive_dir: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Recharge une archive.
+
+    :param mmap: True -> np.load(mmap_mode='r') (vues lecture seule, zéro copie)
+    :return: (frames dict face -> vue HxWx3, meta)
+    """
+    with open(os.path.join(archive_dir, META_FILE), "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+
+    arr = np.load(os.path.join(archive_dir, FRAMES_FILE), mmap_mode=("r" if mmap else None))
+    faces = meta.get("faces") or []
+    if arr.shape[0] != len(faces):
+        raise ValueError(f"archive incohérente: {arr.shape[0]} frames pour faces={faces}")
+
+    frames = {f: arr[k] for k, f in enumerate(faces)}
+    return frames, meta
+
+
+def replay_frame_archive(archive_dir: str, roi_data=None, debug: str = "none", strict: bool = False):
+    """
+    Rejoue une archive dans detect_colors_for_faces.
+
+    :param roi_data: ROI à utiliser (défaut : ROI du sidecar)
+    :return: (FacesDict, meta)
+    """
+    from process_images_cube import detect_colors_for_faces
+
+    frames, meta = load_frame_archive(archive_dir, mmap=True)
+    roi = roi_data if roi_data is not None else meta.get("roi")
+    if roi is None:
+        raise ValueError(f"ROI absente du sidecar: {archive_dir}")
+
+    results = detect_colors_for_faces(archive_dir, roi, None, debug=debug, strict=strict,
+                                      frames=frames, vision_mode=meta.get("vision_mode"))
+    return results, meta
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python frame_archive.py <archive_dir> [<archive_dir> ...]")
+        sys.exit(1)
+
+    for d in sys.argv[1:]:
+        res, meta = replay_frame_archive(d, debug="none")
+        print(f"{d} [{meta.get('vision_mode')}]")
+        for face in ["U", "R", "F", "D", "L", "B"]:
+            if face in res:
+                print(f"  {face}: {' '.join(res[face].colors)}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  move_seq.py
+#  -----------
+#  Objectif :
+#     Représentation **typée et compacte** des suites de mouvements, partagée par
+#     tout le chemin solve -> compile -> optimise -> execute : un array('B') de
+#     petits codes entiers, converti en texte seulement aux bords (logs, events,
+#     config, API publiques qui renvoient des chaînes).
+#     Évite de re-parser "R U R' U'" / "U1R2..." / "F1S3R1..." à chaque étape
+#     (slicing moves[i:i+2], int(moves[i+1]) dans les boucles chaudes).
+#
+#  Deux alphabets (MoveSeq.kind) :
+#     - FACE  : mouvements solveur, code = face * 3 + (quart - 1)
+#               face = index dans "URFDLB", quart 1 = 90° CW, 2 = 180°, 3 = 90° CCW
+#               (même ordre que robot_move_compiler.MOVE_NAMES "U1".."B3")
+#     - ROBOT : commandes robot, code = "FSR".index(cmd) * 8 + valeur
+#               (F1..F7 = k flips ; S/R 1, 3, 0, 4 comme Cubotino)
+#
+#  Entrées principales :
+#     - MoveSeq.from_singmaster("R U R' U'" | "RUR'U'")  -> FACE
+#     - MoveSeq.from_tokens(["R", "U'"]) / from_compact("R1U3")  -> FACE
+#     - MoveSeq.from_robot("F1S3R1")  -> ROBOT
+#     - seq.to_singmaster() / to_compact() / to_robot() / str(seq)
+#     - seq.tokens() (textes), seq.pairs() (ROBOT : [(cmd, valeur)]), len, itération
+#       sur les codes, tranches, ==, hash (utilisable comme clé de cache)
+# ============================================================================
+
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Iterable, Iterator, List, Tuple, Union
+
+FACE = "face"
+ROBOT = "robot"
+
+FACES = "URFDLB"
+_SUFFIX = ("", "2", "'")
+FACE_NAMES: List[str] = [f + s for f in FACES for s in _SUFFIX]            # "U", "U2", "U'", ...
+COMPACT_NAMES: List[str] = [f + n for f in FACES for n in "123"]            # "U1", "U2", "U3", ...
+_FACE_CODE = {name: i for i, name in enumerate(FACE_NAMES)}
+_FACE_CODE.update({name: i for i, name in enumerate(COMPACT_NAMES)})
+
+_ROBOT_CMDS = "FSR"
+ROBOT_NAMES = {c * 8 + v: f"{cmd}{v}" for c, cmd in enumerate(_ROBOT_CMDS) for v in range(8)}
+_ROBOT_CODE = {name: code for code, name in ROBOT_NAMES.items()}
+_ROBOT_PAIR = {code: (name[0], int(name[1])) for code, name in ROBOT_NAMES.items()}
+
+_TOKEN_RE = re.compile(r"\s*([URFDLBxyz])(2|')?\s*")
+
+
+class MoveSeq:
+    """Suite de mouvements (codes 0..255 dans un array('B')) + alphabet."""
+
+    __slots__ = ("kind", "codes")
+
+    def __init__(self, kind: str, codes: Iterable[int] = ()):
+        if kind not in (FACE, ROBOT):
+            raise ValueError(f"MoveSeq: type inconnu {kind!r}")
+        self.kind = kind
+        self.codes = codes if isinstance(codes, array) else array("B", codes)
+
+    # --- constructeurs -----------------------------------------------------
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[str]) -> "MoveSeq":
+        """Tokens Singmaster ("R", "U'", "F2") ou compacts ("R1", "U3") ; x/y/z refusés."""
+        codes = array("B")
+        for t in tokens:
+            if not t:
+                continue
+            code = _FACE_CODE.get(t)
+            if code is None:
+                if t[0] in "xyz":
+                    raise ValueError(
+                        "La solution contient des rotations de cube (x/y/z). "
+                        "Pour un robot Cubotino-like, donne une solution uniquement en URFDLB."
+                    )
+                raise ValueError(f"Face invalide: {t}")
+            codes.append(code)
+        return cls(FACE, codes)
+
+    @classmethod
+    def from_singmaster(cls, solution: Union[str, "MoveSeq"]) -> "MoveSeq":
+        if isinstance(solution, MoveSeq):
+            return solution._expect(FACE)
+        solution = solution.replace("’", "'").replace("‘", "'").strip()
+        if " " in solution:
+            return cls.from_tokens(solution.split())
+        toks = []
+        i = 0
+        while i < len(solution):
+            m = _TOKEN_RE.match(solution, i)
+            if not m:
+                raise ValueError(f"Token Singmaster invalide autour de: {solution[i:i+6]!r}")
+            toks.append(m.group(1) + (m.group(2) or ""))
+            i = m.end()
+        return cls.from_tokens(toks)
+
+    @classmethod
+    def from_compact(cls, solution: Union[str, "MoveSeq"]) -> "MoveSeq":
+        """Format Cubotino "U1R2L3..." (espaces tolérés)."""
+        if isinstance(solution, MoveSeq):
+            return solution._expect(FACE)
+        solution = solution.replace(" ", "")
+        try:
+            return cls(FACE, [_FACE_CODE[solution[i:i + 2]] for i in range(0, len(solution) - 1, 2)])
+        except KeyError as e:
+            raise ValueError(f"Mouvement Cubotino invalide: {e.args[0]!r}") from None
+
+    @classmethod
+    def from_robot(cls, moves: Union[str, "MoveSeq"]) -> "MoveSeq":
+        """Chaîne robot "F1S3R1..." (paires commande + chiffre)."""
+        if isinstance(moves, MoveSeq):
+            return moves._expect(ROBOT)
+        moves = moves.strip()
+        if len(moves) % 2:
+            raise ValueError(f"Moves string invalide (longueur impaire): {moves!r}")
+        try:
+            return cls(ROBOT, [_ROBOT_CODE[moves[i:i + 2]] for i in range(0, len(moves), 2)])
+        except KeyError as e:
+            raise ValueError(f"Commande robot inconnue: {e.args[0]}") from None
+
+    @classmethod
+    def robot(cls, pairs: Iterable[Tuple[str, int]]) -> "MoveSeq":
+        return cls(ROBOT, [_ROBOT_CMDS.index(c) * 8 + v for c, v in pairs])
+
+    def _expect(self, kind: str) -> "MoveSeq":
+        if self.kind != kind:
+            raise ValueError(f"MoveSeq {self.kind} fourni, {kind} attendu")
+        return self
+
+    # --- conversions (bords) -----------------------------------------------
+    def tokens(self) -> List[str]:
+        names = FACE_NAMES if self.kind == FACE else ROBOT_NAMES
+        return [names[c] for c in self.codes]
+
+    def pairs(self) -> List[Tuple[str, int]]:
+        """ROBOT : [(commande, valeur)] sans parsing de texte."""
+        pair = _ROBOT_PAIR
+        return [pair[c] for c in self.codes]
+
+    def to_singmaster(self) -> str:
+        return " ".join(FACE_NAMES[c] for c in self.codes)
+
+    def to_compact(self) -> str:
+        return "".join(COMPACT_NAMES[c] for c in self.codes)
+
+    def to_robot(self) -> str:
+        return "".join(ROBOT_NAMES[c] for c in self.codes)
+
+    def __str__(self) -> str:
+        return self.to_singmaster() if self.kind == FACE else self.to_robot()
+
+    def robot_count(self) -> int:
+        """Nb de mouvements robot (Fk compte k flips, chaque S / R compte 1)."""
+        return sum(c if c < 8 else 1 for c in self.codes)
+
+    # --- protocole séquence ------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return MoveSeq(self.kind, self.codes[i])
+        return self.codes[i]
+
+    def __add__(self, other: "MoveSeq") -> "MoveSeq":
+        if other.kind != self.kind:
+            raise ValueError("MoveSeq: concaténation de types différents")
+        return MoveSeq(self.kind, self.codes + other.codes)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, MoveSeq) and self.kind == other.kind and self.codes == other.codes
+
+    def __hash__(self) -> int:
+        return hash((self.kind, self.codes.tobytes()))
+
+    def __repr__(self) -> str:
+        return f"MoveSeq.{self.kind}({str(self)!r})"
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  orientation_search.py
+#  ---------------------
+#  Objectif :
+#     Trouver automatiquement la bonne lecture (profil robot + yaw) des 6 faces
+#     scannées, au lieu d’essayer les `yaw` à la main (debug_compare_with_physical_cube).
+#
+#     Toutes les combinaisons sont évaluées en UN lot de permutations 54 index :
+#         profils (robot_raw / robot_cam / phone_demo)
+#       × yaw legacy (0/90/180/270)
+#       × 24 orientations du cube entier
+#     Pour chaque candidat : gather -> encodage par centres -> contrôles :
+#       - centres : 6 couleurs distinctes + paires opposées cohérentes (W/Y, R/O, G/B)
+#       - cubies  : cube_validator.check_solvable (coins, arêtes, twist, flip, parité)
+#
+#  Ambiguïté :
+#     Les 24 orientations rigides d’une même lecture sont toujours valides ensemble
+#     (même cube tenu autrement) : on regroupe donc les candidats valides par
+#     **classe physique** (état couleur à rotation près). Ambigu si > 1 classe.
+#
+#  Entrées principales :
+#     - search_orientations(color_results, prefer_mode="robot_cam", prefer_yaw=0)
+#         -> OrientationSearch (ok, best, candidates, classes, ambiguous, message)
+#     - candidate_perms() -> liste [(mode, yaw, orient_name, perm)] (mise en cache)
+#
+#  Exécution directe :
+#     python orientation_search.py [image_folder]
+#       Vision sur <folder>/{F,R,B,L,U,D}.jpg puis affichage des lectures valides.
+#
+#  Dépendances :
+#     - cube_state, cube_validator (pur Python)
+#     - numpy (optionnel) : gather de tout le lot en une opération
+# ============================================================================
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from cube_state import (
+    CubeState, ORIENTATIONS, PROFILE_PERMS, YAW_PERMS, CENTER_IDX, UNKNOWN_CODE, compose,
+)
+from cube_validator import check_solvable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Paires de couleurs opposées (schéma standard)
+OPPOSITE_COLORS = {ord("W"): ord("Y"), ord("Y"): ord("W"),
+                   ord("R"): ord("O"), ord("O"): ord("R"),
+                   ord("G"): ord("B"), ord("B"): ord("G")}
+# Paires de faces opposées (index de centres dans URFDLB)
+_OPPOSITE_CENTER_SLOTS = ((0, 3), (1, 4), (2, 5))
+
+
+@dataclass
+class OrientationCandidate:
+    mode: str
+    yaw: int
+    orientation: str
+    cube_string: str
+    class_id: int = -1
+
+
+@dataclass
+class OrientationSearch:
+    ok: bool
+    best: Optional[OrientationCandidate] = None
+    candidates: List[OrientationCandidate] = field(default_factory=list)
+    classes: int = 0
+    ambiguous: bool = False
+    message: str = ""
+    rejected: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        readings = sorted({(c.mode, c.yaw, c.class_id) for c in self.candidates if c.orientation == ""})
+        return {
+            "ok": self.ok,
+            "best": None if self.best is None else
+            {"mode": self.best.mode, "yaw": self.best.yaw, "orientation": self.best.orientation,
+             "cube_string": self.best.cube_string},
+            "valid_readings": [{"mode": m, "yaw": y, "class": k} for (m, y, k) in readings],
+            "classes": self.classes,
+            "ambiguous": self.ambiguous,
+            "rejected": dict(self.rejected),
+            "message": self.message,
+        }
+
+
+@lru_cache(maxsize=1)
+def candidate_perms() -> Tuple[Tuple[str, int, str, Tuple[int, ...]], ...]:
+    """Toutes les permutations candidates (profil ∘ yaw ∘ orientation), calculées une fois."""
+    out = []
+    for mode, prof in PROFILE_PERMS.items():
+        for yaw, yp in YAW_PERMS.items():
+            base = compose(prof, yp)
+            for oname, operm in ORIENTATIONS:
+                out.append((mode, yaw, oname, compose(base, operm)))
+    return tuple(out)
+
+
+@lru_cache(maxsize=1)
+def _perm_matrix():
+    return np.array([c[3] for c in candidate_perms()], dtype=np.intp)
+
+
+def _gather_all(raw: CubeState) -> List[bytes]:
+    """Applique toutes les permutations candidates (1 fancy-index numpy si dispo)."""
+    if np is not None:
+        src = np.frombuffer(bytes(raw.data), dtype=np.uint8)
+        batch = src[_perm_matrix()]                     # (N, 54)
+        return [row.tobytes() for row in batch]
+    return [bytes(raw.permuted(c[3]).data) for c in candidate_perms()]
+
+
+def _centers_consistent(data: bytes) -> bool:
+    centers = [data[i] for i in CENTER_IDX]
+    if UNKNOWN_CODE in centers or len(set(centers)) != 6:
+        return False
+    return all(OPPOSITE_COLORS.get(centers[a]) == centers[b] for a, b in _OPPOSITE_CENTER_SLOTS)
+
+
+def _physical_key(data: bytes) -> bytes:
+    """Clé de classe physique : min sur les 24 rotations rigides de l’état couleur."""
+    st = CubeState(data)
+    return min(bytes(st.permuted(p).data) for _, p in ORIENTATIONS)
+
+
+def search_orientations(color_results, prefer_mode: str = "robot_cam", prefer_yaw: int = 0) -> OrientationSearch:
+    """
+    Recherche automatique de la lecture (profil, yaw) cohérente.
+    :param color_results: FacesDict (faces caméra -> FaceResult.colors)
+    :return: OrientationSearch ; best = orientation identité de la lecture préférée
+    """
+    raw = CubeState.from_faces(color_results)
+    rows = _gather_all(raw)
+
+    rejected = {"centers": 0, "cubies": 0}
+    verdict: Dict[bytes, Optional[str]] = {}     # cube_string encodé -> None (ok) / code
+    valid: List[OrientationCandidate] = []
+
+    for (mode, yaw, oname, _perm), data in zip(candidate_perms(), rows):
+        if not _centers_consistent(data):
+            rejected["centers"] += 1
+            continue
+        cube = CubeState(data).encode_by_centers()
+        if cube not in verdict:
+            rep = check_solvable(cube)
+            verdict[cube] = None if rep.ok else rep.code
+        if verdict[cube] is not None:
+            rejected["cubies"] += 1
+            continue
+        valid.append(OrientationCandidate(mode, yaw, oname, cube))
+
+    if not valid:
+        return OrientationSearch(ok=False, rejected=rejected,
+                                 message="aucune orientation cohérente (vision ou profil à revoir)")
+
+    # Classes physiques (à rotation rigide près)
+    keys: Dict[bytes, int] = {}
+    raw_by_reading = {(m, y, o): d for (m, y, o, _), d in zip(candidate_perms(), rows)}
+    for c in valid:
+        k = _physical_key(raw_by_reading[(c.mode, c.yaw, c.orientation)])
+        c.class_id = keys.setdefault(k, len(keys))
+
+    # Préférence : lecture configurée, puis profils/yaw dans l’ordre, orientation identité
+    modes = [prefer_mode] + [m for m in PROFILE_PERMS if m != prefer_mode]
+    yaws = [prefer_yaw % 360] + [y for y in YAW_PERMS if y != prefer_yaw % 360]
+    rank = {(m, y): (modes.index(m), yaws.index(y)) for m in modes for y in yaws}
+    best = min(valid, key=lambda c: (c.orientation != "", rank[(c.mode, c.yaw)]))
+
+    n_classes = len(keys)
+    msg = f"{len(valid)} candidats valides, {n_classes} classe(s) physique(s)"
+    if n_classes > 1:
+        msg += " -> AMBIGU"
+    return OrientationSearch(ok=True, best=best, candidates=valid, classes=n_classes,
+                             ambiguous=n_classes > 1, message=msg, rejected=rejected)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from calibration_rubiks import load_calibration
+    from process_images_cube import detect_colors_for_faces
+
+    folder = sys.argv[1] if len(sys.argv) > 1 else "tmp"
+    roi = load_calibration()
+    if roi is None:
+        print("❌ Calibration ROI introuvable")
+        sys.exit(1)
+
+    faces = detect_colors_for_faces(folder, roi, None, debug="none", strict=True)
+    res = search_orientations(faces)
+    print(json.dumps(res.summary(), indent=2, ensure_ascii=False))
@@ -17,10 +17,15 @@
 #         Point d’entrée principal “production” :
 #           * parcourt l’ordre canonique ["F","R","B","L","U","D"]
 #           * charge chaque image <folder>/<FACE>.jpg
+#             (ou la frame brute fournie via frames=..., cf. frame_archive.py)
 #           * extrait `warped` + `cells` via process_face_with_roi(...)
+#           * balance des blancs par face (estimate_face_wb_gains / apply_face_wb_gains)
 #           * classe les 9 couleurs via analyze_colors_simple(...)
+#             (moyennes Lab/reflets en O(1) via FaceIntegrals, cf. face_integrals.py)
 #           * normalise les labels via _norm(...)
 #           * en mode strict : lève si fichier/ROI/extraction/couleurs incomplètes.
+#           * keep_pixels=False (production) : FaceResult sans warped/cells,
+#             seulement labels + confidences + features compactes.
 #
 #     - detect_colors_for_faces_legacy(...)
 #         Variante historique (asserts) conservée pour comparaison / debug.
@@ -93,6 +98,7 @@ import os
 import matplotlib.pyplot as plt
 from calibration_rubiks import load_calibration
 from types_shared import FaceResult, FacesDict
+from face_integrals import FaceIntegrals
 from matplotlib.patches import Rectangle, Polygon
 from collections import Counter
 import json
@@ -102,7 +108,12 @@ from calibration_colors import (
     sample_rgb_from_cell_bgr,
     _hue_deg_from_rgb,
     analyze_colors_simple,
-    _hsv_from_rgb
+    _hsv_from_rgb,
+    _get_vision_mode,
+    estimate_face_wb_gains,
+    apply_face_wb_gains,
+    cell_medians_bgr,
+    color_confidences
 )
 
 import calibration_colors
@@ -171,17 +182,44 @@ def quad_to_np(roi_quad) -> np.ndarray:
 
 # FACADE du fichier detect_colors_for_faces renvoie un cube dont les oculeurs ont été identifiées
 
-def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debug="text", strict=False) -> FacesDict:
+def _resolve_keep_pixels(debug) -> bool:
+    """Politique keep_pixels (config detection.keep_pixels : true/false/"auto")."""
+    try:
+        from config_manager import get_config
+        v = get_config().get("detection.keep_pixels", "auto")
+    except Exception:
+        v = "auto"
+    if isinstance(v, bool):
+        return v
+    return debug == "both"
+
+def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debug="text", strict=False,
+                            frames=None, vision_mode=None, keep_pixels=None) -> FacesDict:
+    """
+    frames : dict optionnel face -> image BGR uint8 (ex: load_frame_archive, mmap).
+             Si fourni, remplace la lecture <folder>/<FACE>.jpg (rejeu bit-exact).
+    vision_mode : "day"/"night" calculé une fois par run (estimate_vision_mode).
+             None -> déduit du profil caméra, une seule fois pour les 6 faces.
+    keep_pixels : garder warped/cells dans les FaceResult (debug).
+             None -> config detection.keep_pixels ("auto" = seulement si debug="both").
+             Sinon seuls labels + confidences + features (9×6) sont conservés.
+    """
     order = ["F","R","B","L","U","D"]
     results: FacesDict = {}
     errors = {}
 
+    if vision_mode is None:
+        vision_mode = _get_vision_mode()
+    if keep_pixels is None:
+        keep_pixels = _resolve_keep_pixels(debug)
+
     for face in order:
         try:
             fp = os.path.join(image_folder, f"{face}.jpg")
+            frame = frames.get(face) if frames is not None else None
 
             # 1) Prérequis
-            if not os.path.exists(fp):
+            if frame is None and not os.path.exists(fp):
                 msg = f"{face}: fichier manquant: {fp}"
                 if strict: raise FileNotFoundError(msg)
                 errors[face] = msg
@@ -197,7 +235,8 @@ def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debu
             warped, cells = process_face_with_roi(
                 fp, roi_data[face], face,
                 show=(debug == "both"),
-                save_intermediates=(debug != "none")
+                save_intermediates=(debug != "none"),
+                image=frame
             )
             if warped is None or not cells:
                 msg = f"{face}: extraction KO"
@@ -205,11 +244,18 @@ def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debu
                 errors[face] = msg
                 continue
 
-            # 3) Analyse couleurs
-            cols = analyze_colors_simple(cells, debug=(debug in ["text", "both"]))
+            # 3) Balance des blancs par face (en place sur warped -> cells = vues) ;
+            #    off par défaut : calibrations capturées sur images non corrigées
+            gains, _wb_src = estimate_face_wb_gains(cells, debug=(debug in ["text", "both"]))
+            if gains is not None:
+                apply_face_wb_gains(warped, gains)
+
+            # 4) Analyse couleurs (tables intégrales Lab/reflets : 1 conversion par face)
+            fi = FaceIntegrals(warped)
+            cols = analyze_colors_simple(cells, debug=(debug in ["text", "both"]), mode=vision_mode, fi=fi)
             cols = [_norm(c) for c in cols]
 
-            # 4) Remplacer les assert par des raise (assert peut être désactivé en prod)
+            # 5) Remplacer les assert par des raise (assert peut être désactivé en prod)
             expected_ij = [(i, j) for i in range(3) for j in range(3)]
             got_ij = [ij for (ij, _roi) in cells]
             if got_ij != expected_ij:
@@ -220,7 +266,15 @@ def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debu
             if len(cols) != 9:
                 raise ValueError(f"{face}: colors doit contenir 9 labels (got {len(cols)})")
 
-            results[face] = FaceResult(colors=cols, cells=cells, warped=warped, roi=roi_data[face])
+            # Features compactes (BGR médian + Lab moyen) + confiances
+            med = cell_medians_bgr(cells)
+            features = np.hstack([med, fi.cells_mean("lab")]).astype(np.float32)
+
+            fr = FaceResult(colors=cols, cells=cells, warped=warped, roi=roi_data[face],
+                            confidences=color_confidences(med, cols), features=features)
+            if not keep_pixels:
+                fr.drop_pixels()
+            results[face] = fr
 
             if debug in ["text","both"]:
                 print(f"{face}: OK -> {cols} (centre {cols[4]})")
@@ -232,7 +286,7 @@ def detect_colors_for_faces(image_folder, roi_data, color_calibration=None, debu
                 raise RuntimeError(f"VISION_FAILED face={face}: {e}") from e
             # sinon on continue (mode debug)
 
-    # 5) En strict: si pas 6 faces -> échec global
+    # 6) En strict: si pas 6 faces -> échec global
     if strict and len(results) != 6:
         raise RuntimeError(f"VISION_INCOMPLETE {len(results)}/6 faces. errors={errors}")
 
@@ -981,14 +1035,17 @@ def f(files, auto=True, settings=None, show=False):
     print(f"\n📊 Résumé: {success_count}/{len(files)} faces traitées avec succès")
     return results
 
-def process_face_with_roi(image_path, roi_coords, face_name, show=False, save_intermediates=True):
+def process_face_with_roi(image_path, roi_coords, face_name, show=False, save_intermediates=True, image=None):
     """Traite une face en utilisant une ROI calibrée.
 
     Compatible 2 formats :
       - bbox: (x1,y1,x2,y2)
       - quad: ((xTL,yTL),(xTR,yTR),(xBR,yBR),(xBL,yBL))
+
+    image : frame BGR déjà en mémoire (ex: archive frame_archive) -> pas de cv2.imread.
     """
-    image = cv2.imread(image_path)
+    if image is None:
+        image = cv2.imread(image_path)
     if image is None:
         print(f"Erreur: impossible de charger {image_path}")
         return None, None
@@ -30,18 +30,23 @@
 #
 #     - convert_to_kociemba(color_results, mode="robot_cam", yaw=0, debug=False)
 #         Façade de conversion FacesDict -> cubestring via la nouvelle implémentation
-#         (_convert_to_kociemba_new).
+#         (_convert_to_kociemba_new). mode="auto" : profil + yaw trouvés par
+#         orientation_search (toutes les lectures testées, centres + cubies).
 #
 #  Étapes clés de conversion (pipeline interne) :
 #     1) Correction repère robot :
 #        - apply_robot_orientation_corrections(..., mode="robot_cam"|"robot_raw"|...)
 #          Applique des rotations 0/90/180/270° face par face (rotate_face_grid / rotate_cells_grid)
-#          pour remettre les grilles 3×3 dans le bon sens.
+#          pour remettre les grilles 3×3 dans le bon sens (faces non tournées partagées,
+#          cells vides tolérées en mode keep_pixels=False).
 #
 #     2) Réorientation “Kociemba” :
 #        - reorient_cube_for_kociemba(corrected, yaw=0|90|180|270)
 #          Réordonne les faces (F/R/B/L) selon un yaw global autour de U/D.
 #
+#     (Chemin rapide hors debug : cube_state.CubeState — profil robot + yaw précalculés
+#      en UNE permutation 54 index, puis encodage par centres via bytes.translate.)
+#
 #     3) Encodage 54 caractères :
 #        - create_color_mapping : construit le mapping couleur -> lettre (centre de chaque face)
 #        - encode_with_mapping  : convertit les 9 couleurs de chaque face en lettres URFDLB
@@ -82,55 +87,51 @@ from calibration_rubiks import load_calibration
 #from calibration_colors import load_color_calibration
 from process_images_cube import detect_colors_for_faces
 from types_shared import FaceResult, FacesDict
+from cube_state import (CubeState, conversion_perm, GRID_ROT_IDX,
+                        ROBOT_ORIENTATION_TABLES, YAW_FACE_MAPS)
 
 from solver_wrapper import solve_cube
 
 def apply_robot_orientation_corrections(robot_results: FacesDict, mode: str = "robot_cam") -> FacesDict:
-    """Applique les rotations selon le profil robot"""
-    tables = {
-        "robot_raw": {"F": 0, "R": 0, "B": 0,   "L": 0,   "U": 0, "D": 0},
-        #"robot_cam": {"F": 0, "R": 0, "B": 180, "L": 180, "U": 0, "D": 0},
-        "robot_cam": {"F":180,"R":180,"B":0,"L":0,"U":180,"D":180},
-        "phone_demo":{"F": 0, "R": 90,"B": 180, "L": 270, "U": 0, "D": 0},
-    }
+    """Applique les rotations selon le profil robot (tables : cube_state.ROBOT_ORIENTATION_TABLES)"""
+    tables = ROBOT_ORIENTATION_TABLES
+    #"robot_cam" historique : {"F": 0, "R": 0, "B": 180, "L": 180, "U": 0, "D": 0}
 
     rotations = tables.get(mode, tables["robot_raw"])
 
     out: FacesDict = {}
     for face_name, fr in robot_results.items():
         rot = rotations.get(face_name, 0) % 360
-        
-        will_rotate = rot != 0 and len(fr.colors) == 9 and len(fr.cells) == 9
-        colors = rotate_face_grid(fr.colors, rot) if will_rotate else fr.colors
-        cells = rotate_cells_grid(fr.cells, rot) if will_rotate else fr.cells
 
-        colors = colors[:] if colors is not None else colors
-        cells = cells[:] if cells is not None else cells
+        # Pas de rotation => on partage le FaceResult (aucune copie)
+        if rot == 0 or len(fr.colors) != 9:
+            out[face_name] = fr
+            continue
+
+        # cells vides si keep_pixels=False (production) : rien à tourner
+        cells = rotate_cells_grid(fr.cells, rot) if len(fr.cells) == 9 else fr.cells
+        conf = rotate_face_grid(fr.confidences, rot) if fr.confidences else fr.confidences
+        feats = fr.features[list(GRID_ROT_IDX[rot])] if fr.features is not None else None
 
         out[face_name] = FaceResult(
-            colors=colors,
+            colors=rotate_face_grid(fr.colors, rot),
             cells=cells,
             warped=fr.warped,
-            roi=fr.roi
+            roi=fr.roi,
+            confidences=conf,
+            features=feats,
         )
     return out
 
 
+
 def rotate_face_grid(face_colors, rotation):
     """Tourne une liste de 9 éléments (row-major) de 0/90/180/270° (horaire)"""
     if not face_colors or len(face_colors) != 9:
         return face_colors
 
-    rot = rotation % 360
-    if rot == 0:
-        idx = [0, 1, 2, 3, 4, 5, 6, 7, 8]
-    elif rot == 90:
-        idx = [6, 3, 0, 7, 4, 1, 8, 5, 2]
-    elif rot == 180:
-        idx = [8, 7, 6, 5, 4, 3, 2, 1, 0]
-    elif rot == 270:
-        idx = [2, 5, 8, 1, 4, 7, 0, 3, 6]
-    else:
+    idx = GRID_ROT_IDX.get(rotation % 360)
+    if idx is None:
         raise ValueError(f"Rotation invalide: {rotation}")
 
     return [face_colors[i] for i in idx]
@@ -141,16 +142,8 @@ def rotate_cells_grid(cells, rotation):
     if not cells or len(cells) != 9:
         return cells
 
-    rot = rotation % 360
-    if rot == 0:
-        idx = [0, 1, 2, 3, 4, 5, 6, 7, 8]
-    elif rot == 90:
-        idx = [6, 3, 0, 7, 4, 1, 8, 5, 2]
-    elif rot == 180:
-        idx = [8, 7, 6, 5, 4, 3, 2, 1, 0]
-    elif rot == 270:
-        idx = [2, 5, 8, 1, 4, 7, 0, 3, 6]
-    else:
+    idx = GRID_ROT_IDX.get(rotation % 360)
+    if idx is None:
         raise ValueError(f"Rotation invalide: {rotation}")
 
     rotated = []
@@ -182,13 +175,7 @@ def reorient_cube_for_kociemba(corrected: FacesDict, yaw: int = 0) -> FacesDict:
     0 / 90 / 180 / 270.
     """
     yaw = yaw % 360
-    maps = {
-        0:   {"F":"F","R":"R","B":"B","L":"L","U":"U","D":"D"},
-        90:  {"F":"R","R":"B","B":"L","L":"F","U":"U","D":"D"},
-        180: {"F":"B","R":"L","B":"F","L":"R","U":"U","D":"D"},
-        270: {"F":"L","R":"F","B":"R","L":"B","U":"U","D":"D"},
-    }
-    m = maps[yaw]
+    m = YAW_FACE_MAPS[yaw]
 
     out: FacesDict = {}
     for src_face, dst_face in m.items():
@@ -360,16 +347,51 @@ def convert_to_kociemba_legacy(color_results: FacesDict,
         return False, None, f"Erreur encodage: {e}"
 
 def convert_to_kociemba(color_results, mode="robot_cam", strategy=None, debug=False, yaw=0):
+    if mode == "auto":
+        return _convert_to_kociemba_auto(color_results, yaw=yaw, debug=debug)
     return _convert_to_kociemba_new(color_results, rot_mode=mode, yaw=yaw, debug=debug)
 
+
+def _convert_to_kociemba_auto(color_results: FacesDict,
+                              yaw: int = 0,
+                              debug: bool = False) -> Tuple[bool, Optional[str], Optional[str]]:
+    """Profil + yaw choisis par recherche exhaustive (orientation_search), robot_cam/yaw préférés."""
+    from orientation_search import search_orientations
+
+    try:
+        res = search_orientations(color_results, prefer_mode="robot_cam", prefer_yaw=yaw)
+    except Exception as e:
+        return False, None, f"Erreur encodage: {e}"
+
+    if debug:
+        print(f"[auto-orient] {res.message}")
+        for r in res.summary()["valid_readings"]:
+            print(f"  - mode={r['mode']} yaw={r['yaw']} classe={r['class']}")
+    if not res.ok:
+        return False, None, f"Auto-orientation: {res.message}"
+    if res.ambiguous:
+        # plusieurs cubes physiques compatibles : en choisir un au hasard ferait résoudre
+        # le mauvais cube -> échec explicite, l’appelant re-scanne
+        by_class: Dict[int, List[str]] = {}
+        for r in res.summary()["valid_readings"]:
+            by_class.setdefault(r["class"], []).append(f"{r['mode']}/yaw={r['yaw']}")
+        detail = "; ".join(f"classe {k}: {', '.join(v)}" for k, v in sorted(by_class.items()))
+        return False, None, f"Auto-orientation ambiguë ({res.classes} cubes possibles : {detail}) -> re-scan"
+    return True, res.best.cube_string, None
+
 def _convert_to_kociemba_new(color_results: FacesDict,
                         rot_mode: str = "robot_cam",
                         yaw: int = 0,
                         debug: bool = False) -> Tuple[bool, Optional[str], Optional[str]]:
     try:
-        corrected  = apply_robot_orientation_corrections(color_results, mode=rot_mode)
-        reoriented = reorient_cube_for_kociemba(corrected, yaw=yaw)
-        _cube_dict, full = encode_with_mapping(reoriented, debug=debug)
+        if debug:
+            corrected  = apply_robot_orientation_corrections(color_results, mode=rot_mode)
+            reoriented = reorient_cube_for_kociemba(corrected, yaw=yaw)
+            _cube_dict, full = encode_with_mapping(reoriented, debug=debug)
+        else:
+            # Chemin rapide : profil + yaw = 1 gather 54 index, puis relabel par centres
+            state = CubeState.from_faces(color_results).permuted(conversion_perm(rot_mode, yaw))
+            full = state.encode_by_centers()
 
         if not validate_cube_string(full):
             return False, None, "Validation basique échouée"
@@ -82,6 +82,7 @@ def console_clean_listener(event: str, data: Dict[str, Any]) -> None:
 
         # execute
         "execute_move", "execution_finished", "execution_stopped", "execution_failed",
+        "execution_refused",
 
         # generic
         "error",
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  robot_move_compiler.py
+#  ----------------------
+#  Objectif :
+#     Compilateur **pur et réentrant** solution Kociemba -> mouvements robot F/S/R,
+#     équivalent à Cubotino_T_moves.robot_required_moves mais sans état global :
+#     Cubotino_T_moves fait évoluer l’orientation du cube dans les globales
+#     h_faces / v_faces (starting_cube_orientation, cube_orient_update), ce qui
+#     interdit deux compilations simultanées (threads du portfolio, re-expression…).
+#
+#  Principe (table de transitions précalculée à l’import) :
+#     - orientation du cube sur le robot = petit entier (0..23), index dans _ORIENTS
+#       (faces solveur aux positions robot L, F, R, U, D ; B = la 6e)
+#     - angle du support = index 0..2 (-90°, 0°, +90°)
+#     - TRANSITIONS[(orient * 3 + angle) * 18 + move] = (séquence robot, orient', angle')
+#       construite une fois en rejouant la logique Cubotino (adapt_move, dictionnaires
+#       moves_dict_home / _cw / _ccw, effets flip/spin, get_new_cube_angle)
+#     - compilation = parcours O(n) de la table + "".join, puis retour du support
+#       au centre (S1/S3) et optimisation flips "type 2" de Cubotino (même règle).
+#
+#  Entrées principales :
+#     - compile_moves(solution, simulation=True, informative=False) -> (moves, tot_moves, opt)
+#         solution au format compact Cubotino "U1R2L3..." (espaces tolérés) ou MoveSeq
+#     - robot_required_moves(solution, solution_Text, simulation, informative=False)
+#         remplaçant direct de Cubotino_T_moves.robot_required_moves (même retour)
+#     - START_UFR / START_AFTER_SCAN : orientations de départ (simulation True / False)
+#
+#  Dépendances :
+#     - Cubotino_T_moves.py : uniquement pour ses dictionnaires de séquences (données)
+#
+#  Notes :
+#     - Résultat identique à Cubotino_T_moves (vérifié sur des solutions aléatoires,
+#       dans les deux orientations de départ).
+#     - Aucune variable globale modifiée après l’import : appelable depuis plusieurs
+#       threads / process en parallèle.
+# ============================================================================
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, Union
+
+from Cubotino_T_moves import moves_dict_ccw, moves_dict_cw, moves_dict_home
+from move_seq import COMPACT_NAMES, MoveSeq
+
+_POS = "LFRUD"                                     # positions robot (ordre de adapt_move)
+_OPP = {"U": "D", "D": "U", "F": "B", "B": "F", "R": "L", "L": "R"}
+_ANGLES = (-90, 0, 90)
+_ANGLE_INDEX = {a: i for i, a in enumerate(_ANGLES)}
+_SEQ_BY_ANGLE = (moves_dict_ccw, moves_dict_home, moves_dict_cw)
+
+MOVE_NAMES: List[str] = COMPACT_NAMES                # index = code MoveSeq FACE
+_MOVE_INDEX: Dict[str, int] = {m: i for i, m in enumerate(MOVE_NAMES)}
+
+# Effet angulaire des S/R (get_new_cube_angle)
+_ANGLE_STEP = {"0": 180, "1": 90, "3": -90, "4": -180}
+
+
+# ---------------------------------------------------------------------------
+# Effets sur l’orientation (chaînes de 5 faces aux positions L F R U D)
+# ---------------------------------------------------------------------------
+def _flip(o: str) -> str:
+    L, F, R, U, D = o
+    return L + U + R + _OPP[F] + F
+
+
+def _spin_ccw(o: str) -> str:
+    L, F, R, U, D = o
+    return F + R + _OPP[F] + U + D
+
+
+def _spin_cw(o: str) -> str:
+    L, F, R, U, D = o
+    return _OPP[F] + L + F + U + D
+
+
+def _apply_seq(o: str, seq: str) -> str:
+    """Orientation après une séquence robot (cube_orient_update)."""
+    for i in range(0, len(seq), 2):
+        cmd, val = seq[i], seq[i + 1]
+        if cmd == "F":
+            for _ in range(int(val)):
+                o = _flip(o)
+        elif cmd == "S":
+            if val == "3":
+                o = _spin_ccw(o)
+            elif val == "4":
+                o = _spin_ccw(_spin_ccw(o))
+            elif val == "0":
+                o = _spin_cw(_spin_cw(o))
+            elif val == "1":
+                o = _spin_cw(o)
+    return o
+
+
+def _seq_angle(seq: str) -> int:
+    return sum(_ANGLE_STEP[seq[i + 1]] for i in range(0, len(seq), 2) if seq[i] in "SR")
+
+
+# ---------------------------------------------------------------------------
+# Construction des tables (une fois, à l’import)
+# ---------------------------------------------------------------------------
+START_UFR_FACES = "LFRUD"           # simulation=True  : cube posé comme le solveur
+START_AFTER_SCAN_FACES = "FUBLR"    # simulation=False : orientation après le scan
+
+_ORIENTS: List[str] = [START_UFR_FACES]
+for _o in _ORIENTS:                 # fermeture par flip / spin (24 orientations)
+    for _nxt in (_flip(_o), _spin_ccw(_o), _spin_cw(_o)):
+        if _nxt not in _ORIENTS:
+            _ORIENTS.append(_nxt)
+_ORIENT_INDEX = {o: i for i, o in enumerate(_ORIENTS)}
+
+START_UFR = _ORIENT_INDEX[START_UFR_FACES]
+START_AFTER_SCAN = _ORIENT_INDEX[START_AFTER_SCAN_FACES]
+
+# (séquence robot, orientation suivante, index d’angle suivant) ; -1 si l’angle sortirait de ±90°
+TRANSITIONS: List[Tuple[str, int, int]] = []
+for _o in _ORIENTS:
+    for _ai, _angle in enumerate(_ANGLES):
+        for _m in MOVE_NAMES:
+            _pos = _POS[_o.index(_m[0])] if _m[0] in _o else "B"     # adapt_move
+            _seq = _SEQ_BY_ANGLE[_ai][_pos + _m[1]]
+            _next_angle = _angle + _seq_angle(_seq)
+            TRANSITIONS.append((_seq, _ORIENT_INDEX[_apply_seq(_o, _seq)],
+                                _ANGLE_INDEX.get(_next_angle, -1)))
+
+_N_MOVES = len(MOVE_NAMES)
+
+
+# ---------------------------------------------------------------------------
+# Optimisation "type 2" (Cubotino optim_moves2, sans reconstruction caractère par caractère)
+# ---------------------------------------------------------------------------
+def _optim_flips(moves: str) -> Tuple[str, int]:
+    """Avant-dernier flip F3 + dernier flip F2 suivis des mêmes mouvements -> F3 devient F1."""
+    f2 = moves.rfind("F")                # 'F' n’apparaît qu’en position de commande
+    if f2 < 0 or moves[f2 + 1] != "2":
+        return moves, 0
+    f3 = moves.rfind("F", 0, f2)
+    if f3 < 0 or moves[f3 + 1] != "3":
+        return moves, 0
+
+    chrs = f2 - f3 - 2                   # caractères entre F3 et F2
+    if chrs != len(moves) - f2 - 2 and "R" in moves[f2 + chrs + 2:]:
+        return moves, 0
+    move1 = moves[f3 + 2:f3 + chrs + 2]
+    move2 = moves[f2 + 2:f2 + chrs + 2]
+    if move1 != move2 and not (("R0" in move1 and move2 == "R4") or ("R4" in move1 and move2 == "R0")):
+        return moves, 0
+    return moves[:f3 + 1] + "1" + moves[f3 + 2:], 1
+
+
+def count_moves(moves: str) -> int:
+    """Nb de mouvements robot (Fk compte k flips, chaque S / R compte 1)."""
+    return sum(int(moves[i + 1]) if moves[i] == "F" else 1 for i in range(0, len(moves) - 1, 2))
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+def compile_blocks(solution: Union[str, MoveSeq], orient: int = START_UFR) -> Tuple[List[str], int, int]:
+    """Séquences robot par bloc solveur + (orientation, angle en degrés) finaux."""
+    table = TRANSITIONS
+    state = orient * 3 + 1                               # angle 0°
+    blocks: List[str] = []
+    for code in MoveSeq.from_compact(solution).codes:
+        seq, orient, ai = table[state * _N_MOVES + code]
+        if ai < 0:
+            raise ValueError(f"Angle support hors ±90° après {MOVE_NAMES[code]!r}")
+        blocks.append(seq)
+        state = orient * 3 + ai
+    return blocks, state // 3, _ANGLES[state % 3]
+
+
+def _finish(blocks: List[str], angle: int, informative: bool) -> Tuple[str, int, Tuple[int, int]]:
+    if angle == -90:
+        blocks = blocks + ["S1"]                         # support ramené au centre
+    elif angle == 90:
+        blocks = blocks + ["S3"]
+    moves, opt2 = _optim_flips("".join(blocks))
+    if opt2 and informative:
+        print("Robot moves string: applied optimization type 2")
+    return moves, count_moves(moves), (0, opt2)
+
+
+def compile_moves(solution: Union[str, MoveSeq], simulation: bool = True,
+                  informative: bool = False) -> Tuple[str, int, Tuple[int, int]]:
+    """Solution compacte "U1R2..." -> (moves "F1R1S3...", nb mouvements robot, (opt1, opt2))."""
+    blocks, _orient, angle = compile_blocks(solution, START_UFR if simulation else START_AFTER_SCAN)
+    return _finish(blocks, angle, informative)
+
+
+def robot_required_moves(solution: str, solution_Text: str, simulation: bool,
+                         informative: bool = False):
+    """Remplaçant réentrant de Cubotino_T_moves.robot_required_moves : (robot, moves, tot, opt)."""
+    if solution_Text == "Error":
+        return {}, "", 0, (0, 0)
+    blocks, _orient, angle = compile_blocks(solution, START_UFR if simulation else START_AFTER_SCAN)
+    moves, tot, opt = _finish(blocks, angle, informative)
+    return dict(enumerate(blocks)), moves, tot, opt
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    sol = sys.argv[1] if len(sys.argv) > 1 else "U2 L1 R1 D2 B2 R1 D2 B2 D2 L3 B3 R3 F2 D3 L1 U2 F2 D3 B3 D1"
+    t0 = time.perf_counter()
+    moves, tot, opt = compile_moves(sol, simulation=True)
+    dt_us = (time.perf_counter() - t0) * 1e6
+    print(f"{moves}\n{tot} mouvements robot, opt={opt} ({dt_us:.0f} µs)")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  robot_move_peephole.py
+#  ----------------------
+#  Objectif :
+#     Optimiseur **peephole** générique des chaînes robot F/S/R, à base de règles
+#     sur une liste de tokens (remplace les passes mono-motif de Cubotino :
+#     optim_moves1 désactivée, optim_moves2 "F3…F2").
+#
+#  Règles (fenêtre de 2 tokens, angle du support suivi tout au long) :
+#     - merge_flips    : Fa Fb -> F((a+b) mod 4)            (F0 supprimé)
+#     - cancel_spins   : Sx Sy -> spin net (S1/S3/S0/S4) ou rien si net = 0
+#     - fold_rotations : Rx Ry -> rotation nette (R0/R4 si ±180°) ou rien si net = 0
+#     - trailing_home  : F/S après la dernière rotation (retour du support au centre,
+#                        réorientation) supprimés si le cycle suivant re-centre de
+#                        toute façon (rehome_next ; la capture commence par reset_initial)
+#     Un remplacement n’est retenu que s’il est légal pour le support (angle dans
+#     ±90°, S0/R0 depuis -90° seulement, S4/R4 depuis +90°) et si le simulateur
+#     (robot_move_sim.plan_permutation) confirme le même effet sur le cube.
+#     Gain d’une réécriture = temps de la séquence avant - après (estimate_robot_seconds :
+#     modèle servo_timing, qui dépend de l’angle du support, ou move_time_s).
+#
+#  Entrées principales :
+#     - optimize_moves(moves, rehome_next=False, move_time_s=None) -> PeepholeResult
+#         moves optimisés + secondes servo gagnées / nb d’applications par règle
+#         + réécritures rejetées par la vérification
+#     - tokenize(moves) / detokenize(tokens)
+#
+#  Exécution directe :
+#     python robot_move_peephole.py "F1F2S1S3R1R1..." [--rehome]
+# ============================================================================
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from cube_state import Perm
+from move_seq import MoveSeq
+from robot_move_sim import plan_permutation
+
+Token = Tuple[str, int]
+
+_DELTA = {1: 90, 3: -90, 0: 180, 4: -180}
+
+
+@dataclass
+class PeepholeResult:
+    moves: str
+    before_s: float
+    after_s: float
+    saved_s: Dict[str, float] = field(default_factory=dict)
+    applied: Dict[str, int] = field(default_factory=dict)
+    rejected: int = 0
+
+    @property
+    def total_saved_s(self) -> float:
+        return self.before_s - self.after_s
+
+
+def tokenize(moves: Union[str, MoveSeq]) -> List[Token]:
+    return MoveSeq.from_robot(moves).pairs()
+
+
+def detokenize(tokens: List[Token]) -> str:
+    return "".join(f"{c}{v}" for c, v in tokens)
+
+
+def _holder(cmd: str, angle: int, net: int) -> Optional[List[Token]]:
+    """Commande unique réalisant `net` degrés depuis `angle` (None si illégal)."""
+    if net == 0:
+        return []
+    code = {90: 1, -90: 3, 180: 0, -180: 4}.get(net)
+    if code is None or not -90 <= angle + net <= 90:
+        return None
+    return [(cmd, code)]
+
+
+# ---------------------------------------------------------------------------
+# Règles : (tokens, i, angle avant tokens[i]) -> (remplacement, nb consommés) | None
+# ---------------------------------------------------------------------------
+def _merge_flips(tokens: List[Token], i: int, angle: int):
+    if i + 1 < len(tokens) and tokens[i][0] == "F" and tokens[i + 1][0] == "F":
+        k = (tokens[i][1] + tokens[i + 1][1]) % 4
+        return ([("F", k)] if k else []), 2
+    return None
+
+
+def _fold(cmd: str):
+    def rule(tokens: List[Token], i: int, angle: int):
+        if i + 1 < len(tokens) and tokens[i][0] == cmd and tokens[i + 1][0] == cmd:
+            rep = _holder(cmd, angle, _DELTA[tokens[i][1]] + _DELTA[tokens[i + 1][1]])
+            if rep is not None:
+                return rep, 2
+        return None
+    return rule
+
+
+def _trailing_home(tokens: List[Token], i: int, angle: int):
+    rest = tokens[i:]
+    if rest and all(c in "FS" for c, _v in rest) and (i == 0 or tokens[i - 1][0] == "R"):
+        return [], len(rest)
+    return None
+
+
+RULES: List[Tuple[str, Callable]] = [
+    ("merge_flips", _merge_flips),
+    ("cancel_spins", _fold("S")),
+    ("fold_rotations", _fold("R")),
+]
+
+
+# ---------------------------------------------------------------------------
+# Vérifications
+# ---------------------------------------------------------------------------
+def _legal(tokens: List[Token]) -> bool:
+    angle = 0
+    for c, v in tokens:
+        if c in "SR":
+            if v not in _DELTA:
+                return False
+            angle += _DELTA[v]
+            if not -90 <= angle <= 90:
+                return False
+        elif c != "F" or v < 0:
+            return False
+    return True
+
+
+def _effect(moves: str) -> Perm:
+    return plan_permutation(moves)
+
+
+# ---------------------------------------------------------------------------
+# Optimisation
+# ---------------------------------------------------------------------------
+def optimize_moves(moves: Union[str, MoveSeq], rehome_next: bool = False,
+                   move_time_s: Optional[dict] = None) -> PeepholeResult:
+    """Applique les règles jusqu’à point fixe ; chaque réécriture est vérifiée."""
+    from robot_moves_cubotino import estimate_robot_seconds
+
+    def cost(toks: List[Token]) -> float:
+        return estimate_robot_seconds(detokenize(toks), move_time_s)
+
+    tokens = tokenize(moves)
+    moves = detokenize(tokens)
+    if not _legal(tokens):
+        return PeepholeResult(moves=moves, before_s=0.0, after_s=0.0)   # non exécutable : inchangé
+    ref = _effect(moves)
+    rules = RULES + ([("trailing_home", _trailing_home)] if rehome_next else [])
+    res = PeepholeResult(moves=moves, before_s=cost(tokens), after_s=0.0)
+    current_s = res.before_s
+
+    changed = True
+    while changed:
+        changed = False
+        angle = 0
+        i = 0
+        while i < len(tokens):
+            for name, rule in rules:
+                hit = rule(tokens, i, angle)
+                if hit is None:
+                    continue
+                rep, n = hit
+                cand = tokens[:i] + rep + tokens[i + n:]
+                if not _legal(cand) or _effect(detokenize(cand)) != ref:
+                    res.rejected += 1
+                    continue
+                cand_s = cost(cand)
+                if cand_s > current_s:
+                    continue                   # légale mais plus lente (angle du support)
+                saved, current_s = current_s - cand_s, cand_s
+                res.saved_s[name] = res.saved_s.get(name, 0.0) + saved
+                res.applied[name] = res.applied.get(name, 0) + 1
+                tokens = cand
+                changed = True
+                break
+            else:
+                c, v = tokens[i]
+                if c in "SR":
+                    angle += _DELTA[v]
+                i += 1
+                continue
+            # réécriture appliquée : on reprend depuis le début (angles à recalculer)
+            break
+
+    res.moves = detokenize(tokens)
+    res.after_s = current_s
+    return res
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Optimiseur peephole F/S/R")
+    ap.add_argument("moves")
+    ap.add_argument("--rehome", action="store_true", help="le cycle suivant re-centre le support")
+    args = ap.parse_args()
+
+    r = optimize_moves(args.moves, rehome_next=args.rehome)
+    print(f"avant : {args.moves}  (~{r.before_s:.1f}s)")
+    print(f"après : {r.moves}  (~{r.after_s:.1f}s, -{r.total_saved_s:.1f}s, {r.rejected} rejet(s))")
+    for name, s in r.saved_s.items():
+        print(f"  {name:15s} ×{r.applied[name]}  -{s:.1f}s")
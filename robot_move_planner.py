@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  robot_move_planner.py
+#  ---------------------
+#  Objectif :
+#     Planificateur **optimal** des mouvements robot F/S/R : au lieu de traduire
+#     chaque mouvement solveur de façon gloutonne (moves_dict_home / _cw / _ccw
+#     selon l’angle courant, puis optim_moves2 sur le dernier motif de flips),
+#     on cherche sur toute la solution la suite de commandes qui minimise le
+#     **temps servo prédit**.
+#
+#  Graphe :
+#     - nœud = (orientation du cube 0..23, angle du support -90/0/+90)
+#       (le capot n’est pas une dimension : chaque primitive F/S/R se termine
+#        capot ouvert sur ce robot, cf. robot_moves_cubotino._do_*)
+#     - arêtes de repositionnement : F1 (flip), S1/S3 (spin 90°), S0/S4 (spin 180°)
+#       selon l’angle, coût = temps servo de la commande depuis cet angle
+#       (servo_timing : spin_out / spin_mid, rotate_out / rotate_mid n’ont pas la même durée)
+#     - un mouvement solveur X^k est réalisé par : repositionnement (plus court
+#       chemin précalculé, Dijkstra depuis chacun des 72 nœuds) amenant X en bas,
+#       puis une rotation R (R1/R3 : quart de tour, R0/R4 : demi-tour)
+#     - programmation dynamique sur la solution (72 nœuds par étape) ; deux
+#       mouvements consécutifs sur le même axe (ex. "U2 D") commutent : les deux
+#       ordres sont évalués (généralise l’optimisation "type 2" de Cubotino)
+#     - fin : support ramené au centre (S1/S3), comme Cubotino
+#
+#  Entrées principales :
+#     - plan_moves(solution, simulation=True, move_time_s=None) -> (moves, tot_moves)
+#         solution au format compact Cubotino "U1R2L3..." ou MoveSeq ; sortie "F2R1S3..."
+#         directement exécutable par execute_robot_moves ; move_time_s=None -> modèle
+#         servo_timing, dict {"F", "S", "R"} -> coûts moyens indépendants de l’angle
+#     - decode_moves(moves, simulation=True) -> List[str]
+#         mouvements solveur effectivement réalisés par une chaîne F/S/R (vérification)
+#
+#  Notes :
+#     - Chaque plan est vérifié (robot_move_sim.plan_permutation) avant d’être retourné ;
+#       en cas d’écart, ValueError (l’appelant retombe sur le compilateur Cubotino).
+#     - Tables de plans mises en cache par jeu de coûts (lru_cache).
+# ============================================================================
+
+from __future__ import annotations
+
+import heapq
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+from robot_move_compiler import (
+    MOVE_NAMES, START_AFTER_SCAN, START_UFR, _ORIENT_INDEX, _ORIENTS,
+    _flip, _spin_ccw, _spin_cw, count_moves,
+)
+from move_seq import MoveSeq
+from servo_timing import get_servo_model
+
+_ANGLES = (-90, 0, 90)
+_HOLDER_POS = ("left", "mid", "right")           # robot_servo.cube_pos par index d’angle
+_N_STATES = len(_ORIENTS) * 3
+
+# Orientation -> orientation après une primitive
+_FLIP = [_ORIENT_INDEX[_flip(o)] for o in _ORIENTS]
+_CW = [_ORIENT_INDEX[_spin_cw(o)] for o in _ORIENTS]
+_CCW = [_ORIENT_INDEX[_spin_ccw(o)] for o in _ORIENTS]
+_BOTTOM = [o[4] for o in _ORIENTS]                 # face solveur en position D (tournée par R)
+
+# Codes S/R : (index d’angle de départ, index d’arrivée, nb de quarts CW du support)
+_HOLDER_CODES = {
+    "1": ((0, 1), (1, 2)),       # +90
+    "3": ((2, 1), (1, 0)),       # -90
+    "0": ((0, 2),),              # +180 (depuis -90 uniquement)
+    "4": ((2, 0),),              # -180 (depuis +90 uniquement)
+}
+_R_TURN = {"1": "1", "3": "3", "0": "2", "4": "2"}
+_AXIS = {"U": 0, "D": 0, "R": 1, "L": 1, "F": 2, "B": 2}
+
+
+def _spin(orient: int, code: str) -> int:
+    if code == "1":
+        return _CW[orient]
+    if code == "3":
+        return _CCW[orient]
+    if code == "0":
+        return _CW[_CW[orient]]
+    return _CCW[_CCW[orient]]
+
+
+def _merge_flips(tokens: List[str]) -> str:
+    out: List[str] = []
+    n_flip = 0
+    for t in tokens:
+        if t == "F1":
+            n_flip += 1
+            continue
+        if n_flip:
+            out.append(f"F{n_flip}")
+            n_flip = 0
+        out.append(t)
+    if n_flip:
+        out.append(f"F{n_flip}")
+    return "".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Tables (par jeu de coûts)
+# ---------------------------------------------------------------------------
+def _reposition_paths(cost: Dict[str, float]) -> List[Dict[int, Tuple[float, List[str]]]]:
+    """Plus courts chemins flips/spins depuis chaque nœud : [src][dst] = (coût, tokens)."""
+    out = []
+    for src in range(_N_STATES):
+        best: Dict[int, Tuple[float, List[str]]] = {}
+        heap = [(0.0, 0, src, [])]
+        while heap:
+            c, n_tok, node, path = heapq.heappop(heap)
+            if node in best:
+                continue
+            best[node] = (c, path)
+            orient, ai = divmod(node, 3)
+            # flip : au plus 3 d’affilée (4 = identité)
+            if path[-3:] != ["F1"] * 3:
+                heapq.heappush(heap, (c + cost["F"], n_tok + 1, _FLIP[orient] * 3 + ai, path + ["F1"]))
+            for code, spans in _HOLDER_CODES.items():
+                for a0, a1 in spans:
+                    if a0 == ai:
+                        heapq.heappush(heap, (c + cost[f"S{code}@{a0}"], n_tok + 1,
+                                              _spin(orient, code) * 3 + a1, path + [f"S{code}"]))
+        out.append(best)
+    return out
+
+
+@lru_cache(maxsize=8)
+def _plan_table(costs: Tuple[Tuple[str, float], ...]):
+    """PLAN[node][move] = [(coût, séquence, nœud suivant)] (meilleure par nœud suivant)."""
+    cost_of = dict(costs)
+    paths = _reposition_paths(cost_of)
+    table = []
+    for src in range(_N_STATES):
+        per_move = []
+        for m in MOVE_NAMES:
+            face, turn = m[0], m[1]
+            best: Dict[int, Tuple[float, str]] = {}
+            for mid, (cost, path) in paths[src].items():
+                orient, ai = divmod(mid, 3)
+                if _BOTTOM[orient] != face:
+                    continue
+                for code, spans in _HOLDER_CODES.items():
+                    if _R_TURN[code] != turn:
+                        continue
+                    for a0, a1 in spans:
+                        if a0 != ai:
+                            continue
+                        dst = orient * 3 + a1
+                        c = cost + cost_of[f"R{code}@{a0}"]
+                        if dst not in best or c < best[dst][0]:
+                            best[dst] = (c, _merge_flips(path + [f"R{code}"]))
+            per_move.append([(c, seq, dst) for dst, (c, seq) in best.items()])
+        table.append(per_move)
+    return table
+
+
+def _costs(move_time_s: Optional[dict]) -> Tuple[Tuple[str, float], ...]:
+    """Coût de chaque commande selon l’angle de départ : (("F", s), ("R1@1", s), ...)."""
+    model = None if move_time_s else get_servo_model()
+    flat = {}
+    if model is None:
+        from robot_moves_cubotino import DEFAULT_MOVE_TIME_S
+        flat = dict(DEFAULT_MOVE_TIME_S)
+        flat.update(move_time_s)
+    cost = {"F": float(flat["F"]) if model is None else model.seconds("flip")}
+    for cmd in "SR":
+        for code, spans in _HOLDER_CODES.items():
+            for a0, _a1 in spans:
+                cost[f"{cmd}{code}@{a0}"] = (float(flat[cmd]) if model is None
+                                             else model.command(cmd, int(code), _HOLDER_POS[a0])[1])
+    return tuple(sorted(cost.items()))
+
+
+# ---------------------------------------------------------------------------
+# Planification
+# ---------------------------------------------------------------------------
+def _advance(layer: Dict[int, Tuple[float, str]], moves: List[int], table) -> Dict[int, Tuple[float, str]]:
+    for m in moves:
+        nxt: Dict[int, Tuple[float, str]] = {}
+        for node, (cost, seq) in layer.items():
+            for c, step, dst in table[node][m]:
+                total = cost + c
+                if dst not in nxt or total < nxt[dst][0]:
+                    nxt[dst] = (total, seq + step)
+        layer = nxt
+    return layer
+
+
+def _groups(moves: List[int]) -> List[List[int]]:
+    """Mouvements consécutifs sur le même axe (commutent entre eux)."""
+    out: List[List[int]] = []
+    for m in moves:
+        if out and _AXIS[MOVE_NAMES[m][0]] == _AXIS[MOVE_NAMES[out[-1][-1]][0]]:
+            out[-1].append(m)
+        else:
+            out.append([m])
+    return out
+
+
+def plan_moves(solution: Union[str, MoveSeq], simulation: bool = True,
+               move_time_s: Optional[dict] = None) -> Tuple[str, int]:
+    """Solution compacte "U1R2..." ou MoveSeq -> (moves F/S/R de temps servo minimal, nb mouvements robot)."""
+    solution = MoveSeq.from_compact(solution)
+    moves = list(solution.codes)
+
+    costs = _costs(move_time_s)
+    cost_of = dict(costs)
+    table = _plan_table(costs)
+    start = (START_UFR if simulation else START_AFTER_SCAN) * 3 + 1
+    layer: Dict[int, Tuple[float, str]] = {start: (0.0, "")}
+
+    for group in _groups(moves):
+        nxt = _advance(layer, group, table)
+        if len(group) == 2:
+            for dst, (c, seq) in _advance(layer, group[::-1], table).items():
+                if dst not in nxt or c < nxt[dst][0]:
+                    nxt[dst] = (c, seq)
+        layer = nxt
+
+    # support ramené au centre
+    finals = []
+    for node, (cost, seq) in layer.items():
+        ai = node % 3
+        if ai == 0:
+            cost, seq = cost + cost_of["S1@0"], seq + "S1"
+        elif ai == 2:
+            cost, seq = cost + cost_of["S3@2"], seq + "S3"
+        finals.append((cost, len(seq), seq))
+    _cost, _n, best = min(finals)
+
+    if not _same_effect(solution, best, simulation):
+        raise ValueError(f"plan robot incohérent pour {solution.to_compact()!r}: {best!r}")
+    return best, count_moves(best)
+
+
+# ---------------------------------------------------------------------------
+# Vérification
+# ---------------------------------------------------------------------------
+def decode_moves(moves: str, simulation: bool = True) -> List[str]:
+    """Mouvements solveur (Singmaster) réalisés par une chaîne F/S/R."""
+    orient = START_UFR if simulation else START_AFTER_SCAN
+    out: List[str] = []
+    for i in range(0, len(moves) - 1, 2):
+        cmd, val = moves[i], moves[i + 1]
+        if cmd == "F":
+            for _ in range(int(val)):
+                orient = _FLIP[orient]
+        elif cmd == "S":
+            orient = _spin(orient, val)
+        elif cmd == "R":
+            out.append(_BOTTOM[orient] + {"1": "", "3": "'", "2": "2"}[_R_TURN[val]])
+        else:
+            raise ValueError(f"Commande robot inconnue: {cmd}{val}")
+    return out
+
+
+def _same_effect(solution: MoveSeq, moves: str, simulation: bool) -> bool:
+    from robot_move_sim import plan_permutation, solution_permutation   # import circulaire
+
+    try:
+        return plan_permutation(moves, "UFR" if simulation else "LUB") == solution_permutation(solution)
+    except ValueError:
+        return False                   # plan illégal pour le support
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from robot_move_compiler import compile_moves
+    from robot_moves_cubotino import estimate_robot_seconds
+
+    sol = sys.argv[1] if len(sys.argv) > 1 else "U2 L1 R1 D2 B2 R1 D2 B2 D2 L3 B3 R3 F2 D3 L1 U2 F2 D3 B3 D1"
+    greedy, n_greedy, _opt = compile_moves(sol)
+    t0 = time.perf_counter()
+    planned, n_planned = plan_moves(sol)
+    dt_ms = (time.perf_counter() - t0) * 1e3
+    print(f"cubotino : {greedy}  ({n_greedy} mvts, ~{estimate_robot_seconds(greedy):.1f}s)")
+    print(f"optimal  : {planned}  ({n_planned} mvts, ~{estimate_robot_seconds(planned):.1f}s, {dt_ms:.1f} ms)")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  robot_move_sim.py
+#  -----------------
+#  Objectif :
+#     Simulateur **virtuel** des chaînes robot F/S/R : rejoue un plan sur les
+#     54 facelets (ordre Kociemba URFDLB) avec la sémantique de l’exécuteur
+#     (robot_moves_cubotino._do_flip / _do_spin / _do_rotate) et vérifie que le
+#     cube scanné finit résolu — sans une seconde de servo.
+#
+#  Principe :
+#     - état robot = (orientation du cube 0..23, position du support left/mid/right)
+#     - STEP[état][token] = (gather 54 index | None, état suivant) précalculé à l’import :
+#         * F/S ne changent que l’orientation (le cube ne bouge pas dans le repère solveur)
+#         * R tourne la face solveur en position D (MOVE_PERMS, itemgetter C)
+#         * S/R illégaux pour le support (S1 à droite, S0 hors gauche, …) -> erreur,
+#           comme RuntimeError côté exécuteur
+#     - un plan = quelques dizaines de lookups + un itemgetter par R (~µs)
+#
+#  Entrées principales :
+#     - simulate(moves, cube, start_mode="UFR") -> SimResult (état final, résolu, erreur)
+#         moves : chaîne "F1R1S3..." ou MoveSeq ROBOT
+#     - plan_permutation(moves, start_mode="UFR") -> Perm (gather du plan, en cache)
+#     - verify_plan(moves, cube=None, solution=None, start_mode="UFR") -> SimResult
+#         cube     : le plan doit résoudre le cube scanné
+#         solution : le plan doit réaliser la solution Singmaster (même permutation)
+#     - PlanVerificationError : levée par execute_solution avant tout mouvement servo
+#
+#  Config (config.json -> robot.verify) :
+#     enabled : vérification avant exécution (execute_solution)
+#
+#  Exécution directe :
+#     python robot_move_sim.py "F1R1S3..." [--cube URFDLB...] [--start LUB]
+# ============================================================================
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Optional, Tuple, Union
+
+from cube_state import IDENTITY, MOVE_PERMS, Perm, compose
+from move_seq import FACE_NAMES, ROBOT_NAMES, MoveSeq
+from robot_move_compiler import START_AFTER_SCAN, START_UFR, _ORIENTS
+from robot_move_planner import _BOTTOM, _FLIP, _spin
+
+HOLDER_POS = ("left", "mid", "right")
+_POS_INDEX = {p: i for i, p in enumerate(HOLDER_POS)}
+
+# (code S/R, index de position) -> index suivant ; absent = illégal (cf. _do_spin / _do_rotate)
+_HOLDER_NEXT = {("1", 1): 2, ("1", 0): 1, ("3", 1): 0, ("3", 2): 1, ("0", 0): 2, ("4", 2): 0}
+_R_SUFFIX = {"1": "", "3": "'", "0": "2", "4": "2"}
+
+TOKENS: List[str] = ["F1", "F2", "F3"] + [c + v for c in "SR" for v in "1304"]
+_TOKEN_INDEX = {t: i for i, t in enumerate(TOKENS)}
+_N_TOK = len(TOKENS)
+# code MoveSeq ROBOT -> index de token (F0/F4 = identité -> None ; S2/R2… absents)
+_CODE_TOKEN = {code: (_TOKEN_INDEX[f"F{int(name[1]) % 4}"] if int(name[1]) % 4 else None)
+               if name[0] == "F" else _TOKEN_INDEX[name]
+               for code, name in ROBOT_NAMES.items() if name[0] == "F" or name in _TOKEN_INDEX}
+
+
+class PlanVerificationError(RuntimeError):
+    """Plan robot refusé par le simulateur (illégal, ou ne résout pas le cube)."""
+
+
+@dataclass
+class SimResult:
+    ok: bool                      # plan exécutable (positions du support respectées)
+    solved: bool                  # cube final résolu (si un cube a été fourni)
+    final: str                    # facelets finales ("" sans cube)
+    orient: int = -1              # orientation finale (index _ORIENTS)
+    holder: str = ""              # position finale du support
+    error: str = ""
+    index: int = 0                # 1-based, commande fautive (0 = aucune)
+
+
+def _build_step() -> List[Tuple[Optional[itemgetter], int]]:
+    step = []
+    for orient in range(len(_ORIENTS)):
+        for pi in range(3):
+            for tok in TOKENS:
+                cmd, val = tok[0], tok[1]
+                if cmd == "F":
+                    o = orient
+                    for _ in range(int(val)):
+                        o = _FLIP[o]
+                    step.append((None, o * 3 + pi))
+                    continue
+                nxt = _HOLDER_NEXT.get((val, pi))
+                if nxt is None:
+                    step.append((None, -1))
+                elif cmd == "S":
+                    step.append((None, _spin(orient, val) * 3 + nxt))
+                else:
+                    perm = MOVE_PERMS[_BOTTOM[orient] + _R_SUFFIX[val]]
+                    step.append((itemgetter(*perm), orient * 3 + nxt))
+    return step
+
+
+STEP = _build_step()
+
+
+def _start(start_mode: str) -> int:
+    return START_UFR if start_mode.upper() == "UFR" else START_AFTER_SCAN
+
+
+def _tokens(moves: Union[str, MoveSeq]) -> List[int]:
+    if isinstance(moves, str):
+        moves = moves.replace(" ", "")
+    try:
+        toks = [_CODE_TOKEN[c] for c in MoveSeq.from_robot(moves).codes]
+    except KeyError as e:
+        raise ValueError(f"Commande robot inconnue: {ROBOT_NAMES[e.args[0]]}") from None
+    return [t for t in toks if t is not None]
+
+
+def simulate(moves: Union[str, MoveSeq], cube: Optional[str] = None, start_mode: str = "UFR",
+             holder: str = "mid") -> SimResult:
+    """Rejoue le plan ; cube = facelets URFDLB (None : légalité + orientation seulement)."""
+    state = _start(start_mode) * 3 + _POS_INDEX[holder]
+    facelets = tuple(cube) if cube is not None else None
+    step = STEP
+    for n, t in enumerate(_tokens(moves), start=1):
+        getter, nxt = step[state * _N_TOK + t]
+        if nxt < 0:
+            return SimResult(False, False, "", state // 3, HOLDER_POS[state % 3],
+                             f"{TOKENS[t]} impossible support {HOLDER_POS[state % 3]}", n)
+        if getter is not None and facelets is not None:
+            facelets = getter(facelets)
+        state = nxt
+    final = "".join(facelets) if facelets is not None else ""
+    solved = bool(final) and all(final[9 * i:9 * i + 9].count(final[9 * i + 4]) == 9 for i in range(6))
+    return SimResult(True, solved, final, state // 3, HOLDER_POS[state % 3])
+
+
+@lru_cache(maxsize=4096)
+def plan_permutation(moves: Union[str, MoveSeq], start_mode: str = "UFR", holder: str = "mid") -> Perm:
+    """Gather 54 index réalisé par le plan (ValueError si illégal)."""
+    state = _start(start_mode) * 3 + _POS_INDEX[holder]
+    perm: Perm = IDENTITY
+    for n, t in enumerate(_tokens(moves), start=1):
+        _getter, nxt = STEP[state * _N_TOK + t]
+        if nxt < 0:
+            raise ValueError(f"{TOKENS[t]} (commande {n}) impossible support {HOLDER_POS[state % 3]}")
+        if TOKENS[t][0] == "R":
+            perm = compose(perm, MOVE_PERMS[_BOTTOM[state // 3] + _R_SUFFIX[TOKENS[t][1]]])
+        state = nxt
+    return perm
+
+
+@lru_cache(maxsize=4096)
+def solution_permutation(solution: Union[str, MoveSeq]) -> Perm:
+    perm: Perm = IDENTITY
+    for code in MoveSeq.from_singmaster(solution).codes:
+        perm = compose(perm, MOVE_PERMS[FACE_NAMES[code]])
+    return perm
+
+
+def verify_plan(moves: Union[str, MoveSeq], cube: Optional[str] = None,
+                solution: Union[str, MoveSeq, None] = None, start_mode: str = "UFR") -> SimResult:
+    """Vérifie un plan avant exécution ; PlanVerificationError si refusé."""
+    res = simulate(moves, cube, start_mode)
+    if not res.ok:
+        raise PlanVerificationError(f"plan illégal : {res.error} (commande {res.index})")
+    if solution is not None and plan_permutation(moves, start_mode) != solution_permutation(solution):
+        raise PlanVerificationError("le plan robot ne réalise pas la solution")
+    if cube is not None and not res.solved:
+        raise PlanVerificationError(f"le plan robot ne résout pas le cube (final {res.final})")
+    return res
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="Simulateur virtuel des plans robot F/S/R")
+    ap.add_argument("moves")
+    ap.add_argument("--cube", default=None, help="facelets URFDLB à résoudre")
+    ap.add_argument("--start", default="UFR", help="UFR (simulation) ou LUB (après scan)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    r = simulate(args.moves, args.cube, args.start)
+    dt_us = (time.perf_counter() - t0) * 1e6
+    if not r.ok:
+        print(f"❌ {r.error} (commande {r.index})")
+    elif args.cube:
+        print(("✅ résolu" if r.solved else f"❌ non résolu : {r.final}") + f"  ({dt_us:.0f} µs)")
+    else:
+        print(f"✅ légal, support final {r.holder}  ({dt_us:.0f} µs)")
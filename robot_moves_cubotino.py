@@ -13,19 +13,39 @@
 #       - propose aussi des helpers dédiés à la **capture des faces** (yaw/return).
 #
 #  Dépendances :
-#     - Cubotino_T_moves.py (obligatoire) : robot_required_moves(...) (conversion Kociemba -> F/S/R)
+#     - robot_move_compiler.py : compilation réentrante (table de transitions, sans globales),
+#       construite sur les tables de séquences de Cubotino_T_moves.py (Kociemba -> F/S/R)
+#     - robot_move_planner.py : planification optimale en temps servo (config robot.planner)
+#     - robot_move_peephole.py : réécritures locales vérifiées (config robot.peephole)
+#     - servo_timing.py : modèle de temps servo (estimation, ETA d’exécution)
+#     - servo_timeline.py : exécution sur ligne de temps (phases couvercle / plateau
+#       chevauchées, thread servo dédié, config robot.timeline)
+#     - robot_move_sim.py : simulateur virtuel (vérification du plan avant exécution)
+#     - robot_plan_cache.py : mémoïsation des plans compilés
+#     - move_seq.py : MoveSeq (codes array('B')), représentation partagée solution / robot
 #     - robot_servo.py (optionnel) : pilotage réel des servos (sinon mode simulation / Windows)
 #
 #  Entrées principales (API “exécution solution”) :
 #     - execute_solution(singmaster, start_mode="UFR", dry_run=False, verbose=True,
-#                        stop_flag=None, progress_callback=None) -> str
+#                        stop_flag=None, progress_callback=None, cube_string=None) -> str
 #         Point d’entrée utilisateur :
 #           * compile_robot_moves(...) -> moves_str "F1S3R1..."
+#           * verify_plan(...) (robot_move_sim, config robot.verify) : plan refusé
+#             (PlanVerificationError) avant tout mouvement s’il ne réalise pas la
+#             solution ou ne résout pas cube_string
 #           * execute_robot_moves(...) -> exécution step-by-step
 #         Retourne la chaîne de moves F/S/R exécutée.
 #
-#     - compile_robot_moves(singmaster, start_mode="UFR", informative=False) -> (moves_str, tot_moves)
+#     - compile_robot_moves(singmaster, start_mode="UFR", informative=False, planner=None,
+#                           use_cache=None) -> (moves_str, tot_moves)
 #         Compile uniquement (sans exécution) une solution Singmaster en mouvements robot.
+#         planner : "cubotino" (traduction gloutonne d’origine) ou "optimal"
+#         (plus court chemin en temps servo) ; défaut : config robot.planner.
+#         Mémoïsé par robot_plan_cache (LRU + sqlite, config robot.plan_cache).
+#
+#     - estimate_robot_seconds(moves_str, move_time_s=None) -> float
+#         Temps servo estimé (modèle servo_timing, ou coût moyen par commande F/S/R si
+#         move_time_s est fourni), pour comparer des solutions.
 #
 #  Parsing / normalisation Singmaster :
 #     - parse_singmaster(solution) -> List[str]
@@ -48,8 +68,13 @@
 #           * Sx : spin du cube (capot ouvert)
 #           * Rx : rotation layer bas (capot fermé)
 #         Émet des événements progress_callback :
-#           - "execute_move" (status executing/completed)
+#           - "execute_move" (status executing/completed) avec elapsed_s / eta_s
+#             (temps restant prédit par servo_timing) ; completed porte aussi
+#             primitive / count / duration_s (calibration : servo_timing.py calibrate)
 #           - "execution_finished" / "execution_stopped"
+#         Si robot.timeline.enabled (hors dry-run) : plan joué par servo_timeline
+#         (mêmes consignes, phases des deux servos chevauchées) ; événements
+#         identiques avec timeline=True (ignorés par la calibration servo_timing).
 #
 #  Options d’exécution :
 #     - ExecOptions(start_mode="UFR", dry_run=False, verbose=True)
@@ -81,22 +106,25 @@ from __future__ import annotations
 from dataclasses import dataclass
 import re
 import platform
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Tuple, Union
 import time
 
-# ---------------------------------------------------------------------------
-# Import Cubotino converter (fortement réutilisé)
-# ---------------------------------------------------------------------------
+from move_seq import MoveSeq
+from robot_move_compiler import compile_moves, count_moves
+from robot_move_peephole import optimize_moves
+from robot_move_planner import plan_moves
+from robot_move_sim import PlanVerificationError, verify_plan
+from robot_plan_cache import get_plan_cache, plan_cache_enabled, plan_version
+from servo_timeline import compile_timeline, emitted_state, get_executor, timeline_enabled
+from servo_timing import get_servo_model
 
-try:
-    import Cubotino_T_moves as cub_moves  # type: ignore
-except Exception as e:  # pragma: no cover
-    raise ImportError(
-        "Impossible d'importer Cubotino_T_moves.py.\n"
-        "→ Copie `Cubotino_T_moves.py` dans le même dossier que ce fichier,\n"
-        "  OU ajoute son dossier au PYTHONPATH.\n"
-        f"Détail import: {e}"
-    )
+
+def _robot_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"robot.{key}", default)
+    except Exception:
+        return default
 
 # Import matériel
 try:
@@ -201,25 +229,7 @@ def singmaster_to_cubotino_kociemba(tokens: Iterable[str]) -> str:
     Donc ici on *refuse* x/y/z dans l'entrée : le solveur renvoie normalement
     seulement URFDLB.
     """
-    out: List[str] = []
-    for t in tokens:
-        if not t:
-            continue
-        face = t[0]
-        if face in ("x", "y", "z"):
-            raise ValueError(
-                "La solution contient des rotations de cube (x/y/z). "
-                "Pour un robot Cubotino-like, donne une solution uniquement en URFDLB."
-            )
-        if face not in "URFDLB":
-            raise ValueError(f"Face invalide: {t}")
-        if t.endswith("2"):
-            out.append(face + "2")
-        elif t.endswith("'"):
-            out.append(face + "3")
-        else:
-            out.append(face + "1")
-    return "".join(out)
+    return MoveSeq.from_tokens(tokens).to_compact()
 
 
 # ---------------------------------------------------------------------------
@@ -234,21 +244,84 @@ class ExecOptions:
     verbose: bool = True
 
 
-def compile_robot_moves(singmaster: str, start_mode: str = "UFR", informative: bool = False) -> Tuple[str, int]:
-    """Compile une solution Singmaster en string Cubotino robot moves (F/S/R...)."""
-    tokens = parse_singmaster(singmaster)
-    sol_compact = singmaster_to_cubotino_kociemba(tokens)
+def compile_robot_moves(singmaster: Union[str, MoveSeq], start_mode: str = "UFR", informative: bool = False,
+                        planner: str = None, use_cache: bool = None) -> Tuple[str, int]:
+    """Compile une solution Singmaster (texte ou MoveSeq) en string Cubotino robot moves (F/S/R...).
 
+    Mémoïsé (robot_plan_cache, config robot.plan_cache) par (solution, départ, version).
+    """
+    seq = MoveSeq.from_singmaster(singmaster)
     simulation = True if start_mode.upper() == "UFR" else False
+    planner = planner or _robot_cfg("planner", "cubotino")
+    if use_cache is None:
+        use_cache = plan_cache_enabled()
+
+    key = None
+    if use_cache:
+        try:
+            key = (seq.to_singmaster(), "UFR" if simulation else "SCAN", plan_version(planner))
+            hit = get_plan_cache().get(*key)
+            if hit is not None:
+                return hit
+        except Exception as e:
+            print(f"⚠️ cache plans KO: {e}")
+            key = None
+
+    moves_str, tot_moves = _compile_seq(seq, simulation, informative, planner)
+    if key is not None:
+        try:
+            get_plan_cache().put(*key, moves_str, tot_moves)
+        except Exception as e:
+            print(f"⚠️ cache plans KO: {e}")
+    return moves_str, tot_moves
+
 
-    _robot_dict, moves_str, tot_moves, _opt = cub_moves.robot_required_moves(
-        sol_compact,
-        solution_Text="OK",
-        simulation=simulation,
-        informative=informative,
-    )
+def _compile_seq(seq: MoveSeq, simulation: bool, informative: bool,
+                 planner: str) -> Tuple[str, int]:
+    moves_str = None
+    if planner == "optimal":
+        # Plus court chemin (orientation, angle support) en temps servo prédit
+        try:
+            moves_str, tot_moves = plan_moves(seq, simulation=simulation,
+                                              move_time_s=_robot_cfg("move_time_s", None))
+        except ValueError as e:
+            print(f"⚠️ planificateur optimal KO ({e}) -> compilateur Cubotino")
+    if moves_str is None:
+        # Compilateur réentrant (même résultat que Cubotino_T_moves.robot_required_moves, sans globales)
+        moves_str, tot_moves, _opt = compile_moves(seq, simulation=simulation,
+                                                   informative=informative)
+
+    # Peephole (règles vérifiées par simulation), config robot.peephole
+    if _robot_cfg("peephole.enabled", False):
+        res = optimize_moves(moves_str, rehome_next=bool(_robot_cfg("peephole.rehome_next", False)),
+                             move_time_s=_robot_cfg("move_time_s", None))
+        if informative and res.saved_s:
+            print("Peephole: " + ", ".join(f"{k} -{v:.1f}s" for k, v in res.saved_s.items()))
+        if res.moves != moves_str:
+            moves_str, tot_moves = res.moves, count_moves(res.moves)
     return moves_str, tot_moves
 
+# Temps servo moyen par commande robot (s), ordre de grandeur mesuré avec robot_servo :
+#   F = flip_up (aller/retour lent + attente bascule), S = spin capot ouvert,
+#   R = rotation contrainte (fermeture capot + overshoot + maintien + ouverture)
+# Utilisé seulement si move_time_s est fourni ; sinon modèle servo_timing.
+DEFAULT_MOVE_TIME_S = {"F": 2.0, "S": 0.8, "R": 4.0}
+
+
+def estimate_robot_seconds(moves: str, move_time_s=None) -> float:
+    """Estimation du temps servo d’une séquence robot "F1S3R1..." (Fk compte k flips).
+
+    move_time_s=None : modèle servo_timing (constantes robot_servo + calibration,
+    selon la position du support) ; dict : coûts moyens par commande (ancien modèle).
+    """
+    if not move_time_s:
+        return get_servo_model().sequence_seconds(moves)
+    cost = dict(DEFAULT_MOVE_TIME_S)
+    cost.update(move_time_s)
+    return sum(cost.get(cmd, 0.0) * (val if cmd == "F" else 1)
+               for cmd, val in MoveSeq.from_robot(moves).pairs())
+
+
 def _set_cube_pos(pos: str) -> None:
     try:
         hw.cube_pos = pos
@@ -398,12 +471,91 @@ def _do_rotate(code: int, *, opt: ExecOptions,stop_flag=None) -> None:
         hw.rotate_mid()
 
 
-def execute_robot_moves(moves: str, *, opt: ExecOptions, stop_flag=None, progress_callback=None) -> None:
-    moves = moves.strip()
-    if len(moves) % 2 != 0:
-        raise ValueError(f"Moves string invalide (longueur impaire): {moves!r}")
+def _apply_hw_state(state: dict) -> None:
+    for name, value in state.items():
+        try:
+            setattr(hw, name, value)
+        except Exception:
+            pass
+
+
+def _execute_timeline(seq: MoveSeq, *, opt: ExecOptions, stop_flag, emit) -> None:
+    """Exécution par servo_timeline : consignes horodatées jouées par le thread servo dédié."""
+    tl = compile_timeline(seq,
+                          cube_pos=getattr(hw, "cube_pos", "mid"), cover_pos=getattr(hw, "cover_pos", "open"),
+                          top_pw=getattr(hw, "current_pw", None), bottom_pw=getattr(hw, "bottom_pw", None))
+    pairs = seq.pairs()
+    names = seq.tokens()
+    total = len(seq)
+    prims = []
+    model, pos = get_servo_model(), getattr(hw, "cube_pos", "mid")
+    for cmd, val in pairs:
+        prim, _s, pos = model.command(cmd, val, pos)
+        prims.append(prim)
+    starts = [0.0] + tl.cmd_end[:-1]
+    if opt.verbose:
+        print(f"[HW] timeline : {total} commandes, {tl.total_s:.1f}s (séquentiel {tl.sequential_s:.1f}s)")
+
+    t_start = time.monotonic()
+
+    def move_event(k: int, status: str, **extra) -> None:
+        move = names[k]
+        next_move = names[k + 1] if k + 1 < total else None
+        emit("execute_move",
+             step="execute",
+             index=k + 1, total=total,
+             move=move, next_move=next_move,
+             status=status,
+             primitive=prims[k], predicted_s=round(tl.cmd_end[k] - starts[k], 3),
+             timeline=True,
+             elapsed_s=round(time.monotonic() - t_start, 2), **extra)
+
+    done = -1
+    t_prev = t_start
+    if total:
+        eta_s = round(tl.total_s, 2)
+        move_event(0, "executing", eta_s=eta_s,
+                   msg=f"1/{total} {names[0]}" + (f" → {names[1]}" if total > 1 else "") + f" (~{eta_s:.0f}s)")
+    executor = get_executor(hw.pi, getattr(hw, "motion", None))
+    for k in executor.play(tl, stop_flag):
+        now = time.monotonic()
+        done = k
+        _apply_hw_state(tl.states[k])
+        move_event(k, "completed", count=pairs[k][1] if pairs[k][0] == "F" else 1,
+                   duration_s=round(now - t_prev, 3), dry_run=False,
+                   eta_s=round(tl.total_s - tl.cmd_end[k], 2), msg=f"done {k + 1}/{total} {names[k]}")
+        t_prev = now
+        if k + 1 < total:
+            eta_s = round(tl.total_s - tl.cmd_end[k], 2)
+            move_event(k + 1, "executing", eta_s=eta_s,
+                       msg=f"{k + 2}/{total} {names[k + 1]}"
+                           + (f" → {names[k + 2]}" if k + 2 < total else "") + f" (~{eta_s:.0f}s)")
+
+    if done < total - 1:
+        # commande interrompue : l’état suit les consignes réellement émises, pas le plan
+        _apply_hw_state(emitted_state(executor.last_pw))
+        emit("execution_stopped",
+             step="execute",
+             index=done + 1, total=total,
+             status="stopped",
+             elapsed_s=round(time.monotonic() - t_start, 2),
+             msg="Stop demandé")
+        raise ExecutionStopped("Stop demandé")
+
+    emit("execution_finished",
+        step="execute",
+        index=total, total=total,
+        status="finished",
+        elapsed_s=round(time.monotonic() - t_start, 2), eta_s=0.0,
+        msg="Finished")
+
 
-    total = len(moves) // 2
+def execute_robot_moves(moves: Union[str, MoveSeq], *, opt: ExecOptions, stop_flag=None,
+                        progress_callback=None) -> None:
+    seq = MoveSeq.from_robot(moves)
+    pairs = seq.pairs()
+    names = seq.tokens()              # texte uniquement pour les événements
+    total = len(seq)
 
     def emit(event: str, **data): ### Pour suivre les call back
         if progress_callback:
@@ -412,27 +564,60 @@ def execute_robot_moves(moves: str, *, opt: ExecOptions, stop_flag=None, progres
             except Exception as e:
                 print(f"[WARN] progress_callback failed: {e}")    
 
-    for idx, i in enumerate(range(0, len(moves), 2), start=1):
+    # Ligne de temps (servo_timeline) : phases couvercle / plateau chevauchées
+    if not opt.dry_run and hw is not None and timeline_enabled():
+        _execute_timeline(seq, opt=opt, stop_flag=stop_flag, emit=emit)
+        return
+
+    # Temps servo prédit par commande (servo_timing) -> ETA ; corrigé par la dérive
+    # mesurée (temps réel / temps prédit des commandes déjà faites) si robot.timing.eta_drift
+    model = get_servo_model()
+    pos = getattr(hw, "cube_pos", "mid")
+    plan = []
+    for cmd, val in pairs:
+        try:
+            prim, pred_s, pos = model.command(cmd, val, pos)
+        except ValueError:
+            prim, pred_s = None, 0.0          # commande illégale : l’exécuteur lèvera l’erreur
+        plan.append((prim, pred_s))
+    remaining = [0.0] * (total + 1)
+    for k in range(total - 1, -1, -1):
+        remaining[k] = remaining[k + 1] + plan[k][1]
+    use_drift = bool(_robot_cfg("timing.eta_drift", True)) and not opt.dry_run
+
+    t_start = time.monotonic()
+    done_pred = 0.0
+
+    def eta(k: int) -> float:
+        elapsed = time.monotonic() - t_start
+        drift = min(2.0, max(0.5, elapsed / done_pred)) if use_drift and done_pred > 0 else 1.0
+        return round(remaining[k] * drift, 2)
+
+    for idx, (cmd, val) in enumerate(pairs, start=1):
         if _stopped(stop_flag):
             emit("execution_stopped",
                  step="execute",
                  index=idx - 1, total=total,
                  status="stopped",
+                 elapsed_s=round(time.monotonic() - t_start, 2),
                  msg="Stop demandé")
             raise ExecutionStopped("Stop demandé")
 
-        cmd = moves[i]
-        val = int(moves[i + 1])
-        move = f"{cmd}{val}"
-        next_move = f"{moves[i+2]}{moves[i+3]}" if i + 2 < len(moves) else None
+        move = names[idx - 1]
+        next_move = names[idx] if idx < total else None
+        primitive, predicted_s = plan[idx - 1]
+        eta_s = eta(idx - 1)
 
         emit("execute_move",
              step="execute",
              index=idx, total=total,
              move=move, next_move=next_move,
              status="executing",
-             msg=f"{idx}/{total} {move}" + (f" → {next_move}" if next_move else ""))
+             primitive=primitive, predicted_s=round(predicted_s, 3),
+             elapsed_s=round(time.monotonic() - t_start, 2), eta_s=eta_s,
+             msg=f"{idx}/{total} {move}" + (f" → {next_move}" if next_move else "") + f" (~{eta_s:.0f}s)")
 
+        t_move = time.monotonic()
         if cmd == "F":
             _do_flip(val, opt=opt, stop_flag=stop_flag)
         elif cmd == "S":
@@ -441,18 +626,25 @@ def execute_robot_moves(moves: str, *, opt: ExecOptions, stop_flag=None, progres
             _do_rotate(val, opt=opt, stop_flag=stop_flag)
         else:
             raise ValueError(f"Commande robot inconnue: {cmd}{val}")
+        duration_s = time.monotonic() - t_move
+        done_pred += predicted_s
 
         emit("execute_move",
              step="execute",
              index=idx, total=total,
              move=move, next_move=next_move,
              status="completed",
+             primitive=primitive, count=val if cmd == "F" else 1,
+             predicted_s=round(predicted_s, 3), duration_s=round(duration_s, 3),
+             dry_run=opt.dry_run,
+             elapsed_s=round(time.monotonic() - t_start, 2), eta_s=eta(idx),
              msg=f"done {idx}/{total} {move}")
 
     emit("execution_finished",
         step="execute",
         index=total, total=total,
         status="finished",
+        elapsed_s=round(time.monotonic() - t_start, 2), eta_s=0.0,
         msg="Finished")
 
 def execute_solution(
@@ -462,9 +654,19 @@ def execute_solution(
     dry_run: bool = False,
     verbose: bool = True,
     stop_flag=None,
-    progress_callback=None
+    progress_callback=None,
+    cube_string: str = None,
 ) -> str:
-    moves_str, tot = compile_robot_moves(singmaster, start_mode=start_mode)
+    solution = MoveSeq.from_singmaster(singmaster)
+    moves_str, tot = compile_robot_moves(solution, start_mode=start_mode)
+    moves = MoveSeq.from_robot(moves_str)
+
+    # Vérification virtuelle avant tout mouvement servo (config robot.verify.enabled) :
+    # le plan réalise la solution, et résout le cube scanné si cube_string est fourni
+    if _robot_cfg("verify.enabled", True):
+        verify_plan(moves, cube=cube_string, start_mode=start_mode, solution=solution)
+        if verbose:
+            print("✅ Plan vérifié en simulation" + (" (cube résolu)" if cube_string else ""))
 
     if verbose:
         print("=" * 60)
@@ -474,8 +676,17 @@ def execute_solution(
         print(f"Total moves: {tot}")
         print("=" * 60)
 
+    # Le plan est compilé et vérifié support centré, cube dans l’orientation start_mode.
+    # Support à ±90° (peephole robot.peephole.rehome_next, arrêt en cours d’exécution) :
+    # le recentrer capot ouvert ferait tourner tout le cube (= une commande S) et le plan
+    # mélangerait au lieu de résoudre -> refus, la capture (reset_initial) recentre.
+    if not dry_run and hw is not None and getattr(hw, "cube_pos", "mid") != "mid":
+        raise PlanVerificationError(
+            f"support en position {hw.cube_pos!r} (attendu 'mid') : orientation du cube "
+            f"≠ {start_mode}, nouvelle capture nécessaire")
+
     opt = ExecOptions(start_mode=start_mode, dry_run=dry_run, verbose=verbose)
-    execute_robot_moves(moves_str, opt=opt, stop_flag=stop_flag, progress_callback=progress_callback)
+    execute_robot_moves(moves, opt=opt, stop_flag=stop_flag, progress_callback=progress_callback)
     return moves_str
 
 #### POUR CAPTURE DES FACES ######
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  robot_plan_cache.py
+#  -------------------
+#  Objectif :
+#     Mémoïsation de compile_robot_moves : la même solution est compilée plusieurs
+#     fois par cycle (log / estimation / execute_solution) et d’un cycle à l’autre
+#     (démos, dry-runs) -> parse + planification + peephole payés une seule fois.
+#       1) LRU mémoire (OrderedDict, par process)
+#       2) table sqlite "robot_plans" optionnelle, dans le fichier du cache de
+#          solutions (solver.cache.path) : partagée entre process et redémarrages
+#
+#  Clé : (solution normalisée "R U' F2", start "UFR"/"SCAN", version)
+#        version = empreinte de tout ce qui change le plan : PLAN_VERSION (à
+#        incrémenter si le compilateur / planificateur / peephole change), planner,
+#        config robot.peephole, robot.move_time_s, temps servo du modèle servo_timing
+#  Valeur : (moves "F1R1S3...", tot_moves)
+#
+#  last_used (éviction disque) :
+#     mis à jour en mémoire à chaque hit et écrit par paquets (flush_every hits ou
+#     flush_s secondes, avant éviction / stats / close, et à la sortie du process),
+#     comme les compteurs de solution_cache : un hit reste une lecture.
+#
+#  Entrées principales :
+#     - get_plan_cache() -> PlanCache (singleton process, config robot.plan_cache)
+#     - PlanCache.get(solution, start, version) / put(...) / stats() / clear() / flush()
+#     - plan_version(planner) -> str
+#
+#  Config (config.json -> robot.plan_cache) :
+#     enabled, persist (table sqlite), max_mem, max_disk
+# ============================================================================
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+PLAN_VERSION = 1
+FLUSH_EVERY = 32
+FLUSH_S = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS robot_plans (
+    solution  TEXT NOT NULL,
+    start     TEXT NOT NULL,
+    version   TEXT NOT NULL,
+    moves     TEXT NOT NULL,
+    tot_moves INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (solution, start, version)
+);
+CREATE INDEX IF NOT EXISTS idx_robot_plans_last_used ON robot_plans(last_used);
+"""
+
+Key = Tuple[str, str, str]
+
+
+class PlanCache:
+    """LRU mémoire + sqlite optionnel. Thread-safe."""
+
+    def __init__(self, path=None, max_mem: int = 256, max_disk: int = 20000,
+                 flush_every: int = FLUSH_EVERY, flush_s: float = FLUSH_S):
+        self.path = str(path) if path else None
+        self.max_mem = max(0, int(max_mem))
+        self.max_disk = max(1, int(max_disk))
+        self.flush_every = max(1, int(flush_every))
+        self.flush_s = float(flush_s)
+        self._mem: "OrderedDict[Key, Tuple[str, int]]" = OrderedDict()
+        self._touched: Dict[Key, float] = {}       # clé -> last_used à écrire
+        self._n_touched = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.mem_hits = self.disk_hits = self.misses = 0
+
+        self._db = None
+        if self.path:
+            self._db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+    def get(self, solution: str, start: str, version: str) -> Optional[Tuple[str, int]]:
+        key = (solution, start, version)
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.mem_hits += 1
+                self._touch(key)
+                return hit
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT moves, tot_moves FROM robot_plans WHERE solution=? AND start=? AND version=?",
+                    key).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self._touch(key)
+                    self._remember(key, (row[0], int(row[1])))
+                    return row[0], int(row[1])
+            self.misses += 1
+            return None
+
+    def _touch(self, key: Key) -> None:
+        """last_used noté en mémoire ; écriture sqlite groupée (_flush_locked)."""
+        if self._db is None:
+            return
+        self._touched[key] = time.time()
+        self._n_touched += 1
+        if self._n_touched >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_s:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._touched or self._db is None:
+            return
+        rows = [(last, *key) for key, last in self._touched.items()]
+        self._touched.clear()
+        self._n_touched = 0
+        self._db.executemany("UPDATE robot_plans SET last_used=MAX(last_used, ?) "
+                             "WHERE solution=? AND start=? AND version=?", rows)
+        self._db.commit()
+
+    def flush(self) -> None:
+        """Écrit les last_used en attente."""
+        with self._lock:
+            self._flush_locked()
+
+    def put(self, solution: str, start: str, version: str, moves: str, tot_moves: int) -> None:
+        key = (solution, start, version)
+        with self._lock:
+            self._remember(key, (moves, int(tot_moves)))
+            if self._db is None:
+                return
+            self._touched.pop(key, None)       # entrée remplacée : last_used = maintenant
+            self._db.execute(
+                "INSERT OR REPLACE INTO robot_plans (solution, start, version, moves, tot_moves, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", key + (moves, int(tot_moves), time.time()))
+            self._evict_disk()
+            self._db.commit()
+
+    def _remember(self, key: Key, value: Tuple[str, int]) -> None:
+        if self.max_mem == 0:
+            return
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_mem:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        (n,) = self._db.execute("SELECT COUNT(*) FROM robot_plans").fetchone()
+        if n <= self.max_disk:
+            return
+        self._flush_locked()   # last_used à jour avant de choisir les victimes
+        drop = n - self.max_disk + max(1, self.max_disk // 10)
+        self._db.execute(
+            "DELETE FROM robot_plans WHERE rowid IN "
+            "(SELECT rowid FROM robot_plans ORDER BY last_used ASC LIMIT ?)", (drop,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_locked()
+            n = self._db.execute("SELECT COUNT(*) FROM robot_plans").fetchone()[0] if self._db else 0
+        return {"path": self.path, "disk_entries": n, "mem_entries": len(self._mem),
+                "mem_hits": self.mem_hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._n_touched = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM robot_plans")
+                self._db.commit()
+            self._mem.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_CACHE: Optional[PlanCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(key, default)
+    except Exception:
+        return default
+
+
+def plan_cache_enabled() -> bool:
+    return bool(_cfg("robot.plan_cache.enabled", False))
+
+
+def plan_version(planner: str) -> str:
+    """Empreinte des paramètres qui déterminent le plan compilé."""
+    from servo_timing import PRIMITIVES, get_servo_model
+
+    model = get_servo_model()
+    sig = {
+        "v": PLAN_VERSION,
+        "planner": planner,
+        "peephole": _cfg("robot.peephole", None),
+        "move_time_s": _cfg("robot.move_time_s", None),
+        "servo": [round(model.seconds(p), 4) for p in PRIMITIVES],
+    }
+    return hashlib.sha1(json.dumps(sig, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def get_plan_cache() -> PlanCache:
+    """Singleton process ; table sqlite dans le fichier solver.cache.path si persist."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = None
+            if _cfg("robot.plan_cache.persist", False):
+                from solution_cache import DEFAULT_DB
+                path = Path(_cfg("solver.cache.path", None) or DEFAULT_DB)
+                if not path.is_absolute():
+                    path = Path(__file__).parent / path
+            _CACHE = PlanCache(path,
+                               max_mem=_cfg("robot.plan_cache.max_mem", 256),
+                               max_disk=_cfg("robot.plan_cache.max_disk", 20000))
+            atexit.register(_CACHE.flush)
+        return _CACHE
@@ -16,11 +16,13 @@
 #     - Servo bas (plateau rotation cube) : B_SERVO_PIN = 16 ancienement 24
 #     - Servo haut (couvercle)            : T_SERVO_PIN = 5 ancienement 23
 #     - Dépendance : `pigpiod` doit tourner (sinon SystemExit).
+#     - RBX_PIGPIO_SIM=1 : pigpio simulé (servo_motion.SimPi), tests hors Pi.
 #
 #  État global suivi :
 #     - cover_pos : "open" | "close" | "flip"
 #     - cube_pos  : "mid"  | "right" | "left"
 #     - current_pw : dernière PWM envoyée au servo couvercle (pour move_slow)
+#     - bottom_pw  : dernière PWM (brute) envoyée au servo plateau (profils)
 #
 #  Entrées principales (API “mouvements”) :
 #     - flip_open()  : ouvre le couvercle (OPEN_PW)
@@ -46,7 +48,12 @@
 #     - move_to(pulsewidth, servo, wait=0.5) :
 #         Envoi PWM direct (µs) + délai ; applique B_OFFSET sur servo bas.
 #     - move_slow(from_pw, to_pw, servo, step=10, delay=0.02) :
-#         Déplacement progressif (micro-pas) pour réduire à-coups.
+#         Déplacement progressif (micro-pas) pour réduire à-coups ; rampe minutée
+#         par le matériel (onde pigpio, servo_motion.py, config servos.motion).
+#     - move_profile(from_pw, to_pw, servo, profile) :
+#         Trajectoire trapèze / S-curve + stabilisation (servo_profiles.py) ; si
+#         servos.profiles.enabled, remplace move_to + attentes fixes de flip_up,
+#         flip_close, spin_out / spin_mid (libres et contraints).
 #
 #  Paramètres de calibration (à ajuster selon ton cube) :
 #     - Positions PWM : LEFT_PW / MID_PW / RIGHT_PW, OPEN_PW / CLOSE_PW / FLIP_PW
@@ -69,8 +76,11 @@
 # ============================================================================
 
 
+import os
 import time
-import pigpio  # Assure-toi que pigpiod tourne: sudo systemctl start pigpiod
+
+import servo_profiles
+from servo_motion import DEFAULT_FRAME_US, SimPi, make_backend
 
 # GPIO des servos (choix B : nouveau câblage)
 B_SERVO_PIN = 16 #GIPO 24 devient 16  # servo inférieur (rotation cube)
@@ -107,6 +117,16 @@ B_WAIT_FREE = 0.65         # attente fin de spin libres
 B_WAIT_ROT  = 0.90         # attente fin de rotations contraintes (rotate=True)
 ROTATE_HOLD = 0.70         # tenir capot fermé après rotation avant ouverture
 SPIN_SETTLE = 0.12         # petite pause anti-oscillation après spin
+FLIP_TIP_WAIT = 0.5        # flip_up : attente bascule du cube avant retour
+FLIP_BACK_WAIT = 0.3       # flip_up : pause après retour OPEN_PW
+OPEN_WAIT = 0.5            # flip_open : attente move_to OPEN_PW
+OPEN_SETTLE = 0.3          # flip_open : pause après ouverture
+MID_WAIT = 0.6             # spin_mid : attente retour au centre
+MID_LOOSE_WAIT_R = 0.6     # spin_mid(rotate) depuis la droite : étape "loose"
+MID_LOOSE_WAIT_L = 0.5     # spin_mid(rotate) depuis la gauche : étape "loose"
+MID_LOCK_SETTLE = 0.15     # rotate_mid : pause après flip_close
+MOVE_SLOW_STEP = 10        # µs par micro-pas (move_slow)
+MOVE_SLOW_DELAY = 0.02     # s entre micro-pas (move_slow)
 
 
 # Positions globales
@@ -115,11 +135,19 @@ cube_pos  = "mid"    # position du cube "mid", "right", "left"
 
 # variable globale pour mémoriser la dernière pulsewidth de la position du couvercle
 current_pw = OPEN_PW  # par exemple, au départ il est ouvert
+bottom_pw = MID_PW    # plateau au centre au démarrage
+
+# Connexion pigpio (ou pigpio simulé : RBX_PIGPIO_SIM=1)
+if os.environ.get("RBX_PIGPIO_SIM") == "1":
+    pi = SimPi()
+else:
+    import pigpio  # Assure-toi que pigpiod tourne: sudo systemctl start pigpiod
+    pi = pigpio.pi()
+    if not pi.connected:
+        raise SystemExit("Impossible de se connecter à pigpio (vérifie que pigpiod est démarré).")
 
-# Connexion pigpio
-pi = pigpio.pi()
-if not pi.connected:
-    raise SystemExit("Impossible de se connecter à pigpio (vérifie que pigpiod est démarré).")
+# Rampes move_slow : onde pigpio minutée par le DMA ("wave") ou boucle sleep ("sleep")
+motion = make_backend(pi)
 
 
 # ============================================================================
@@ -131,7 +159,9 @@ def move_to(pulsewidth, servo, wait=0.5):
     pulsewidth en microsecondes (entre ~500 et 2500 µs)
     Envoie la largeur d’impulsion au servo et attend 'wait' secondes.
     """
+    global bottom_pw
     if servo == B_SERVO_PIN:
+        bottom_pw = pulsewidth
         pulsewidth = pulsewidth + B_OFFSET    
         print(f"[move_to] B servo raw={pulsewidth-B_OFFSET} offset={B_OFFSET} sent={pulsewidth}")
     pi.set_servo_pulsewidth(servo, pulsewidth)
@@ -140,30 +170,33 @@ def move_to(pulsewidth, servo, wait=0.5):
     # pour que le servo tienne bien sa position.
 
 
-def move_slow(from_pw, to_pw, servo, step=10, delay=0.02):
+def move_slow(from_pw, to_pw, servo, step=MOVE_SLOW_STEP, delay=MOVE_SLOW_DELAY):
     """
     Déplace le servo progressivement de from_pw à to_pw.
     step : taille des pas en µs
     delay : temps entre chaque pas en s
+    Les paliers sont émis par le backend `motion` (une onde pigpio : pas de
+    time.sleep par micro-pas) ; termine exactement sur la valeur cible.
     """
     if servo == B_SERVO_PIN:
         from_pw += B_OFFSET
         to_pw += B_OFFSET
+    motion.ramp(servo, from_pw, to_pw, step, delay)
 
-    if from_pw < to_pw:
-        pw = from_pw
-        while pw <= to_pw:
-            pi.set_servo_pulsewidth(servo, pw)
-            time.sleep(delay)
-            pw += step
-    else:
-        pw = from_pw
-        while pw >= to_pw:
-            pi.set_servo_pulsewidth(servo, pw)
-            time.sleep(delay)
-            pw -= step
-    # on termine exactement sur la valeur cible
-    pi.set_servo_pulsewidth(servo, to_pw)
+
+def move_profile(from_pw, to_pw, servo, profile):
+    """
+    Déplace le servo selon un profil servo_profiles.MotionProfile (trapèze /
+    S-curve échantillonné à la trame servo), puis attend profile.settle_s.
+    """
+    global bottom_pw
+    if servo == B_SERVO_PIN:
+        bottom_pw = to_pw
+        from_pw += B_OFFSET
+        to_pw += B_OFFSET
+    frame_us = getattr(motion, "frame_us", DEFAULT_FRAME_US)
+    motion.play(servo, servo_profiles.profile_steps(from_pw, to_pw, profile, frame_us))
+    time.sleep(profile.settle_s)
 
 
 # ============================================================================
@@ -179,28 +212,36 @@ def flip_up():
     """
     global cover_pos, current_pw
 
+    prof = servo_profiles.active("flip")
+    if prof is not None:
+        move_profile(current_pw, FLIP_PW, T_SERVO_PIN, prof)   # bascule pendant la stabilisation
+        move_profile(FLIP_PW, OPEN_PW, T_SERVO_PIN, prof)
+        current_pw = OPEN_PW
+        cover_pos = 'open'
+        return
+
     # Aller vers position flip
-    move_slow(current_pw, FLIP_PW, T_SERVO_PIN, step=10, delay=0.02)
+    move_slow(current_pw, FLIP_PW, T_SERVO_PIN)
     current_pw = FLIP_PW
     cover_pos = 'flip'
     
-    time.sleep(0.5)  # ✅ ATTENDRE que cube bascule (AVANT retour)
+    time.sleep(FLIP_TIP_WAIT)  # ✅ ATTENDRE que cube bascule (AVANT retour)
     
     # Revenir à open
-    move_slow(current_pw, OPEN_PW, T_SERVO_PIN, step=10, delay=0.02)
+    move_slow(current_pw, OPEN_PW, T_SERVO_PIN)
     current_pw = OPEN_PW
     cover_pos = 'open'
-    time.sleep(0.3)
+    time.sleep(FLIP_BACK_WAIT)
 
 def flip_open():
     """ Fonction pour ouvrir le couvercle """
 
     global cover_pos, current_pw
 
-    move_to(OPEN_PW, T_SERVO_PIN)
+    move_to(OPEN_PW, T_SERVO_PIN, wait=OPEN_WAIT)
     current_pw = OPEN_PW
     cover_pos = 'open'
-    time.sleep(0.3)
+    time.sleep(OPEN_SETTLE)
 
 
 def flip_close():
@@ -208,7 +249,11 @@ def flip_close():
 
     global cover_pos, current_pw
 
-    move_to(CLOSE_PW, T_SERVO_PIN, wait=COVER_CLOSE_WAIT)
+    prof = servo_profiles.active("cover_close")
+    if prof is not None:
+        move_profile(current_pw, CLOSE_PW, T_SERVO_PIN, prof)
+    else:
+        move_to(CLOSE_PW, T_SERVO_PIN, wait=COVER_CLOSE_WAIT)
 
     # micro release: relâche un poil la pression
     move_to(CLOSE_PW - COVER_RELEASE, T_SERVO_PIN, wait=COVER_REL_WAIT)
@@ -232,6 +277,21 @@ def spin_out(direction, rotate=False):
     
     w = B_WAIT_ROT if rotate else B_WAIT_FREE
 
+    prof = servo_profiles.active("spin_constrained" if rotate else "spin_free")
+    if prof is not None and direction in ('D', 'G'):
+        if direction == 'D':
+            target, over = RIGHT_PW + RIGHT_TRIM, ROT_OVERSHOOT
+        else:
+            target, over = LEFT_PW + LEFT_TRIM, -ROT_OVERSHOOT
+        if rotate and over:
+            move_profile(bottom_pw, target + over, B_SERVO_PIN, prof)
+            move_to(target, B_SERVO_PIN, wait=prof.settle_s)   # <- settle sur la cible
+        else:
+            move_profile(bottom_pw, target, B_SERVO_PIN, prof)
+        cube_pos = 'right' if direction == 'D' else 'left'
+        time.sleep(SPIN_SETTLE)
+        return
+
     if direction == 'D':
         print("Tourne a droite")
         target = RIGHT_PW + RIGHT_TRIM
@@ -258,17 +318,22 @@ def spin_out(direction, rotate=False):
 
 def spin_mid(rotate=False):
     global cube_pos
-    if rotate:
+    prof = servo_profiles.active("spin_constrained" if rotate else "spin_free")
+    if prof is not None:
+        # la décélération du profil remplace l'étape "loose" du mode contraint
+        target = MID_PW + MID_TRIM_CONSTRAINED if rotate else MID_PW
+        move_profile(bottom_pw, target, B_SERVO_PIN, prof)
+    elif rotate:
         if cube_pos == 'right':
-            move_to(MIDL_LOOSE_PW, B_SERVO_PIN, wait=0.6)
-            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=0.6)
+            move_to(MIDL_LOOSE_PW, B_SERVO_PIN, wait=MID_LOOSE_WAIT_R)
+            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=MID_WAIT)
         elif cube_pos == 'left':
-            move_to(MIDR_LOOSE_PW, B_SERVO_PIN, wait=0.5)
-            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=0.6)
+            move_to(MIDR_LOOSE_PW, B_SERVO_PIN, wait=MID_LOOSE_WAIT_L)
+            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=MID_WAIT)
         else:
-            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=0.6)
+            move_to(MID_PW + MID_TRIM_CONSTRAINED, B_SERVO_PIN, wait=MID_WAIT)
     else:
-        move_to(MID_PW, B_SERVO_PIN,wait=0.6)
+        move_to(MID_PW, B_SERVO_PIN,wait=MID_WAIT)
     cube_pos = 'mid'
     time.sleep(SPIN_SETTLE)
 
@@ -289,7 +354,7 @@ def rotate_mid():
     global cube_pos, cover_pos
     if cover_pos != 'close':
         flip_close()
-        time.sleep(0.15)
+        time.sleep(MID_LOCK_SETTLE)
     if cube_pos in ('right', 'left'):
         spin_mid(True)
     cube_pos = 'mid'
@@ -59,6 +59,9 @@
 #     1) capture_images():
 #        - Initialise CameraInterface2, allume LEDs, reset robot,
 #          verrouille AE/AWB (lock_for_scan_multiface), puis capture_all_faces().
+#        - Mode vision day/night choisi une fois (select_vision_mode, 1ère face).
+#        - (Option camera.frame_archive.enabled) garde les frames brutes en RAM,
+#          les archive (frame_archive.py) et la détection les utilise directement.
 #
 #     2) calibrate_roi_auto():
 #        - Optionnel : calibrate_roi_yolo(...) si YOLO disponible.
@@ -69,30 +72,43 @@
 #
 #     4) convert_to_kociemba():
 #        - convert_to_kociemba(color_results, mode="robot_cam", strategy="center_hsv")
-#          + validations fortes (len=54, alphabet URFDLB, 9× chaque lettre).
+#          + validations fortes (len=54, alphabet URFDLB, 9× chaque lettre)
+#          + solubilité cubies (cube_validator) -> UnsolvableCube + faces suspectes.
 #
 #     5) solve():
 #        - solve_cube(...) via solver_wrapper ; gère CubeAlreadySolved.
+#        - (Option solver.async.enabled) solve_cube_async : recherche dans un worker
+#          tué par l’E-STOP, solutions intermédiaires en events solve_progress, et
+#          mise en pose d’exécution du robot pendant la recherche (park_for_execution).
 #
 #     6) execute_moves():
 #        - execute_solution(...) via robot_moves_cubotino, avec stop_flag,
 #          et remonte la progression vers le callback (execute_move, finished/stopped).
+#        - le plan F/S/R est d’abord rejoué sur self.cube_string (robot_move_sim) :
+#          refusé (execution_refused) s’il ne résout pas le cube ou si le support n’est
+#          pas centré, avant tout mouvement.
 #
 #  Contrôle arrêt d’urgence :
-#     - stop_flag (threading.Event) : lu pendant l’exécution mouvements.
+#     - stop_flag (threading.Event) : lu pendant l’exécution mouvements
+#       et pendant la recherche asynchrone (worker terminé).
 #     - emergency_stop() / reset_stop_flag().
 # ============================================================================
 
 import os
 import threading
 import time
+from concurrent.futures import CancelledError
 
 from calibration_rubiks import load_calibration
 #from calibration_colors import load_color_calibration
 from process_images_cube import detect_colors_for_faces
 from processing_rubiks import convert_to_kociemba
 from solver_wrapper import solve_cube
+from solver_async import async_enabled, park_while_solving, solve_cube_async
+from solution_reexpress import reexpress_enabled, reexpress_solution
+from cube_validator import check_solvable, UnsolvableCube
 from robot_moves_cubotino import execute_solution,ExecutionStopped
+from robot_move_sim import PlanVerificationError
 from capture_photo_from_311 import CameraInterface2
 import traceback
 from types_shared import FaceResult, FacesDict
@@ -107,6 +123,10 @@ except ImportError:
     YOLO_AVAILABLE = False
     calibrate_roi_yolo = None
 
+# Orientation du cube au début de l’exécution (après scan) ; le plan robot en dépend,
+# donc aussi tout score "temps servo" calculé avant l’exécution.
+EXEC_START_MODE = "LUB"
+
 class PipelineStopped(Exception):
     """Arrêt demandé (E-STOP). Ce n’est pas une erreur."""
     pass
@@ -162,8 +182,25 @@ class RobotCubeSolver:
         # Stockage des résultats
         self.cube_string = None
         self.solution = None
+        self.reexpress_info = None
         self.progress_callback = None
 
+        # Archive brute des frames (optionnelle, camera.frame_archive.enabled)
+        self.frames = None
+        self.archive_dir = None
+
+        # Mode vision day/night (calculé une fois par run sur la 1ère face)
+        self.vision_mode = None
+        self.vision_stats = None
+
+        # Portfolio : workers solveurs démarrés dès maintenant (spawn + tables twophase)
+        if self.solver_method() == "portfolio":
+            try:
+                from solver_portfolio import warm_portfolio_pool
+                warm_portfolio_pool()
+            except Exception as e:
+                print(f"⚠️ portfolio warm-up KO: {e}")
+
     ## Utiliser pour les call backs
     def emit(self, event: str, **data):  
         _emit(self.progress_callback, event, **data)
@@ -224,7 +261,13 @@ class RobotCubeSolver:
                     status="locking_done",
                     pct=0.02,
                     msg="Camera lock done")
+            self.frames = {} if self._frame_archive_enabled() else None
+            self.archive_dir = None
+            self.vision_mode = None
+            self.vision_stats = None
             self.capture_all_faces()
+            if self.frames:
+                self.save_frame_archive(camera)
             print("🔍 Retour à l'état initial...")
             #return_to_u_fr()
             print("🔍 Fin de capture des images...")
@@ -282,6 +325,10 @@ class RobotCubeSolver:
                 filename=f"{self.image_folder}/{face}.jpg",
                 rotation=0
             )
+            if self.frames is not None and getattr(self.camera, "last_frame", None) is not None:
+                self.frames[face] = self.camera.last_frame
+            if self.vision_mode is None:
+                self.select_vision_mode(face)
             self.emit(
                 "capture_face",
                 step="capture",
@@ -335,6 +382,66 @@ class RobotCubeSolver:
         scan_yaw_home()
         time.sleep(0.25)
 
+    def select_vision_mode(self, face: str):
+        """Décision day/night (expo x gain verrouillés + luminance de la 1ère face), 1 fois par run."""
+        from calibration_colors import estimate_vision_mode
+
+        try:
+            roi = load_calibration() or {}
+            mode, stats = estimate_vision_mode(
+                camera_controls=getattr(self.camera, "_locked_controls", None),
+                frame_bgr=getattr(self.camera, "last_frame", None),
+                roi=roi.get(face),
+                debug=(self.debug != "none"),
+            )
+        except Exception as e:
+            print(f"⚠️ vision mode auto KO: {e}")
+            return None
+
+        self.vision_mode = mode
+        self.vision_stats = stats
+        self.emit("vision_mode_selected", step="capture", face=face, mode=mode, stats=stats,
+                  msg=f"Vision mode {mode}")
+        return mode
+
+    def _frame_archive_enabled(self) -> bool:
+        try:
+            from config_manager import get_config
+            return bool(get_config().get("camera.frame_archive.enabled", False))
+        except Exception:
+            return False
+
+    def save_frame_archive(self, camera=None):
+        """Archive brute du run (frames.npy + frames.json), best-effort."""
+        try:
+            from config_manager import get_config
+            from frame_archive import new_run_dir, save_frame_archive
+
+            root = get_config().get("camera.frame_archive.folder", "archive")
+            out_dir = new_run_dir(root)
+            save_frame_archive(
+                out_dir,
+                self.frames,
+                roi_data=load_calibration(),
+                camera_controls=getattr(camera, "_locked_controls", None),
+                vision_mode=self.vision_mode,
+                extra={"vision_stats": self.vision_stats} if self.vision_stats else None,
+            )
+            self.archive_dir = out_dir
+            print(f"🗄️ Archive frames: {out_dir}")
+        except Exception as e:
+            print(f"⚠️ archive frames KO: {e}")
+
+    def annotate_frame_archive(self, cube: str):
+        """Ajoute cubestring + clé canonique (48 symétries) au sidecar de l’archive du run."""
+        try:
+            from cube_symmetry import canonical_key
+            from frame_archive import annotate_frame_archive
+
+            annotate_frame_archive(self.archive_dir, cube_string=cube, cube_key=canonical_key(cube))
+        except Exception as e:
+            print(f"⚠️ annotation archive KO: {e}")
+
     # ========================================================================
     # ÉTAPE 2 : CALIBRATION AUTOMATIQUE (optionnelle)
     # ========================================================================
@@ -391,7 +498,9 @@ class RobotCubeSolver:
             )
 
         self.check_stop("detection", DET_START)
-        color_results: FacesDict = detect_colors_for_faces(self.image_folder, roi, color_calib, debug=self.debug, strict=True)
+        color_results: FacesDict = detect_colors_for_faces(self.image_folder, roi, color_calib, debug=self.debug, strict=True,
+                                                           frames=self.frames or None, vision_mode=self.vision_mode)
+        self.frames = None  # frames brutes déjà archivées : libère la RAM (process Ecran longue durée)
         self.check_stop("detection", DET_END)
 
         # Avec progression : notifier chaque face
@@ -433,9 +542,14 @@ class RobotCubeSolver:
         """
         print("🔄 Conversion en format Kociemba...")
         self.check_stop("conversion", 0.55)
+        try:
+            from config_manager import get_config
+            orient_mode = get_config().get("detection.orientation_mode", "robot_cam")
+        except Exception:
+            orient_mode = "robot_cam"
         ok, cube, err = convert_to_kociemba(
             color_results,
-            mode="robot_cam",
+            mode=orient_mode,
             strategy="center_hsv",
             debug=self.debug
         )
@@ -455,16 +569,61 @@ class RobotCubeSolver:
         cnt = Counter(cube)
         if any(cnt[k] != 9 for k in "URFDLB"):
             raise ValueError(f"Répartition invalide (doit être 9x chaque): {dict(cnt)}")
+
+        # Solubilité (coins/arêtes/parité) : échec immédiat + faces suspectes pour re-scan
+        report = check_solvable(cube)
+        if not report.ok:
+            raise UnsolvableCube(report)
         
         print(f"✅ CubeString: {cube}")
         self.cube_string = cube
+        if self.archive_dir:
+            self.annotate_frame_archive(cube)
         return cube
     
     # ========================================================================
     # ÉTAPE 5 : RÉSOLUTION
     # ========================================================================
     
-    def solve(self, cube_string: str, method: str = "kociemba") -> str:
+    @staticmethod
+    def solver_method() -> str:
+        """Méthode de résolution (config solver.method : kociemba / k2 / portfolio ; kociemba+k2 en asynchrone)."""
+        try:
+            from config_manager import get_config
+            return get_config().get("solver.method", "kociemba")
+        except Exception:
+            return "kociemba"
+
+    def park_for_execution(self) -> bool:
+        """Pose de départ de l’exécution (capot ouvert, plateau centré), best-effort."""
+        try:
+            from robot_servo import reset_initial
+            reset_initial()
+            self.emit("robot_parked", step="solve", pct=0.62, msg="Pose d'exécution")
+            return True
+        except Exception as e:
+            print(f"⚠️ park exécution KO: {e}")
+            return False
+
+    def _solve_async(self, cube_string: str, method: str, park: bool = False) -> str:
+        """Recherche dans un worker (tué par l’E-STOP) ; le robot se place pendant ce temps."""
+        def on_best(sol, cost, search_s):
+            n = len(sol.split())
+            self.emit("solve_progress", step="solve", pct=0.65,
+                      msg=f"Solution {n} mvts ({search_s:.1f}s)",
+                      solution=sol, moves=n, cost=round(cost, 2), search_s=round(search_s, 2))
+
+        fut = solve_cube_async(cube_string, method=method, stop_flag=self.stop_flag, on_best=on_best,
+                               start_mode=EXEC_START_MODE)
+        if park and not fut.done() and park_while_solving():
+            self.park_for_execution()
+        try:
+            return fut.result()
+        except CancelledError:
+            self.check_stop("solve", 0.65)
+            raise
+
+    def solve(self, cube_string: str, method: str = "kociemba", park: bool = False) -> str:
         print(f"🧩 Résolution du cube... (method={method})")
         self.check_stop("solve", 0.60)
 
@@ -475,7 +634,12 @@ class RobotCubeSolver:
             raise CubeAlreadySolved("Cube déjà résolu (état = URFDLB solved).")
 
         try:
-            solution = solve_cube(cube_string, method=method)
+            if async_enabled():
+                solution = self._solve_async(cube_string, method, park=park)
+            else:
+                solution = solve_cube(cube_string, method=method, start_mode=EXEC_START_MODE)
+        except PipelineStopped:
+            raise
         except Exception as e:
             raise RuntimeError(f"SOLVE_FAILED method={method}: {e}") from e
 
@@ -486,6 +650,21 @@ class RobotCubeSolver:
         if solution == "":
             raise CubeAlreadySolved("Cube déjà résolu (solution vide).")
 
+        # Re-expression : même cube, solution re-résolue sous 24 orientations -> moins de servo
+        self.reexpress_info = None
+        if reexpress_enabled():
+            try:
+                res = reexpress_solution(cube_string, solution, method=method,
+                                         start_mode=EXEC_START_MODE, stop_flag=self.stop_flag)
+                self.reexpress_info = res.to_event()
+                if res.saved_s > 0:
+                    print(f"♻️ Re-expression '{res.transform}': -{res.saved_s:.1f}s servo "
+                          f"(recherche {res.search_s:.1f}s, net {res.net_s:+.1f}s) -> {res.solution!r}")
+                    solution = res.solution
+            except Exception as e:
+                print(f"⚠️ re-expression KO: {e}")
+            self.check_stop("solve", 0.66)
+
         self.solution = solution
         return solution
 
@@ -494,7 +673,7 @@ class RobotCubeSolver:
     # ÉTAPE 6 : EXÉCUTION DES MOUVEMENTS
     # ========================================================================
     
-    def execute_moves(self, solution: str, start_mode="LUB"):
+    def execute_moves(self, solution: str, start_mode=EXEC_START_MODE):
         print("▶️ Exécution des mouvements...")
         self.check_stop("execute", 0.70)
         #input("Entrée pour continuer (stop si effort anormal) ")
@@ -526,6 +705,7 @@ class RobotCubeSolver:
                 dry_run=False,
                 stop_flag=self.stop_flag,
                 progress_callback=progress,
+                cube_string=self.cube_string,
             )
             print("✅ Exécution terminée")
             return True
@@ -533,6 +713,12 @@ class RobotCubeSolver:
         except ExecutionStopped:
             print("🔴 Exécution interrompue")
             return False
+
+        except PlanVerificationError as e:
+            # refus avant tout mouvement servo : cube intact, nouvelle capture possible
+            print(f"⛔ Plan refusé: {e}")
+            self.emit("execution_refused", step="execute", pct=EXEC_START, msg=str(e), err=repr(e))
+            return False
     
     # ========================================================================
     # PIPELINE COMPLET
@@ -612,6 +798,10 @@ class RobotCubeSolver:
         except PipelineStopped:
             # STOP = pas une erreur => on remonte juste l'exception
             raise                
+        except UnsolvableCube as e:
+            self.emit("conversion_failed", step="conversion", pct=0.60, msg=str(e), err=repr(e),
+                      code=e.report.code, suspect_faces=e.report.suspect_faces)
+            raise
         except Exception as e:
             self.emit("conversion_failed", step="conversion", pct=0.60, msg=str(e), err=repr(e))
             raise         
@@ -623,13 +813,15 @@ class RobotCubeSolver:
         # ====================================================================
         # 5️⃣ RÉSOLUTION
         # ====================================================================
-        self.emit("solving_started", step="solve", pct=0.60, msg="Solving started (kociemba)")
+        method = self.solver_method()
+        self.emit("solving_started", step="solve", pct=0.60, msg=f"Solving started ({method})")
         try:
             self.check_stop("solve", 0.60)
-            solution = self.solve(cube_string, method="kociemba")
+            solution = self.solve(cube_string, method=method, park=do_execute)
             moves_count = len(solution.split()) if solution else 0
             self.emit("solving_completed", step="solve", pct=0.70,
-              msg="Solving completed", moves=moves_count,solution=solution)
+              msg="Solving completed", moves=moves_count,solution=solution,
+              reexpress=self.reexpress_info)
         except CubeAlreadySolved as e:
             print(f"🟦 {e}")
             self.emit("already_solved", step="solve", pct=0.70, msg=str(e), moves=0)
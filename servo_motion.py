@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  servo_motion.py
+#  ---------------
+#  Objectif :
+#     Backend de **mouvements servo minutés par le matériel** pour robot_servo :
+#     move_slow envoyait une consigne tous les 10 µs de largeur d’impulsion avec
+#     time.sleep(0.02) entre deux set_servo_pulsewidth (≈ 46 pas Python pour
+#     OPEN -> FLIP, deux fois par flip_up) : gigue de l’ordonnanceur, CPU occupé.
+#     Ici la rampe est compilée en une onde pigpio (1 trame servo de 20 ms par
+#     palier) et envoyée en un seul appel ; le thread appelant ne fait que dormir.
+#
+#  Backends (config.json -> servos.motion.backend) :
+#     - "wave"  : WaveBackend  — wave_add_generic / wave_create / wave_send_once,
+#                 ondes mises en cache par rampe, puis reprise de la PWM servo
+#                 (set_servo_pulsewidth) sur la consigne finale pour tenir la position
+#     - "sleep" : SleepBackend — boucle d’origine (référence / repli)
+#     Si l’onde échoue (ressources pigpio, GPIO non supporté), repli automatique
+#     sur la boucle sleep pour cette rampe.
+#
+#  Entrées principales :
+#     - ramp_steps(from_pw, to_pw, step, delay) -> [(pw, durée_s)]  (même suite que move_slow)
+#     - make_backend(pi, kind=None) -> WaveBackend | SleepBackend
+#     - backend.ramp(gpio, from_pw, to_pw, step, delay)   (bloquant, durée = nb paliers × trame)
+#     - backend.play(gpio, steps)   suite quelconque [(pw, durée_s)] (profils servo_profiles)
+#     - WaveBackend.start / finish / halt : même onde sans bloquer (servo_timeline)
+#     - SimPi : remplaçant simulé de pigpio.pi (hors Pi) : enregistre les consignes
+#       horodatées dans .trace, exécute les ondes sur l’horloge monotone
+#
+#  Config (config.json -> servos.motion) :
+#     backend  : "wave" | "sleep"
+#     frame_us : période des trames servo dans l’onde (20000 = 50 Hz, comme pigpio)
+#
+#  Exécution directe :
+#     python servo_motion.py      # rampe OPEN -> FLIP sur SimPi, wave vs sleep
+#
+#  Notes :
+#     - robot_servo utilise SimPi si la variable d’environnement RBX_PIGPIO_SIM=1
+#       (tests du pipeline complet sans pigpiod).
+# ============================================================================
+
+from __future__ import annotations
+
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from pigpio import pulse as Pulse          # gpio_on, gpio_off, delay (µs)
+except ImportError:                            # hors Pi : même forme
+    Pulse = namedtuple("Pulse", "gpio_on gpio_off delay")
+
+DEFAULT_FRAME_US = 20000
+_POLL_S = 0.002
+_MAX_CACHED_WAVES = 8
+
+
+def _motion_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"servos.motion.{key}", default)
+    except Exception:
+        return default
+
+
+def ramp_steps(from_pw: int, to_pw: int, step: int = 10, delay: float = 0.02) -> List[Tuple[int, float]]:
+    """Consignes successives de move_slow : paliers de `step` µs tenus `delay` s, puis to_pw."""
+    step = abs(int(step)) or 1
+    if from_pw < to_pw:
+        pws = range(int(from_pw), int(to_pw) + 1, step)
+    else:
+        pws = range(int(from_pw), int(to_pw) - 1, -step)
+    return [(pw, delay) for pw in pws] + [(int(to_pw), 0.0)]
+
+
+def ramp_pulses(gpio: int, steps: List[Tuple[int, float]], frame_us: int = DEFAULT_FRAME_US) -> List[Pulse]:
+    """Onde : pour chaque palier, round(durée / trame) trames (≥ 1) d’une impulsion de pw µs."""
+    mask = 1 << gpio
+    pulses: List[Pulse] = []
+    for pw, hold_s in steps:
+        if hold_s <= 0:
+            continue
+        for _ in range(max(1, round(hold_s * 1e6 / frame_us))):
+            pulses.append(Pulse(mask, 0, pw))
+            pulses.append(Pulse(0, mask, frame_us - pw))
+    return pulses
+
+
+def pulses_seconds(pulses: List[Pulse]) -> float:
+    return sum(p.delay for p in pulses) / 1e6
+
+
+def step_at(steps: List[Tuple[int, float]], elapsed_s: float) -> int:
+    """Consigne en cours `elapsed_s` après le début de la suite de paliers."""
+    t = 0.0
+    for pw, hold_s in steps:
+        t += hold_s
+        if elapsed_s < t:
+            return int(pw)
+    return int(steps[-1][0])
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class SleepBackend:
+    """Boucle d’origine de move_slow (set_servo_pulsewidth + time.sleep par palier)."""
+
+    name = "sleep"
+
+    def __init__(self, pi):
+        self.pi = pi
+
+    def ramp(self, gpio: int, from_pw: int, to_pw: int, step: int = 10, delay: float = 0.02) -> None:
+        self.play(gpio, ramp_steps(from_pw, to_pw, step, delay))
+
+    def play(self, gpio: int, steps: List[Tuple[int, float]]) -> None:
+        for pw, hold_s in steps:
+            self.pi.set_servo_pulsewidth(gpio, pw)
+            if hold_s:
+                time.sleep(hold_s)
+
+
+class WaveBackend:
+    """Rampe compilée en onde pigpio, envoyée en un appel (timing DMA, CPU ~0)."""
+
+    name = "wave"
+
+    def __init__(self, pi, frame_us: int = DEFAULT_FRAME_US):
+        self.pi = pi
+        self.frame_us = int(frame_us)
+        self._waves: Dict[Tuple[int, Tuple[Tuple[int, float], ...]], Tuple[int, float]] = {}
+        self._fallback = SleepBackend(pi)
+
+    def _wave(self, gpio: int, steps: List[Tuple[int, float]]) -> Tuple[int, float]:
+        key = (gpio, tuple(steps))
+        hit = self._waves.get(key)
+        if hit is not None:
+            return hit
+        if len(self._waves) >= _MAX_CACHED_WAVES:
+            self.clear()
+        pulses = ramp_pulses(gpio, steps, self.frame_us)
+        self.pi.wave_add_new()
+        self.pi.wave_add_generic(pulses)
+        wid = self.pi.wave_create()
+        if wid < 0:
+            raise RuntimeError(f"wave_create: {wid}")
+        self._waves[key] = (wid, pulses_seconds(pulses))
+        return self._waves[key]
+
+    def ramp(self, gpio: int, from_pw: int, to_pw: int, step: int = 10, delay: float = 0.02) -> None:
+        self.play(gpio, ramp_steps(from_pw, to_pw, step, delay))
+
+    def play(self, gpio: int, steps: List[Tuple[int, float]]) -> None:
+        if all(hold_s <= 0 for _pw, hold_s in steps):      # rien à minuter : consigne directe
+            self.pi.set_servo_pulsewidth(gpio, int(steps[-1][0]))
+            return
+        try:
+            wid, duration = self._wave(gpio, steps)
+        except Exception as e:
+            print(f"[servo_motion] onde indisponible ({e}) -> boucle sleep")
+            self._fallback.play(gpio, steps)
+            return
+        self.pi.set_servo_pulsewidth(gpio, 0)          # la PWM servo libère le GPIO pour l’onde
+        self.pi.wave_send_once(wid)
+        time.sleep(max(0.0, duration - _POLL_S))
+        while self.pi.wave_tx_busy():
+            time.sleep(_POLL_S)
+        self.pi.set_servo_pulsewidth(gpio, int(steps[-1][0]))  # tenue de la position finale
+
+    # --- ondes non bloquantes (servo_timeline : l’autre servo continue pendant l’onde) ---
+    def start(self, gpio: int, steps: List[Tuple[int, float]]) -> bool:
+        """Lance l’onde et rend la main ; False si une onde est déjà en cours ou indisponible."""
+        if all(hold_s <= 0 for _pw, hold_s in steps) or self.pi.wave_tx_busy():
+            return False
+        try:
+            wid, _duration = self._wave(gpio, steps)
+        except Exception as e:
+            print(f"[servo_motion] onde indisponible ({e}) -> consignes minutées")
+            return False
+        self.pi.set_servo_pulsewidth(gpio, 0)
+        self.pi.wave_send_once(wid)
+        return True
+
+    def finish(self, gpio: int, pw: int, timeout_s: float = 0.2) -> None:
+        """Fin d’une onde lancée par start() : attend la dernière trame puis tient pw."""
+        t_end = time.monotonic() + timeout_s
+        while self.pi.wave_tx_busy() and time.monotonic() < t_end:
+            time.sleep(_POLL_S)
+        self.pi.set_servo_pulsewidth(gpio, int(pw))
+
+    def halt(self, gpio: int, pw: int) -> None:
+        """Arrêt d’une onde en cours (E-STOP) : le servo tient pw."""
+        try:
+            self.pi.wave_tx_stop()
+        finally:
+            self.pi.set_servo_pulsewidth(gpio, int(pw))
+
+    def clear(self) -> None:
+        for wid, _d in self._waves.values():
+            try:
+                self.pi.wave_delete(wid)
+            except Exception:
+                pass
+        self._waves.clear()
+
+
+def make_backend(pi, kind: Optional[str] = None):
+    kind = kind or _motion_cfg("backend", "wave")
+    if kind == "sleep":
+        return SleepBackend(pi)
+    return WaveBackend(pi, frame_us=int(_motion_cfg("frame_us", DEFAULT_FRAME_US)))
+
+
+# ---------------------------------------------------------------------------
+# pigpio simulé
+# ---------------------------------------------------------------------------
+class SimPi:
+    """
+    Remplaçant de pigpio.pi pour tester hors Pi.
+    trace : [(t_s, gpio, pw)] consignes horodatées (monotone, depuis la création) ;
+    les impulsions d’une onde y sont ajoutées aux instants où le DMA les émettrait.
+    """
+
+    connected = True
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.trace: List[Tuple[float, int, int]] = []
+        self.servo_pw: Dict[int, int] = {}
+        self._building: List[Pulse] = []
+        self._waves: Dict[int, List[Pulse]] = {}
+        self._next_wid = 0
+        self._tx_end = 0.0
+
+    def _now(self) -> float:
+        return time.monotonic() - self.t0
+
+    # --- servo / GPIO ---------------------------------------------------
+    def set_servo_pulsewidth(self, gpio: int, pw: int) -> int:
+        self.servo_pw[gpio] = int(pw)
+        self.trace.append((self._now(), gpio, int(pw)))
+        return 0
+
+    def get_servo_pulsewidth(self, gpio: int) -> int:
+        return self.servo_pw.get(gpio, 0)
+
+    def set_mode(self, gpio: int, mode: int) -> int:
+        return 0
+
+    def write(self, gpio: int, level: int) -> int:
+        return 0
+
+    def stop(self) -> None:
+        self.connected = False
+
+    # --- ondes ----------------------------------------------------------
+    def wave_add_new(self) -> int:
+        self._building = []
+        return 0
+
+    def wave_clear(self) -> int:
+        self._building, self._waves = [], {}
+        return 0
+
+    def wave_add_generic(self, pulses) -> int:
+        self._building.extend(pulses)
+        return len(self._building)
+
+    def wave_create(self) -> int:
+        wid = self._next_wid
+        self._next_wid += 1
+        self._waves[wid] = self._building
+        self._building = []
+        return wid
+
+    def wave_delete(self, wid: int) -> int:
+        self._waves.pop(wid, None)
+        return 0
+
+    def wave_send_once(self, wid: int) -> int:
+        t = self._now()
+        for p in self._waves[wid]:
+            if p.gpio_on:
+                gpio = p.gpio_on.bit_length() - 1
+                self.trace.append((t, gpio, int(p.delay)))   # largeur de l’impulsion émise
+            t += p.delay / 1e6
+        self._tx_end = self.t0 + t
+        return len(self._waves[wid])
+
+    def wave_tx_busy(self) -> int:
+        return 1 if time.monotonic() < self._tx_end else 0
+
+    def wave_tx_stop(self) -> int:
+        self._tx_end = 0.0
+        return 0
+
+
+if __name__ == "__main__":
+    OPEN_PW, FLIP_PW, GPIO = 1250, 800, 5
+    for kind in ("sleep", "wave"):
+        sim = SimPi()
+        backend = make_backend(sim, kind)
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        backend.ramp(GPIO, OPEN_PW, FLIP_PW, 10, 0.02)
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        n = len(ramp_steps(OPEN_PW, FLIP_PW)) - 1
+        print(f"{kind:5s} : {n} paliers, {wall * 1e3:.1f} ms (théorique {n * 20} ms), CPU {cpu * 1e3:.1f} ms")
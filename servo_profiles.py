@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  servo_profiles.py
+#  -----------------
+#  Objectif :
+#     **Profils de mouvement** (trapèze / S-curve) des primitives servo, à la
+#     place des sauts move_to(..., wait=...) + attentes fixes et des rampes
+#     linéaires move_slow de robot_servo.py :
+#       - flip             : couvercle OPEN -> FLIP -> OPEN (flip_up)
+#       - spin_free        : plateau capot ouvert (spin_out / spin_mid)
+#       - spin_constrained : plateau capot fermé (rotate_out / rotate_mid)
+#       - cover_close      : couvercle OPEN -> CLOSE (flip_close)
+#     Chaque profil = vitesse (µs de PWM / s), accélération (µs / s²) et
+#     stabilisation (s) ; la trajectoire est échantillonnée à la trame servo
+#     (20 ms) puis jouée par servo_motion (onde pigpio).
+#
+#  + Outil de réglage : rejoue un cycle de la primitive (qui ramène le cube à son
+#    état initial) à vitesse croissante (×step) jusqu’à ce que la vérification
+#    échoue (caméra : image comparée à une référence, ou confirmation opérateur),
+#    puis retient la dernière vitesse validée × backoff.
+#
+#  Entrées principales :
+#     - MotionProfile(shape, velocity, accel, settle_s) ; .scaled(k) ; .seconds(from_pw, to_pw)
+#     - profile_steps(from_pw, to_pw, profile, frame_us) -> [(pw, durée_s)]
+#     - active(name) -> MotionProfile | None   (None = comportement historique)
+#     - use_profile(name, profile|None)        (surcharge en mémoire, réglage)
+#     - predict_primitives(c, base) -> secondes servo_timing recalculées avec les profils
+#     - tune(name, verify, hw, ...) -> TuneResult ; OperatorVerify / CameraVerify
+#
+#  Config (config.json -> servos) :
+#     profiles.enabled : active les profils dans robot_servo (défaut false)
+#     profiles.<nom>   : {shape, velocity, accel, settle_s}
+#     tuning           : {step, backoff, reps, max_scale, camera_diff_max}
+#
+#  Exécution directe :
+#     python servo_profiles.py show
+#     python servo_profiles.py tune flip --verify operator|camera [--save]
+#
+#  Notes :
+#     - S-curve : accélération en demi-sinus (pic = accel), sans à-coup au départ ni
+#       à l’arrivée ; trapèze : accélération constante.
+#     - Les durées prédites (servo_timing) suivent les profils actifs : planificateur,
+#       ETA et cache de plans restent cohérents après un réglage.
+# ============================================================================
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from servo_motion import DEFAULT_FRAME_US
+
+NAMES = ("flip", "spin_free", "spin_constrained", "cover_close")
+SHAPES = ("trapezoid", "scurve")
+
+
+def _servos_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"servos.{key}", default)
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class MotionProfile:
+    shape: str = "trapezoid"      # "trapezoid" | "scurve"
+    velocity: float = 1500.0      # vitesse de croisière (µs de PWM / s)
+    accel: float = 8000.0         # accélération (µs / s², pic pour scurve)
+    settle_s: float = 0.3         # stabilisation mécanique après l’arrivée
+
+    def __post_init__(self):
+        if self.shape not in SHAPES:
+            raise ValueError(f"Profil: forme inconnue {self.shape!r} (attendu {SHAPES})")
+        if self.velocity <= 0 or self.accel <= 0 or self.settle_s < 0:
+            raise ValueError(f"Profil invalide: {self}")
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "MotionProfile":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in d.items() if k in names})
+
+    def to_dict(self) -> Dict:
+        return {k: (round(v, 3) if isinstance(v, float) else v) for k, v in asdict(self).items()}
+
+    def scaled(self, k: float) -> "MotionProfile":
+        """Même trajectoire k fois plus rapide (vitesse ×k, accélération ×k², stabilisation ÷k)."""
+        return replace(self, velocity=self.velocity * k, accel=self.accel * k * k, settle_s=self.settle_s / k)
+
+    def _plan(self, dist: float) -> Tuple[float, float, float]:
+        """(vitesse atteinte, durée d’accélération, durée de croisière) pour une course dist."""
+        v, a = self.velocity, self.accel
+        t_a = v / a if self.shape == "trapezoid" else math.pi * v / (2 * a)
+        if v * t_a > dist:                          # profil triangulaire : vitesse non atteinte
+            v = math.sqrt(dist * a) if self.shape == "trapezoid" else math.sqrt(2 * a * dist / math.pi)
+            t_a = v / a if self.shape == "trapezoid" else math.pi * v / (2 * a)
+        return v, t_a, (dist - v * t_a) / v if v else 0.0
+
+    def seconds(self, from_pw: float, to_pw: float) -> float:
+        """Durée du déplacement (hors stabilisation)."""
+        dist = abs(to_pw - from_pw)
+        if dist == 0:
+            return 0.0
+        _v, t_a, t_c = self._plan(dist)
+        return 2 * t_a + t_c
+
+    def position(self, t: float, dist: float) -> float:
+        """Course parcourue à l’instant t (0 <= résultat <= dist)."""
+        v, t_a, t_c = self._plan(dist)
+        total = 2 * t_a + t_c
+
+        def ramp(u: float) -> float:                # course pendant l’accélération
+            if self.shape == "trapezoid":
+                return 0.5 * v / t_a * u * u
+            return 0.5 * v * (u - t_a / math.pi * math.sin(math.pi * u / t_a))
+
+        if t >= total:
+            return dist
+        if t < t_a:
+            return ramp(t)
+        if t < t_a + t_c:
+            return v * t_a / 2 + v * (t - t_a)
+        return dist - ramp(total - t)
+
+
+def profile_steps(from_pw: int, to_pw: int, profile: MotionProfile,
+                  frame_us: int = DEFAULT_FRAME_US) -> List[Tuple[int, float]]:
+    """Consigne par trame servo [(pw, durée_s)], terminée par (to_pw, 0)."""
+    dist = abs(to_pw - from_pw)
+    frame_s = frame_us / 1e6
+    sign = 1 if to_pw >= from_pw else -1
+    n = math.ceil(profile.seconds(from_pw, to_pw) / frame_s - 1e-9)
+    steps = [(int(round(from_pw + sign * profile.position(k * frame_s, dist))), frame_s) for k in range(1, n + 1)]
+    return steps + [(int(to_pw), 0.0)]
+
+
+def steps_seconds(from_pw: int, to_pw: int, profile: MotionProfile, frame_us: int = DEFAULT_FRAME_US) -> float:
+    """Durée jouée (trames entières) + stabilisation."""
+    frame_s = frame_us / 1e6
+    return math.ceil(profile.seconds(from_pw, to_pw) / frame_s - 1e-9) * frame_s + profile.settle_s
+
+
+# ---------------------------------------------------------------------------
+# Profils actifs (config + surcharges de réglage)
+# ---------------------------------------------------------------------------
+_PROFILES: Optional[Dict[str, MotionProfile]] = None
+_OVERRIDES: Dict[str, MotionProfile] = {}
+
+
+def load_profiles(reload: bool = False) -> Dict[str, MotionProfile]:
+    """Profils de config.json (servos.profiles.<nom>), même si profiles.enabled est faux."""
+    global _PROFILES
+    if _PROFILES is None or reload:
+        raw = _servos_cfg("profiles", None) or {}
+        _PROFILES = {}
+        for name in NAMES:
+            if isinstance(raw.get(name), dict):
+                try:
+                    _PROFILES[name] = MotionProfile.from_dict(raw[name])
+                except (TypeError, ValueError) as e:
+                    print(f"[servo_profiles] profil {name} ignoré : {e}")
+    return _PROFILES
+
+
+def profiles_enabled() -> bool:
+    return bool(_servos_cfg("profiles.enabled", False))
+
+
+def active(name: str) -> Optional[MotionProfile]:
+    """Profil à appliquer pour la primitive, None = move_to / move_slow historiques."""
+    prof = _OVERRIDES.get(name)
+    if prof is not None:
+        return prof
+    if not profiles_enabled():
+        return None
+    return load_profiles().get(name)
+
+
+def use_profile(name: str, profile: Optional[MotionProfile]) -> None:
+    """Surcharge en mémoire (prioritaire sur profiles.enabled) ; None la retire."""
+    if name not in NAMES:
+        raise ValueError(f"Primitive inconnue: {name} (attendu {NAMES})")
+    if profile is None:
+        _OVERRIDES.pop(name, None)
+    else:
+        _OVERRIDES[name] = profile
+
+
+def predict_primitives(c: Dict[str, float], base: Dict[str, float]) -> Dict[str, float]:
+    """
+    Secondes par primitive servo_timing (base = prédiction historique) avec les
+    profils actifs ; même enchaînement d’attentes que robot_servo.
+    """
+    out = dict(base)
+    frame_us = int(_servos_cfg("motion.frame_us", DEFAULT_FRAME_US))
+    flip, free, con, close = (active(n) for n in NAMES)
+    right = c["RIGHT_PW"] + c["RIGHT_TRIM"]
+    left = c["LEFT_PW"] + c["LEFT_TRIM"]
+    mid_con = c["MID_PW"] + c["MID_TRIM_CONSTRAINED"]
+    flip_open = c["OPEN_WAIT"] + c["OPEN_SETTLE"]
+    flip_close = c["COVER_CLOSE_WAIT"] + c["COVER_REL_WAIT"]
+
+    if flip is not None:
+        out["flip"] = (steps_seconds(c["OPEN_PW"], c["FLIP_PW"], flip, frame_us)
+                       + steps_seconds(c["FLIP_PW"], c["OPEN_PW"], flip, frame_us))
+    if free is not None:
+        out["spin_out"] = steps_seconds(c["MID_PW"], right, free, frame_us) + c["SPIN_SETTLE"]
+        out["spin_mid"] = steps_seconds(right, c["MID_PW"], free, frame_us) + c["SPIN_SETTLE"]
+    if close is not None:
+        flip_close = steps_seconds(c["OPEN_PW"], c["CLOSE_PW"], close, frame_us) + c["COVER_REL_WAIT"]
+    if con is not None or close is not None:
+        spin_r = (steps_seconds(c["MID_PW"], right, con, frame_us) if con
+                  else 2 * c["B_WAIT_ROT"])
+        hold = c["SPIN_SETTLE"] + c["ROTATE_HOLD"] + flip_open
+        out["rotate_out"] = flip_close + c["COVER_LOCK_SETTLE"] + spin_r + hold
+        for side, start, loose in (("right", right, c["MID_LOOSE_WAIT_R"]), ("left", left, c["MID_LOOSE_WAIT_L"])):
+            back = steps_seconds(start, mid_con, con, frame_us) if con else loose + c["MID_WAIT"]
+            out["rotate_mid_" + side] = flip_close + c["MID_LOCK_SETTLE"] + back + hold
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Réglage (vitesse croissante jusqu’à l’échec, puis recul)
+# ---------------------------------------------------------------------------
+# Cycles robot_servo qui ramènent le cube dans son état de départ (comparaison caméra)
+CYCLES: Dict[str, Callable] = {
+    "flip": lambda hw: [hw.flip_up() for _ in range(4)],
+    "spin_free": lambda hw: (hw.spin_out("D"), hw.spin_mid(), hw.spin_out("G"), hw.spin_mid()),
+    "spin_constrained": lambda hw: (hw.rotate_out("D"), hw.rotate_mid(), hw.rotate_out("G"), hw.rotate_mid()),
+    "cover_close": lambda hw: (hw.flip_close(), hw.flip_open()),
+}
+
+
+@dataclass
+class TuneResult:
+    name: str
+    base: MotionProfile
+    scale: Optional[float]                           # None : même la vitesse de départ échoue
+    profile: Optional[MotionProfile]
+    trials: List[Tuple[float, bool]] = field(default_factory=list)
+
+
+class OperatorVerify:
+    """Confirmation opérateur après chaque cycle."""
+
+    def __call__(self) -> bool:
+        ans = input("   Cube bien en place ? [O/n] ").strip().lower()
+        return ans in ("", "o", "oui", "y", "yes")
+
+
+class CameraVerify:
+    """Image après le cycle comparée à la référence prise avant le réglage (écart moyen en niveaux de gris)."""
+
+    def __init__(self, diff_max: Optional[float] = None, folder: str = "tmp", camera=None):
+        import cv2  # noqa: F401  (dépendance de vision, chargée seulement pour ce mode)
+        from capture_photo_from_311 import CameraInterface2
+
+        self.diff_max = float(diff_max if diff_max is not None else _servos_cfg("tuning.camera_diff_max", 12.0))
+        self.folder = folder
+        self.camera = camera or CameraInterface2()
+        self.last_diff: Optional[float] = None
+        self.reference = self._grab("tune_ref.jpg")
+
+    def _grab(self, name: str):
+        import cv2
+
+        path = os.path.join(self.folder, name)
+        self.camera.capture_image(path)
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise RuntimeError(f"capture illisible : {path}")
+        return cv2.resize(img, (160, 90), interpolation=cv2.INTER_AREA)
+
+    def __call__(self) -> bool:
+        import cv2
+
+        self.last_diff = float(cv2.absdiff(self._grab("tune_check.jpg"), self.reference).mean())
+        print(f"   écart image {self.last_diff:.1f} (max {self.diff_max:.1f})")
+        return self.last_diff <= self.diff_max
+
+
+def tune(name: str, verify: Callable[[], bool], hw, base: Optional[MotionProfile] = None,
+         step: Optional[float] = None, backoff: Optional[float] = None, reps: Optional[int] = None,
+         max_scale: Optional[float] = None) -> TuneResult:
+    """
+    Accélère la primitive (×step) tant que `reps` cycles consécutifs passent la
+    vérification ; résultat = dernière vitesse validée × backoff (jamais sous la base).
+    """
+    if name not in CYCLES:
+        raise ValueError(f"Primitive inconnue: {name} (attendu {NAMES})")
+    base = base or load_profiles().get(name) or MotionProfile()
+    step = float(step or _servos_cfg("tuning.step", 1.15))
+    backoff = float(backoff or _servos_cfg("tuning.backoff", 0.9))
+    reps = int(reps or _servos_cfg("tuning.reps", 3))
+    max_scale = float(max_scale or _servos_cfg("tuning.max_scale", 4.0))
+
+    res = TuneResult(name, base, None, None)
+    scale, failed = 1.0, False
+    try:
+        while scale <= max_scale + 1e-9:
+            use_profile(name, base.scaled(scale))
+            print(f"→ {name} ×{scale:.2f} ({base.scaled(scale).velocity:.0f} µs/s)")
+            ok = True
+            for _ in range(reps):
+                CYCLES[name](hw)
+                if not verify():
+                    ok = False
+                    break
+            res.trials.append((round(scale, 3), ok))
+            if not ok:
+                failed = True
+                print("   ❌ échec : remettre le cube en place si besoin")
+                break
+            res.scale = scale
+            scale *= step
+    finally:
+        use_profile(name, None)
+
+    if res.scale is not None:
+        if failed:
+            res.scale = max(1.0, res.scale * backoff)
+        res.profile = base.scaled(res.scale)
+    return res
+
+
+def save_profile(name: str, profile: MotionProfile) -> None:
+    from config_manager import get_config
+
+    get_config().set(f"servos.profiles.{name}", profile.to_dict())
+    load_profiles(reload=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Profils de mouvement servo (trapèze / S-curve)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("show")
+    p_tune = sub.add_parser("tune")
+    p_tune.add_argument("name", choices=NAMES)
+    p_tune.add_argument("--verify", choices=("operator", "camera"), default="operator")
+    p_tune.add_argument("--save", action="store_true", help="écrire le profil réglé dans config.json")
+    args = ap.parse_args()
+
+    if args.cmd == "show":
+        from servo_timing import servo_constants
+
+        c = servo_constants()
+        moves = {"flip": (c["OPEN_PW"], c["FLIP_PW"]), "spin_free": (c["MID_PW"], c["RIGHT_PW"]),
+                 "spin_constrained": (c["MID_PW"], c["RIGHT_PW"]), "cover_close": (c["OPEN_PW"], c["CLOSE_PW"])}
+        print(f"profils {'actifs' if profiles_enabled() else 'inactifs'} (servos.profiles.enabled)")
+        for name in NAMES:
+            prof = load_profiles().get(name)
+            if prof is None:
+                print(f"  {name:17s} -")
+                continue
+            a, b = moves[name]
+            print(f"  {name:17s} {prof.shape:9s} v={prof.velocity:.0f} a={prof.accel:.0f} "
+                  f"settle={prof.settle_s:.2f}s  {a}->{b} : {steps_seconds(a, b, prof):.3f}s")
+    else:
+        import robot_servo as hw
+
+        verify = CameraVerify() if args.verify == "camera" else OperatorVerify()
+        t0 = time.time()
+        r = tune(args.name, verify, hw)
+        print(f"essais : {', '.join(f'×{s}' + ('✓' if ok else '✗') for s, ok in r.trials)}  ({time.time() - t0:.0f}s)")
+        if r.profile is None:
+            print("❌ la vitesse de départ échoue déjà : profil inchangé")
+        else:
+            print(f"✅ {args.name} : ×{r.scale:.2f} -> {r.profile.to_dict()}")
+            if args.save:
+                save_profile(args.name, r.profile)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  servo_timeline.py
+#  -----------------
+#  Objectif :
+#     Exécuteur **sur ligne de temps** des plans F/S/R : les primitives de
+#     robot_servo (flip_up, flip_open/close, spin_out/mid, rotate_out/mid) sont
+#     déroulées en phases par servo (couvercle "T", plateau "B") puis planifiées
+#     sur une horloge monotone ; une phase d’un servo peut démarrer pendant la fin
+#     de la phase de l’autre servo quand une règle de chevauchement l’autorise :
+#       - ouvrir le capot pendant la fin du maintien d’une rotation (rotate_hold>open)
+#       - pré-positionner le plateau pendant le retour du flip (flip_back>spin)
+#       - fermer le capot / flipper pendant la stabilisation d’un spin (spin>close, spin>flip)
+#       - spinner pendant la stabilisation de l’ouverture (open>spin)
+#     Le plan F/S/R, les consignes PWM et leur ordre par servo sont inchangés.
+#
+#  Contraintes de sécurité (non configurables) :
+#     - un servo exécute ses phases strictement dans l’ordre du plan
+#     - une phase ne chevauche jamais la partie "course" de la phase précédente de
+#       l’autre servo (travel : déplacement estimé, flip entier, retour de flip
+#       jusqu’à flip_clear) : seules les attentes de stabilisation sont recouvertes
+#     - paires absentes de overlap_s (ex. verrouillage capot -> rotation) : aucune avance
+#
+#  Entrées principales :
+#     - compile_timeline(moves, cube_pos, cover_pos, top_pw, bottom_pw) -> Timeline
+#         events (t_s, gpio, pw) triés, total_s / sequential_s, fin et état par commande
+#     - get_executor(pi, motion=None) -> TimelineExecutor (un thread dédié "servo-timeline"
+#       par pi) ; motion = backend servo_motion de robot_servo
+#     - TimelineExecutor.play(timeline, stop_flag) -> itère les index de commandes
+#       terminées (dans le thread appelant) ; s’arrête tôt si stop_flag est levé
+#     - TimelineExecutor.last_pw + emitted_state(last_pw) : état robot_servo déduit
+#       des dernières consignes réellement émises (arrêt en cours de commande)
+#
+#  Config (config.json -> robot.timeline) :
+#     enabled          : execute_robot_moves passe par la ligne de temps (hors dry-run)
+#     servo_speed_us_s : vitesse servo estimée (µs de PWM / s) pour la partie "course"
+#     flip_clear       : fraction du retour de flip après laquelle le plateau peut bouger
+#     overlap_s        : {"phase_précédente>phase": secondes d’avance maximum}
+#
+#  Exécution directe :
+#     python servo_timeline.py "F1R1S3..."   # durée séquentielle vs ligne de temps
+#
+#  Notes :
+#     - constantes robot_servo lues par servo_timing.servo_constants (pas d’import pigpio)
+#     - profils servo_profiles actifs respectés (mêmes trajectoires que robot_servo)
+#     - rampes (move_slow, profils) : jouées comme dans robot_servo par le backend
+#       servo_motion — onde pigpio lancée sans bloquer (WaveBackend.start), l’autre
+#       servo continue en PWM servo pendant l’onde ; une seule onde à la fois, donc
+#       une rampe qui démarre pendant une onde (ou backend "sleep") est jouée en
+#       consignes minutées par le thread, palier par palier
+# ============================================================================
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import servo_profiles
+from move_seq import MoveSeq
+from servo_motion import DEFAULT_FRAME_US, ramp_steps, step_at
+from servo_timing import servo_constants
+
+DEFAULT_OVERLAP_S = {
+    "rotate_hold>open": 0.35,
+    "flip_back>spin": 0.6,
+    "spin>close": 0.25,
+    "spin>flip": 0.25,
+    "open>spin": 0.3,
+}
+_STOP_POLL_S = 0.05
+
+
+def _timeline_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"robot.timeline.{key}", default)
+    except Exception:
+        return default
+
+
+def timeline_enabled() -> bool:
+    return bool(_timeline_cfg("enabled", False))
+
+
+@dataclass
+class Phase:
+    servo: str                       # "T" (couvercle) | "B" (plateau)
+    kind: str                        # flip, flip_back, open, close, lock, spin, rotate, rotate_hold
+    steps: List[Tuple[int, float]]   # consignes [(pw envoyé, durée avant la suivante)]
+    dur: float                       # occupation du servo (mouvement + attentes)
+    travel: float                    # partie "course" (jamais recouverte par l’autre servo)
+    index: int                       # commande F/S/R (0-based)
+    start: float = 0.0
+
+
+@dataclass
+class Event:
+    t: float
+    gpio: int                        # -1 : marqueur de fin de commande
+    pw: int
+    index: int
+    ramp: int = -1                   # n° de phase pour les paliers d’une rampe, sinon -1
+    steps: Tuple[Tuple[int, float], ...] = ()   # rampe entière (1er palier seulement)
+    final: bool = False              # dernier palier (consigne tenue) de la rampe
+
+
+@dataclass
+class Timeline:
+    events: List[Event]
+    phases: List[Phase]
+    cmd_end: List[float]             # fin de chaque commande (s depuis le départ)
+    states: List[Dict[str, object]]  # état robot_servo après chaque commande
+    total_s: float
+    sequential_s: float
+    overlaps: Dict[str, float] = field(default_factory=dict)   # règle -> secondes gagnées
+
+
+class _Builder:
+    """Déroule les primitives robot_servo en phases (même enchaînement d’attentes)."""
+
+    def __init__(self, c: Dict[str, float], cube_pos: str, cover_pos: str, top_pw: int, bottom_pw: int):
+        self.c = c
+        self.cube_pos, self.cover_pos = cube_pos, cover_pos
+        self.top_pw, self.bottom_pw = int(top_pw), int(bottom_pw)
+        self.speed = float(_timeline_cfg("servo_speed_us_s", 2500.0))
+        self.flip_clear = float(_timeline_cfg("flip_clear", 0.6))
+        self.frame_us = int(servo_profiles._servos_cfg("motion.frame_us", DEFAULT_FRAME_US))
+        self.phases: List[Phase] = []
+        self.index = 0
+
+    # --- phases ---------------------------------------------------------
+    def _pw(self, servo: str, pw: int) -> int:
+        return int(pw + self.c["B_OFFSET"]) if servo == "B" else int(pw)
+
+    def _set(self, servo: str, pw: int) -> int:
+        prev = self.bottom_pw if servo == "B" else self.top_pw
+        if servo == "B":
+            self.bottom_pw = pw
+        else:
+            self.top_pw = pw
+        return prev
+
+    def move_to(self, servo: str, pw: int, wait: float, kind: str) -> None:
+        prev = self._set(servo, pw)
+        travel = min(wait, abs(pw - prev) / self.speed)
+        self.phases.append(Phase(servo, kind, [(self._pw(servo, pw), 0.0)], wait, travel, self.index))
+
+    def move_slow(self, pw: int, kind: str, clear: float = 1.0) -> None:
+        prev = self._set("T", pw)
+        steps = ramp_steps(prev, pw, int(self.c["MOVE_SLOW_STEP"]), self.c["MOVE_SLOW_DELAY"])
+        dur = sum(h for _pw, h in steps)
+        self.phases.append(Phase("T", kind, steps, dur, dur * clear, self.index))
+
+    def move_profile(self, servo: str, pw: int, prof, kind: str, clear: float = 1.0) -> None:
+        prev = self._set(servo, pw)
+        steps = servo_profiles.profile_steps(self._pw(servo, prev), self._pw(servo, pw), prof, self.frame_us)
+        move = sum(h for _pw, h in steps)
+        self.phases.append(Phase(servo, kind, steps, move + prof.settle_s, move * clear, self.index))
+
+    def wait(self, servo: str, s: float, kind: Optional[str] = None) -> None:
+        """Attente : prolonge la dernière phase si elle est sur ce servo, sinon phase d’attente stricte."""
+        last = self.phases[-1] if self.phases else None
+        if last is not None and last.servo == servo and last.index == self.index:
+            last.dur += s
+            last.kind = kind or last.kind
+        else:
+            self.phases.append(Phase(servo, kind or "wait", [], s, s, self.index))
+
+    # --- primitives robot_servo -----------------------------------------
+    def flip_up(self) -> None:
+        c, prof = self.c, servo_profiles.active("flip")
+        if prof is not None:
+            self.move_profile("T", c["FLIP_PW"], prof, "flip")
+            self.move_profile("T", c["OPEN_PW"], prof, "flip_back", clear=self.flip_clear)
+        else:
+            self.move_slow(c["FLIP_PW"], "flip")
+            self.wait("T", c["FLIP_TIP_WAIT"])
+            self.move_slow(c["OPEN_PW"], "flip_back", clear=self.flip_clear)
+            self.wait("T", c["FLIP_BACK_WAIT"])
+        self.cover_pos = "open"
+
+    def flip_open(self) -> None:
+        self.move_to("T", self.c["OPEN_PW"], self.c["OPEN_WAIT"], "open")
+        self.wait("T", self.c["OPEN_SETTLE"])
+        self.cover_pos = "open"
+
+    def flip_close(self) -> None:
+        c, prof = self.c, servo_profiles.active("cover_close")
+        if prof is not None:
+            self.move_profile("T", c["CLOSE_PW"], prof, "close")
+        else:
+            self.move_to("T", c["CLOSE_PW"], c["COVER_CLOSE_WAIT"], "close")
+        self.move_to("T", c["CLOSE_PW"] - c["COVER_RELEASE"], c["COVER_REL_WAIT"], "close")
+        self.cover_pos = "close"
+
+    def spin_out(self, direction: str, rotate: bool = False) -> None:
+        c = self.c
+        if not rotate and self.cover_pos != "open":
+            self.flip_open()
+        kind = "rotate" if rotate else "spin"
+        if direction == "D":
+            target, over = c["RIGHT_PW"] + c["RIGHT_TRIM"], c["ROT_OVERSHOOT"]
+        else:
+            target, over = c["LEFT_PW"] + c["LEFT_TRIM"], -c["ROT_OVERSHOOT"]
+        prof = servo_profiles.active("spin_constrained" if rotate else "spin_free")
+        if prof is not None:
+            if rotate and over:
+                self.move_profile("B", target + over, prof, kind)
+                self.move_to("B", target, prof.settle_s, kind)
+            else:
+                self.move_profile("B", target, prof, kind)
+        elif rotate:
+            self.move_to("B", target + over, c["B_WAIT_ROT"], kind)
+            self.move_to("B", target, c["B_WAIT_ROT"], kind)
+        else:
+            self.move_to("B", target, c["B_WAIT_FREE"], kind)
+        self.cube_pos = "right" if direction == "D" else "left"
+        self.wait("B", c["SPIN_SETTLE"])
+
+    def spin_mid(self, rotate: bool = False) -> None:
+        c = self.c
+        kind = "rotate" if rotate else "spin"
+        mid_con = c["MID_PW"] + c["MID_TRIM_CONSTRAINED"]
+        prof = servo_profiles.active("spin_constrained" if rotate else "spin_free")
+        if prof is not None:
+            self.move_profile("B", mid_con if rotate else c["MID_PW"], prof, kind)
+        elif rotate:
+            if self.cube_pos == "right":
+                self.move_to("B", c["MID_PW"] - 20, c["MID_LOOSE_WAIT_R"], kind)   # MIDL_LOOSE_PW
+            elif self.cube_pos == "left":
+                self.move_to("B", c["MID_PW"] + 20, c["MID_LOOSE_WAIT_L"], kind)   # MIDR_LOOSE_PW
+            self.move_to("B", mid_con, c["MID_WAIT"], kind)
+        else:
+            self.move_to("B", c["MID_PW"], c["MID_WAIT"], kind)
+        self.cube_pos = "mid"
+        self.wait("B", c["SPIN_SETTLE"])
+
+    def rotate_out(self, direction: str) -> None:
+        if self.cover_pos != "close":
+            self.flip_close()
+            self.wait("T", self.c["COVER_LOCK_SETTLE"], "lock")
+        self.spin_out(direction, True)
+        self.wait("B", self.c["ROTATE_HOLD"], "rotate_hold")
+        self.flip_open()
+
+    def rotate_mid(self) -> None:
+        if self.cover_pos != "close":
+            self.flip_close()
+            self.wait("T", self.c["MID_LOCK_SETTLE"], "lock")
+        if self.cube_pos in ("right", "left"):
+            self.spin_mid(True)
+        self.cube_pos = "mid"
+        self.wait("B", self.c["ROTATE_HOLD"], "rotate_hold")
+        self.flip_open()
+
+    def command(self, cmd: str, code: int) -> None:
+        """Même correspondance commande -> primitive que robot_moves_cubotino._do_*."""
+        if cmd == "F":
+            for _ in range(code):
+                self.flip_up()
+            return
+        cp = self.cube_pos
+        if (code, cp) in ((1, "mid"), (0, "left")):
+            action = ("out", "D")
+        elif (code, cp) in ((3, "mid"), (4, "right")):
+            action = ("out", "G")
+        elif (code, cp) in ((1, "left"), (3, "right")):
+            action = ("mid", None)
+        else:
+            raise ValueError(f"{cmd}{code} impossible depuis la position {cp!r}")
+        if cmd not in ("S", "R"):
+            raise ValueError(f"Commande robot inconnue: {cmd}{code}")
+        if action[0] == "out" and cmd == "S":
+            self.spin_out(action[1])
+        elif action[0] == "out":
+            self.rotate_out(action[1])
+        elif cmd == "S":
+            self.spin_mid()
+        else:
+            self.rotate_mid()
+
+    def state(self) -> Dict[str, object]:
+        return {"cube_pos": self.cube_pos, "cover_pos": self.cover_pos,
+                "current_pw": self.top_pw, "bottom_pw": self.bottom_pw}
+
+
+def schedule(phases: List[Phase], overlap_s: Dict[str, float]) -> Dict[str, float]:
+    """Dates de début (phase.start) ; renvoie les secondes gagnées par règle."""
+    last: Dict[str, Optional[Phase]] = {"T": None, "B": None}
+    gained: Dict[str, float] = {}
+    for ph in phases:
+        own = last[ph.servo]
+        start = own.start + own.dur if own is not None else 0.0
+        other = last["B" if ph.servo == "T" else "T"]
+        if other is not None:
+            end = other.start + other.dur
+            rule = f"{other.kind}>{ph.kind}"
+            dep = max(other.start + other.travel, end - max(0.0, overlap_s.get(rule, 0.0)))
+            if max(start, dep) < max(start, end):
+                gained[rule] = gained.get(rule, 0.0) + max(start, end) - max(start, dep)
+            start = max(start, dep)
+        ph.start = start
+        last[ph.servo] = ph
+    return gained
+
+
+def compile_timeline(moves: Union[str, MoveSeq], cube_pos: str = "mid", cover_pos: str = "open",
+                     top_pw: Optional[int] = None, bottom_pw: Optional[int] = None,
+                     overlap_s: Optional[Dict[str, float]] = None) -> Timeline:
+    c = dict(servo_constants())
+    c.setdefault("B_OFFSET", 0)
+    c.setdefault("COVER_RELEASE", 15)
+    c.setdefault("ROT_OVERSHOOT", 0)
+    b = _Builder(c, cube_pos, cover_pos,
+                 c["OPEN_PW"] if top_pw is None else top_pw,
+                 c["MID_PW"] if bottom_pw is None else bottom_pw)
+    states = []
+    for k, (cmd, code) in enumerate(MoveSeq.from_robot(moves).pairs()):
+        b.index = k
+        b.command(cmd, code)
+        states.append(b.state())
+
+    overlaps = dict(DEFAULT_OVERLAP_S if overlap_s is None else overlap_s)
+    if overlap_s is None:
+        overlaps.update(_timeline_cfg("overlap_s", None) or {})
+    gained = schedule(b.phases, overlaps)
+
+    gpio = {"T": int(c.get("T_SERVO_PIN", 5)), "B": int(c.get("B_SERVO_PIN", 16))}
+    events: List[Event] = []
+    cmd_end = [0.0] * len(states)
+    for n, ph in enumerate(b.phases):
+        t = ph.start
+        ramp = n if len(ph.steps) > 1 and any(h > 0 for _pw, h in ph.steps) else -1
+        for j, (pw, hold) in enumerate(ph.steps):
+            ev = Event(t, gpio[ph.servo], pw, ph.index)
+            if ramp >= 0:
+                ev.ramp, ev.final = ramp, j == len(ph.steps) - 1
+                ev.steps = tuple(ph.steps) if j == 0 else ()
+            events.append(ev)
+            t += hold
+        cmd_end[ph.index] = max(cmd_end[ph.index], ph.start + ph.dur)
+    for k in range(1, len(cmd_end)):
+        cmd_end[k] = max(cmd_end[k], cmd_end[k - 1])
+    events += [Event(t, -1, 0, k) for k, t in enumerate(cmd_end)]
+    events.sort(key=lambda e: (e.t, e.gpio < 0))
+
+    return Timeline(events, b.phases, cmd_end, states,
+                    total_s=cmd_end[-1] if cmd_end else 0.0,
+                    sequential_s=sum(ph.dur for ph in b.phases),
+                    overlaps={k: round(v, 3) for k, v in gained.items()})
+
+
+def emitted_state(last_pw: Dict[int, int]) -> Dict[str, object]:
+    """
+    État robot_servo (current_pw, bottom_pw, cover_pos, cube_pos) d’après les dernières
+    consignes émises par GPIO ; positions = consigne nominale la plus proche.
+    Seuls les servos présents dans last_pw sont renseignés.
+    """
+    c = servo_constants()
+    t_gpio, b_gpio = int(c.get("T_SERVO_PIN", 5)), int(c.get("B_SERVO_PIN", 16))
+    state: Dict[str, object] = {}
+    if t_gpio in last_pw:
+        pw = int(last_pw[t_gpio])
+        state["current_pw"] = pw
+        state["cover_pos"] = min((("open", c["OPEN_PW"]), ("close", c["CLOSE_PW"]), ("flip", c["FLIP_PW"])),
+                                 key=lambda kv: abs(pw - kv[1]))[0]
+    if b_gpio in last_pw:
+        pw = int(last_pw[b_gpio] - c.get("B_OFFSET", 0))
+        state["bottom_pw"] = pw
+        state["cube_pos"] = min((("left", c["LEFT_PW"]), ("mid", c["MID_PW"]), ("right", c["RIGHT_PW"])),
+                                key=lambda kv: abs(pw - kv[1]))[0]
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Exécution (thread dédié)
+# ---------------------------------------------------------------------------
+def _stopped(stop_flag) -> bool:
+    try:
+        return stop_flag is not None and stop_flag.is_set()
+    except Exception:
+        return False
+
+
+class TimelineExecutor:
+    """Un thread "servo-timeline" par pi : seul émetteur de consignes pendant une timeline."""
+
+    def __init__(self, pi, motion=None):
+        self.pi = pi
+        self.motion = motion
+        self.last_pw: Dict[int, int] = {}      # gpio -> dernière consigne émise (run en cours)
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="servo-timeline", daemon=True)
+        self._thread.start()
+
+    def play(self, timeline: Timeline, stop_flag=None) -> Iterator[int]:
+        """Index (0-based) des commandes terminées, au fil de l’eau ; fin anticipée si stop."""
+        done: "queue.Queue" = queue.Queue()
+        self._jobs.put((timeline, stop_flag, done))
+        while True:
+            item = done.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _loop(self) -> None:
+        while True:
+            timeline, stop_flag, done = self._jobs.get()
+            try:
+                self._run(timeline, stop_flag, done)
+            except Exception as e:
+                done.put(e)
+            done.put(None)
+
+    def _start_wave(self, ev: Event) -> bool:
+        start = getattr(self.motion, "start", None)
+        return bool(ev.steps) and start is not None and start(ev.gpio, list(ev.steps))
+
+    def _run(self, timeline: Timeline, stop_flag, done: "queue.Queue") -> None:
+        t0 = time.monotonic()
+        self.last_pw = {}
+        waving: Dict[int, Event] = {}          # rampe -> 1er palier, jouée en onde
+        for ev in timeline.events:
+            while True:
+                if _stopped(stop_flag):
+                    for first in waving.values():
+                        pw = step_at(list(first.steps), time.monotonic() - t0 - first.t)
+                        self.motion.halt(first.gpio, pw)
+                        self.last_pw[first.gpio] = pw
+                    return
+                dt = t0 + ev.t - time.monotonic()
+                if dt <= 0:
+                    break
+                time.sleep(min(dt, _STOP_POLL_S))
+            if ev.gpio < 0:
+                done.put(ev.index)
+            elif ev.ramp in waving:
+                if ev.final:
+                    del waving[ev.ramp]
+                    self.motion.finish(ev.gpio, ev.pw)
+                    self.last_pw[ev.gpio] = ev.pw
+            elif self._start_wave(ev):
+                waving[ev.ramp] = ev
+            else:
+                self.pi.set_servo_pulsewidth(ev.gpio, ev.pw)
+                self.last_pw[ev.gpio] = ev.pw
+
+
+_EXECUTORS: Dict[int, TimelineExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_executor(pi, motion=None) -> TimelineExecutor:
+    with _EXECUTORS_LOCK:
+        ex = _EXECUTORS.get(id(pi))
+        if ex is None or ex.pi is not pi:
+            ex = _EXECUTORS[id(pi)] = TimelineExecutor(pi, motion)
+        elif motion is not None:
+            ex.motion = motion
+        return ex
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Ligne de temps servo d’un plan F/S/R")
+    ap.add_argument("moves")
+    ap.add_argument("--phases", action="store_true", help="détail des phases")
+    args = ap.parse_args()
+
+    tl = compile_timeline(args.moves)
+    if args.phases:
+        for ph in tl.phases:
+            print(f"  {ph.start:7.2f}s  +{ph.dur:.2f}s  {ph.servo} {ph.kind:11s} cmd {ph.index + 1}")
+    gain = tl.sequential_s - tl.total_s
+    print(f"séquentiel {tl.sequential_s:.2f}s -> ligne de temps {tl.total_s:.2f}s "
+          f"(-{gain:.2f}s, {100 * gain / max(tl.sequential_s, 1e-9):.0f}%)")
+    for rule, s in sorted(tl.overlaps.items()):
+        print(f"  {rule:17s} -{s:.2f}s")
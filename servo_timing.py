@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  servo_timing.py
+#  ---------------
+#  Objectif :
+#     Modèle de **temps servo réel** des commandes robot F/S/R, prédit à partir
+#     des constantes de robot_servo.py (micro-pas move_slow, B_WAIT_*, ROTATE_HOLD,
+#     COVER_*, SPIN_SETTLE, attentes de flip_up / flip_open / spin_mid…) ou des
+#     profils de mouvement actifs (servo_profiles), puis affiné par les durées
+#     mesurées dans les logs d’exécution.
+#     Remplace les coûts moyens {"F": 2.0, "S": 0.8, "R": 4.0} : le temps d’un S/R
+#     dépend de la position du support (spin_out / spin_mid, rotate_mid depuis la
+#     droite ou la gauche).
+#
+#  Primitives (clé -> fonctions robot_servo appelées) :
+#     - flip             : flip_up
+#     - spin_out         : spin_out(dir)              (capot ouvert)
+#     - spin_mid         : spin_mid()
+#     - rotate_out       : rotate_out(dir)            (flip_close … flip_open)
+#     - rotate_mid_right : rotate_mid() depuis +90°
+#     - rotate_mid_left  : rotate_mid() depuis -90°
+#
+#  Entrées principales :
+#     - get_servo_model(reload=False) -> ServoTimeModel (singleton, calibration chargée)
+#     - ServoTimeModel.command(cmd, code, pos)   -> (primitive, secondes, position suivante)
+#     - ServoTimeModel.min_command_seconds(cmd)  -> S ou R la moins chère (bornes basses)
+#     - ServoTimeModel.durations(moves, pos)     -> [secondes par commande]
+#     - ServoTimeModel.sequence_seconds(moves)   -> secondes totales
+#     - calibrate(paths, min_samples=None) -> Dict[primitive, (médiane, n)]
+#         lit les événements "execute_move" status "completed" (primitive, count,
+#         duration_s) des JSONL de progress_listeners.jsonl_file_listener
+#
+#  Config (config.json -> robot.timing) :
+#     path        : fichier de calibration (défaut servo_timing.json)
+#     min_samples : nb de mesures minimum pour remplacer une prédiction
+#
+#  Exécution directe :
+#     python servo_timing.py show
+#     python servo_timing.py calibrate tmp/progress_*.jsonl
+#     python servo_timing.py estimate "F1R1S3R4..."
+#
+#  Notes :
+#     - robot_servo.py n’est PAS importé (connexion pigpio à l’import) : ses
+#       constantes sont lues par analyse syntaxique (ast).
+#     - Les exécutions dry-run (dry_run=True dans l’événement) et sur ligne de temps
+#       (timeline=True : durées chevauchées) sont ignorées.
+# ============================================================================
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from move_seq import MoveSeq
+import servo_profiles
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVO_SOURCE = os.path.join(BASE_DIR, "robot_servo.py")
+DEFAULT_PATH = "servo_timing.json"
+DEFAULT_MIN_SAMPLES = 5
+
+PRIMITIVES = ("flip", "spin_out", "spin_mid", "rotate_out", "rotate_mid_right", "rotate_mid_left")
+
+# Valeurs de robot_servo.py (repli si le fichier est absent / illisible)
+_FALLBACK = {
+    "OPEN_PW": 1250, "FLIP_PW": 800, "CLOSE_PW": 1500,
+    "LEFT_PW": 850, "MID_PW": 1500, "RIGHT_PW": 2150,
+    "RIGHT_TRIM": 30, "LEFT_TRIM": -10, "MID_TRIM_CONSTRAINED": 10,
+    "COVER_CLOSE_WAIT": 0.35, "COVER_REL_WAIT": 0.15, "COVER_LOCK_SETTLE": 0.25,
+    "B_WAIT_FREE": 0.65, "B_WAIT_ROT": 0.90, "ROTATE_HOLD": 0.70, "SPIN_SETTLE": 0.12,
+    "FLIP_TIP_WAIT": 0.5, "FLIP_BACK_WAIT": 0.3, "OPEN_WAIT": 0.5, "OPEN_SETTLE": 0.3,
+    "MID_WAIT": 0.6, "MID_LOOSE_WAIT_R": 0.6, "MID_LOOSE_WAIT_L": 0.5, "MID_LOCK_SETTLE": 0.15,
+    "MOVE_SLOW_STEP": 10, "MOVE_SLOW_DELAY": 0.02,
+}
+
+# (code S/R, position du support) -> (variante, position suivante) ; cf. robot_moves_cubotino._do_*
+_HOLDER_STEP = {
+    (1, "mid"): ("out", "right"), (1, "left"): ("mid", "mid"),
+    (3, "mid"): ("out", "left"), (3, "right"): ("mid", "mid"),
+    (0, "left"): ("out", "right"),
+    (4, "right"): ("out", "left"),
+}
+
+
+def _timing_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"robot.timing.{key}", default)
+    except Exception:
+        return default
+
+
+def servo_constants(path: str = SERVO_SOURCE) -> Dict[str, float]:
+    """Constantes numériques de niveau module de robot_servo.py (sans l’importer)."""
+    consts = dict(_FALLBACK)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError):
+        return consts
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                consts[node.targets[0].id] = value
+    return consts
+
+
+def move_slow_seconds(from_pw: float, to_pw: float, step: float, delay: float) -> float:
+    """Durée de robot_servo.move_slow : un sleep(delay) par micro-pas, bornes incluses."""
+    return (int(abs(to_pw - from_pw) // step) + 1) * delay
+
+
+def predict_primitives(c: Dict[str, float]) -> Dict[str, float]:
+    """Secondes par primitive, somme des attentes de robot_servo.py (+ profils actifs)."""
+    flip_open = c["OPEN_WAIT"] + c["OPEN_SETTLE"]
+    flip_close = c["COVER_CLOSE_WAIT"] + c["COVER_REL_WAIT"]
+    slow = move_slow_seconds(c["OPEN_PW"], c["FLIP_PW"], c["MOVE_SLOW_STEP"], c["MOVE_SLOW_DELAY"])
+    rotate_mid = flip_close + c["MID_LOCK_SETTLE"] + c["MID_WAIT"] + c["SPIN_SETTLE"] + c["ROTATE_HOLD"] + flip_open
+    return servo_profiles.predict_primitives(c, {
+        "flip": 2 * slow + c["FLIP_TIP_WAIT"] + c["FLIP_BACK_WAIT"],
+        "spin_out": c["B_WAIT_FREE"] + c["SPIN_SETTLE"],
+        "spin_mid": c["MID_WAIT"] + c["SPIN_SETTLE"],
+        "rotate_out": (flip_close + c["COVER_LOCK_SETTLE"] + 2 * c["B_WAIT_ROT"] + c["SPIN_SETTLE"]
+                       + c["ROTATE_HOLD"] + flip_open),
+        "rotate_mid_right": rotate_mid + c["MID_LOOSE_WAIT_R"],
+        "rotate_mid_left": rotate_mid + c["MID_LOOSE_WAIT_L"],
+    })
+
+
+@dataclass
+class ServoTimeModel:
+    predicted: Dict[str, float]
+    measured: Dict[str, Tuple[float, int]] = field(default_factory=dict)   # primitive -> (médiane, n)
+    min_samples: int = DEFAULT_MIN_SAMPLES
+
+    def seconds(self, primitive: str) -> float:
+        m = self.measured.get(primitive)
+        if m is not None and m[1] >= self.min_samples:
+            return float(m[0])
+        return self.predicted[primitive]
+
+    def command(self, cmd: str, code: int, pos: str = "mid") -> Tuple[str, float, str]:
+        """(primitive, secondes, position suivante) d’une commande ; Fk = k flips."""
+        if cmd == "F":
+            return "flip", self.seconds("flip") * code, pos
+        if cmd not in ("S", "R"):
+            raise ValueError(f"Commande robot inconnue: {cmd}{code}")
+        try:
+            kind, nxt = _HOLDER_STEP[(code, pos)]
+        except KeyError:
+            raise ValueError(f"{cmd}{code} impossible depuis la position {pos!r}") from None
+        prim = ("spin_" if cmd == "S" else "rotate_") + kind
+        if prim == "rotate_mid":
+            prim += "_" + pos
+        return prim, self.seconds(prim), nxt
+
+    def min_command_seconds(self, cmd: str) -> float:
+        """Durée de la commande S ou R la moins chère, toutes positions du support confondues."""
+        return min(self.command(cmd, code, pos)[1] for code, pos in _HOLDER_STEP)
+
+    def durations(self, moves: Union[str, MoveSeq], pos: str = "mid") -> List[float]:
+        out = []
+        for cmd, code in MoveSeq.from_robot(moves).pairs():
+            _prim, s, pos = self.command(cmd, code, pos)
+            out.append(s)
+        return out
+
+    def sequence_seconds(self, moves: Union[str, MoveSeq], pos: str = "mid") -> float:
+        return sum(self.durations(moves, pos))
+
+    def table(self) -> List[Tuple[str, float, Optional[float], int]]:
+        """[(primitive, prédit, mesuré|None, n)] pour affichage."""
+        return [(p, self.predicted[p], *(self.measured.get(p) or (None, 0))) for p in PRIMITIVES]
+
+
+# ---------------------------------------------------------------------------
+# Calibration (logs JSONL)
+# ---------------------------------------------------------------------------
+def _samples(paths: Iterable[str]) -> Dict[str, List[float]]:
+    out: Dict[str, List[float]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    continue
+                if (ev.get("event") != "execute_move" or ev.get("status") != "completed"
+                        or ev.get("dry_run") or ev.get("timeline") or ev.get("primitive") not in PRIMITIVES
+                        or ev.get("duration_s") is None):
+                    continue
+                count = int(ev.get("count") or 1)
+                out.setdefault(ev["primitive"], []).append(float(ev["duration_s"]) / count)
+    return out
+
+
+def calibrate(paths: Iterable[str], out_path: Optional[str] = None) -> Dict[str, Tuple[float, int]]:
+    """Médiane des durées mesurées par primitive, écrite dans le fichier de calibration."""
+    measured = {p: (round(statistics.median(v), 4), len(v)) for p, v in _samples(paths).items()}
+    path = out_path or _calibration_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"primitives": {p: {"seconds": s, "n": n} for p, (s, n) in measured.items()}},
+                  f, indent=2)
+    get_servo_model(reload=True)
+    return measured
+
+
+def _calibration_path() -> str:
+    path = _timing_cfg("path", DEFAULT_PATH)
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+def _load_measured(path: str) -> Dict[str, Tuple[float, int]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {p: (float(v["seconds"]), int(v.get("n", 0)))
+            for p, v in (data.get("primitives") or {}).items() if p in PRIMITIVES}
+
+
+_MODEL: Optional[ServoTimeModel] = None
+
+
+def get_servo_model(reload: bool = False) -> ServoTimeModel:
+    global _MODEL
+    if _MODEL is None or reload:
+        _MODEL = ServoTimeModel(
+            predicted=predict_primitives(servo_constants()),
+            measured=_load_measured(_calibration_path()),
+            min_samples=int(_timing_cfg("min_samples", DEFAULT_MIN_SAMPLES)),
+        )
+    return _MODEL
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Modèle de temps servo F/S/R")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("show")
+    p_cal = sub.add_parser("calibrate")
+    p_cal.add_argument("logs", nargs="+", help="JSONL de progression (execute_move)")
+    p_est = sub.add_parser("estimate")
+    p_est.add_argument("moves")
+    args = ap.parse_args()
+
+    if args.cmd == "calibrate":
+        for prim, (s, n) in sorted(calibrate(args.logs).items()):
+            print(f"  {prim:17s} {s:.3f}s  (n={n})")
+        print(f"✅ calibration écrite : {_calibration_path()}")
+    elif args.cmd == "estimate":
+        model = get_servo_model()
+        print(f"{args.moves} : ~{model.sequence_seconds(args.moves):.2f}s")
+    else:
+        model = get_servo_model()
+        for prim, pred, meas, n in model.table():
+            used = "mesuré" if meas is not None and n >= model.min_samples else "prédit"
+            meas_txt = f"{meas:.3f}s (n={n})" if meas is not None else "-"
+            print(f"  {prim:17s} prédit {pred:.3f}s  mesuré {meas_txt:16s} -> {used}")
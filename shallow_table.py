@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  shallow_table.py
+#  ----------------
+#  Objectif :
+#     Solutions **optimales instantanées** pour les cubes peu mélangés (démos :
+#     "F' U B"...) via une table de distances précalculée (BFS depuis l’état
+#     résolu, métrique demi-tours HTM, 18 mouvements), mappée en mémoire.
+#     kociemba reste le solveur général (fallback).
+#
+#  Format du fichier (1 seul fichier binaire, trié -> recherche dichotomique sur mmap) :
+#     en-tête 16 octets : MAGIC(8) | depth(1) | count(4, big-endian) | pad(3)
+#     enregistrements 9 octets : key(8, blake2b de l’état, big-endian) | move(1)
+#       move = index (MOVE_NAMES) du mouvement qui rapproche de l’état résolu.
+#
+#  Recherche :
+#     - état dans la table : on suit la chaîne move -> parent jusqu’à résolu
+#       (profondeur <= depth, optimal par construction du BFS).
+#     - sinon : expansion côté requête sur extra_depth niveaux (18^k lookups) ;
+#       le premier niveau qui touche la table donne une solution optimale
+#       (longueur depth + k).
+#     - toute solution est vérifiée sur CubeState (collision de hash impossible à
+#       propager).
+#
+#  Compromis taille / profondeur (états cumulés, fichier, build sur PC ; Pi ~10× plus lent) :
+#     depth 4 :    46 741 états   ~0.4 Mo   ~0.2 s
+#     depth 5 :   621 649 états   ~5.6 Mo   ~2.5 s   (défaut)
+#     depth 6 : 8 240 087 états  ~74 Mo     RAM de build ~1.5 Go : construire sur PC
+#     + extra_depth=1 : couvre depth+1 pour ~18 chaînes de lookups (~0.1 ms).
+#
+#  Entrées principales :
+#     - build_table(depth, out_path)           : BFS + écriture atomique
+#     - ShallowTable(path).solve(cube) -> Optional[str]  (Singmaster, "" si résolu)
+#     - shallow_solve(cube) -> Optional[str]   : table de la config (singleton), None si hors table
+#
+#  Exécution directe :
+#     python shallow_table.py build --depth 5 [--out shallow_table.bin]
+#     python shallow_table.py solve <cubestring>
+#
+#  Config (config.json -> solver.shallow) :
+#     enabled, path, extra_depth
+# ============================================================================
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cube_state import MOVE_PERMS, SOLVED, _getter
+
+MAGIC = b"RBXSHL01"
+HEADER_SIZE = 16
+REC_SIZE = 9
+DEFAULT_TABLE = Path(__file__).parent / "shallow_table.bin"
+
+MOVE_NAMES: List[str] = list(MOVE_PERMS)
+_GETTERS = [_getter(MOVE_PERMS[m]) for m in MOVE_NAMES]
+_INV_MOVE = [MOVE_NAMES.index(m[0] + {"": "'", "'": "", "2": "2"}[m[1:]]) for m in MOVE_NAMES]
+_SOLVED = SOLVED.encode("ascii")
+
+
+def _key(state: bytes) -> bytes:
+    return hashlib.blake2b(state, digest_size=8).digest()
+
+
+def _apply(state: bytes, move_idx: int) -> bytes:
+    return bytes(_GETTERS[move_idx](state))
+
+
+# ---------------------------------------------------------------------------
+# Construction (BFS)
+# ---------------------------------------------------------------------------
+def build_table(depth: int, out_path=DEFAULT_TABLE, verbose: bool = True) -> int:
+    """BFS depuis résolu jusqu’à `depth` ; écrit la table triée. Retourne le nb d’états."""
+    t0 = time.perf_counter()
+    to_solved: Dict[bytes, int] = {_SOLVED: 255}        # 255 = résolu (fin de chaîne)
+    frontier = [_SOLVED]
+    for d in range(1, depth + 1):
+        nxt = []
+        for st in frontier:
+            for mi in range(len(MOVE_NAMES)):
+                child = _apply(st, mi)
+                if child not in to_solved:
+                    to_solved[child] = _INV_MOVE[mi]
+                    nxt.append(child)
+        frontier = nxt
+        if verbose:
+            print(f"  profondeur {d}: {len(nxt)} nouveaux états ({len(to_solved)} cumulés, "
+                  f"{time.perf_counter() - t0:.1f}s)")
+
+    recs = sorted((_key(st), mv) for st, mv in to_solved.items())
+    del to_solved
+
+    out_path = str(out_path)
+    tmp = out_path + ".tmp"
+    dup = 0
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack(">BI", depth, 0) + b"\0" * 3)
+        n = 0
+        prev = None
+        for k, mv in recs:
+            if k == prev:              # collision de hash : on garde le 1er (vérif au lookup)
+                dup += 1
+                continue
+            f.write(k + bytes((mv,)))
+            prev = k
+            n += 1
+        f.seek(len(MAGIC))
+        f.write(struct.pack(">BI", depth, n))
+    os.replace(tmp, out_path)
+
+    if verbose:
+        size_mb = os.path.getsize(out_path) / 1e6
+        print(f"✅ {out_path}: {n} états, depth={depth}, {size_mb:.1f} Mo"
+              + (f", {dup} collisions ignorées" if dup else "")
+              + f" ({time.perf_counter() - t0:.1f}s)")
+    return n
+
+
+# ---------------------------------------------------------------------------
+# Lecture (mmap + dichotomie)
+# ---------------------------------------------------------------------------
+class ShallowTable:
+    """Table de distances mappée en mémoire (lecture seule, partageable entre process)."""
+
+    def __init__(self, path=DEFAULT_TABLE):
+        self.path = str(path)
+        self._fh = open(self.path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path}: pas une table shallow ({self._mm[:8]!r})")
+        self.depth, self.count = struct.unpack(">BI", self._mm[len(MAGIC):len(MAGIC) + 5])
+
+    def _lookup(self, key: bytes) -> Optional[int]:
+        mm = self._mm
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            off = HEADER_SIZE + mid * REC_SIZE
+            k = mm[off:off + 8]
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return mm[off + 8]
+        return None
+
+    def _chain(self, state: bytes) -> Optional[List[str]]:
+        """Chaîne des mouvements vers résolu (None si état absent / chaîne incohérente)."""
+        out: List[str] = []
+        for _ in range(self.depth + 1):
+            if state == _SOLVED:
+                return out
+            mv = self._lookup(_key(state))
+            if mv is None or mv == 255:
+                return None
+            out.append(MOVE_NAMES[mv])
+            state = _apply(state, mv)
+        return out if state == _SOLVED else None
+
+    def solve(self, cube: str, extra_depth: int = 1) -> Optional[str]:
+        """Solution optimale si dist(cube) <= depth + extra_depth, sinon None."""
+        start = cube.encode("ascii")
+        level = [(start, [])]
+        for k in range(extra_depth + 1):
+            for st, path in level:
+                tail = self._chain(st)
+                if tail is not None:
+                    return " ".join(path + tail)
+            if k == extra_depth:
+                break
+            nxt = []
+            for st, path in level:
+                last = path[-1][0] if path else None
+                for mi, name in enumerate(MOVE_NAMES):
+                    if name[0] == last:        # même face 2 fois de suite : jamais optimal
+                        continue
+                    nxt.append((_apply(st, mi), path + [name]))
+            level = nxt
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+        self._fh.close()
+
+
+_TABLE: Optional[ShallowTable] = None
+_TABLE_LOADED = False
+_TABLE_LOCK = threading.Lock()
+
+
+def _shallow_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.shallow.{key}", default)
+    except Exception:
+        return default
+
+
+def get_shallow_table() -> Optional[ShallowTable]:
+    """Table de la config (ouverte une fois), None si désactivée ou fichier absent."""
+    global _TABLE, _TABLE_LOADED
+    with _TABLE_LOCK:
+        if not _TABLE_LOADED:
+            _TABLE_LOADED = True
+            if _shallow_cfg("enabled", False):
+                path = Path(_shallow_cfg("path", "") or DEFAULT_TABLE)
+                if not path.is_absolute():
+                    path = Path(__file__).parent / path
+                if path.exists():
+                    try:
+                        _TABLE = ShallowTable(path)
+                    except Exception as e:
+                        print(f"⚠️ table shallow illisible ({path}): {e}")
+        return _TABLE
+
+
+def shallow_solve(cube: str) -> Optional[str]:
+    """Solution optimale depuis la table (vérifiée), None si hors portée / table absente."""
+    table = get_shallow_table()
+    if table is None:
+        return None
+    sol = table.solve(cube, extra_depth=int(_shallow_cfg("extra_depth", 1)))
+    if sol is None:
+        return None
+    st = cube.encode("ascii")
+    for m in sol.split():
+        st = _apply(st, MOVE_NAMES.index(m))
+    return sol if st == _SOLVED else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Table de distances (cubes peu mélangés)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_b = sub.add_parser("build")
+    p_b.add_argument("--depth", type=int, default=5)
+    p_b.add_argument("--out", default=str(DEFAULT_TABLE))
+    p_s = sub.add_parser("solve")
+    p_s.add_argument("cube")
+    p_s.add_argument("--table", default=str(DEFAULT_TABLE))
+    p_s.add_argument("--extra", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        build_table(args.depth, args.out)
+    else:
+        t = ShallowTable(args.table)
+        t0 = time.perf_counter()
+        sol = t.solve(args.cube, extra_depth=args.extra)
+        dt_us = (time.perf_counter() - t0) * 1e6
+        print(f"{sol!r} ({dt_us:.0f} µs)" if sol is not None
+              else f"hors table (distance > {t.depth + args.extra})")
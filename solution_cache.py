@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  solution_cache.py
+#  -----------------
+#  Objectif :
+#     Cache de solutions à 2 niveaux pour solve_cube : les mêmes cubestrings
+#     (démos, scrambles de régression) reviennent sans cesse -> pas de recherche.
+#       1) LRU mémoire (OrderedDict, par process)
+#       2) store disque sqlite (partagé entre process : text_gui, Ecran, daemon…)
+#
+#  Clé : (cubestring, method, params)   ex: params="depth=21,timeout=5.0" pour k2
+#        cubestring = forme canonique sous les 48 symétries si solver.cache.canonical
+#        (solution stockée pour cette forme ; solver_wrapper la retransforme)
+#  Valeur : solution + solve_ms (temps de la recherche d’origine)
+#           + robot_moves (nb de mouvements robot compilés, si connu)
+#           + hits / created / last_used
+#
+#  Compteurs (hits / last_used) :
+#     mis à jour en mémoire à chaque hit (LRU ou disque) et écrits sur disque par
+#     paquets (flush_every hits ou flush_s secondes, avant éviction / stats / close,
+#     et à la sortie du process) : un hit mémoire ne coûte aucune écriture sqlite.
+#
+#  Bornes / éviction :
+#     - mémoire : max_mem entrées, LRU
+#     - disque  : max_disk entrées ; au-delà, suppression des moins récemment
+#                 utilisées (last_used), par paquets de 10 % pour amortir.
+#
+#  Entrées principales :
+#     - get_solution_cache() -> SolutionCache (singleton process, config solver.cache)
+#     - SolutionCache.get(cube, method, params) -> dict | None
+#     - SolutionCache.put(cube, method, params, solution, solve_ms, robot_moves=None)
+#     - SolutionCache.stats() / clear() / flush()
+#     - prewarm(cache, states, method="kociemba") -> (n_solved, n_cached, n_failed)
+#
+#  Exécution directe :
+#     python solution_cache.py prewarm <fichier> [--method k2]
+#         <fichier> : 1 cubestring par ligne, ou history.json (champs "singmaster")
+#     python solution_cache.py stats
+#     python solution_cache.py clear
+#
+#  Config (config.json -> solver.cache) :
+#     enabled, canonical, path, max_mem, max_disk
+# ============================================================================
+
+from __future__ import annotations
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB = Path(__file__).parent / "solution_cache.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    cube        TEXT NOT NULL,
+    method      TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    solution    TEXT NOT NULL,
+    solve_ms    REAL,
+    robot_moves INTEGER,
+    hits        INTEGER NOT NULL DEFAULT 0,
+    created     REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    PRIMARY KEY (cube, method, params)
+);
+CREATE INDEX IF NOT EXISTS idx_solutions_last_used ON solutions(last_used);
+"""
+
+_FIELDS = ("solution", "solve_ms", "robot_moves", "hits", "created", "last_used")
+FLUSH_EVERY = 32
+FLUSH_S = 60.0
+
+
+def robot_move_count(solution: str) -> Optional[int]:
+    """Nb de mouvements robot compilés (best-effort, None si Cubotino indisponible)."""
+    try:
+        from robot_moves_cubotino import compile_robot_moves
+        return int(compile_robot_moves(solution)[1])
+    except Exception:
+        return None
+
+
+class SolutionCache:
+    """LRU mémoire + sqlite. Thread-safe (1 connexion protégée par verrou)."""
+
+    def __init__(self, path=DEFAULT_DB, max_mem: int = 256, max_disk: int = 20000,
+                 flush_every: int = FLUSH_EVERY, flush_s: float = FLUSH_S):
+        self.path = str(path)
+        self.max_mem = max(0, int(max_mem))
+        self.max_disk = max(1, int(max_disk))
+        self.flush_every = max(1, int(flush_every))
+        self.flush_s = float(flush_s)
+        self._mem: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._touched: Dict[Tuple[str, str, str], List[float]] = {}    # clé -> [hits, last_used] à écrire
+        self._n_touched = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.mem_hits = self.disk_hits = self.misses = 0
+
+        self._db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def get(self, cube: str, method: str, params: str = "") -> Optional[Dict[str, Any]]:
+        key = (cube, method, params)
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.mem_hits += 1
+                hit["hits"] = (hit.get("hits") or 0) + 1
+                hit["last_used"] = now
+                self._touch(key, now)
+                return dict(hit)
+
+            row = self._db.execute(
+                "SELECT solution, solve_ms, robot_moves, hits, created, last_used FROM solutions "
+                "WHERE cube=? AND method=? AND params=?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            entry = dict(zip(_FIELDS, row))
+            pending = self._touched.get(key)
+            entry["hits"] += 1 + (int(pending[0]) if pending else 0)
+            entry["last_used"] = now
+            self.disk_hits += 1
+            self._touch(key, now)
+            self._remember(key, entry)
+            return dict(entry)
+
+    def _touch(self, key, now: float) -> None:
+        """Hit compté en mémoire ; écriture sqlite groupée (_flush_locked)."""
+        pending = self._touched.setdefault(key, [0, now])
+        pending[0] += 1
+        pending[1] = now
+        self._n_touched += 1
+        if self._n_touched >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_s:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._touched:
+            return
+        rows = [(int(n), last, *key) for key, (n, last) in self._touched.items()]
+        self._touched.clear()
+        self._n_touched = 0
+        self._db.executemany("UPDATE solutions SET hits=hits+?, last_used=MAX(last_used, ?) "
+                             "WHERE cube=? AND method=? AND params=?", rows)
+        self._db.commit()
+
+    def flush(self) -> None:
+        """Écrit les compteurs de hits en attente."""
+        with self._lock:
+            self._flush_locked()
+
+    def _remember(self, key, entry: Dict[str, Any]) -> None:
+        if self.max_mem == 0:
+            return
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_mem:
+            self._mem.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def put(self, cube: str, method: str, params: str, solution: str,
+            solve_ms: Optional[float] = None, robot_moves: Optional[int] = None) -> None:
+        key = (cube, method, params)
+        now = time.time()
+        entry = {"solution": solution, "solve_ms": solve_ms, "robot_moves": robot_moves,
+                 "hits": 0, "created": now, "last_used": now}
+        with self._lock:
+            self._touched.pop(key, None)       # entrée remplacée : compteurs remis à zéro
+            self._db.execute(
+                "INSERT OR REPLACE INTO solutions "
+                "(cube, method, params, solution, solve_ms, robot_moves, hits, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                key + (solution, solve_ms, robot_moves, now, now))
+            self._evict_disk()
+            self._db.commit()
+            self._remember(key, entry)
+
+    def _evict_disk(self) -> None:
+        (n,) = self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()
+        if n <= self.max_disk:
+            return
+        self._flush_locked()   # last_used à jour avant de choisir les victimes
+        drop = n - self.max_disk + max(1, self.max_disk // 10)
+        self._db.execute(
+            "DELETE FROM solutions WHERE rowid IN "
+            "(SELECT rowid FROM solutions ORDER BY last_used ASC LIMIT ?)", (drop,))
+        self._mem.clear()      # simple et sûr : l’éviction disque est rare
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_locked()
+            n, hits, avg_ms = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), AVG(solve_ms) FROM solutions").fetchone()
+        return {"path": self.path, "disk_entries": n, "disk_hits_total": hits,
+                "avg_solve_ms": None if avg_ms is None else round(avg_ms, 2),
+                "mem_entries": len(self._mem), "mem_hits": self.mem_hits,
+                "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._n_touched = 0
+            self._db.execute("DELETE FROM solutions")
+            self._db.commit()
+            self._mem.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._db.close()
+
+
+_CACHE: Optional[SolutionCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.cache.{key}", default)
+    except Exception:
+        return default
+
+
+def cache_enabled() -> bool:
+    return bool(_cache_cfg("enabled", False))
+
+
+def canonical_keys() -> bool:
+    """Clés canoniques (cube_symmetry) plutôt que cubestring brute."""
+    return bool(_cache_cfg("canonical", True))
+
+
+def get_solution_cache() -> SolutionCache:
+    """Singleton process (ouvert au premier usage, paramètres config solver.cache)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = _cache_cfg("path", None) or DEFAULT_DB
+            if not Path(path).is_absolute():
+                path = Path(__file__).parent / path
+            _CACHE = SolutionCache(path,
+                                   max_mem=_cache_cfg("max_mem", 256),
+                                   max_disk=_cache_cfg("max_disk", 20000))
+            atexit.register(_CACHE.flush)
+        return _CACHE
+
+
+# ---------------------------------------------------------------------------
+# Pré-chauffage
+# ---------------------------------------------------------------------------
+def read_states(path: str) -> List[str]:
+    """Cubestrings d’un fichier texte (1 par ligne, '#' = commentaire) ou d’un history.json."""
+    p = Path(path)
+    if p.suffix.lower() == ".json":
+        with open(p, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        out = []
+        for entry in data if isinstance(data, list) else []:
+            s = ((entry or {}).get("data") or {}).get("singmaster")
+            if isinstance(s, str):
+                out.append(s.strip())
+    else:
+        with open(p, "r", encoding="utf-8") as f:
+            out = [ln.split("#", 1)[0].strip() for ln in f]
+    # dédoublonnage en gardant l’ordre
+    return list(dict.fromkeys(s for s in out if len(s) == 54))
+
+
+def prewarm(cache: SolutionCache, states: Iterable[str], method: str = "kociemba") -> Tuple[int, int, int]:
+    """Résout et stocke chaque état absent du cache. Retourne (résolus, déjà en cache, échecs)."""
+    from cube_symmetry import canonical_key
+    from solver_wrapper import SOLVER_PARAMS, solve_cube
+
+    params = SOLVER_PARAMS.get(method, "")
+    solved = cached = failed = 0
+    for cube in states:
+        key = canonical_key(cube) if canonical_keys() else cube
+        if cache.get(key, method, params) is not None:
+            cached += 1
+            continue
+        try:
+            # solve_cube(use_cache=True) stocke lui-même l’entrée (solve_ms + robot_moves)
+            solve_cube(cube, method=method, use_cache=True, cache=cache)
+            solved += 1
+        except Exception as e:
+            print(f"⚠️ {cube}: {e}")
+            failed += 1
+    return solved, cached, failed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Cache de solutions (LRU + sqlite)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_pre = sub.add_parser("prewarm", help="pré-remplit le cache depuis un fichier d’états")
+    p_pre.add_argument("file")
+    p_pre.add_argument("--method", default="kociemba", choices=["kociemba", "k2"])
+    sub.add_parser("stats")
+    sub.add_parser("clear")
+    args = ap.parse_args()
+
+    cache = get_solution_cache()
+    if args.cmd == "prewarm":
+        states = read_states(args.file)
+        t0 = time.perf_counter()
+        n_ok, n_cached, n_ko = prewarm(cache, states, method=args.method)
+        print(f"✅ {len(states)} états : {n_ok} résolus, {n_cached} déjà en cache, {n_ko} échecs "
+              f"({time.perf_counter() - t0:.1f}s)")
+    elif args.cmd == "stats":
+        print(json.dumps(cache.stats(), indent=2, ensure_ascii=False))
+    elif args.cmd == "clear":
+        cache.clear()
+        print("🧹 Cache vidé")
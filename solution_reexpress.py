@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  solution_reexpress.py
+#  ---------------------
+#  Objectif :
+#     Choisir, pour un même cube physique, l’expression de solution la moins
+#     chère en **temps servo**. Avec le mapping Cubotino, U/D sont quasi gratuits
+#     alors que F/B/R/L demandent des flips : la même résolution coûte très
+#     différemment selon les faces qu’elle utilise.
+#
+#  Principe (orientations du cube entier, cube_symmetry) :
+#     - pour chaque symétrie g (24 rotations, + 24 miroirs en option) :
+#         conj = conjugate(cube, g)         (le cube "vu" tourné / recolorié)
+#         M_g  = solveur(conj)               (re-résolution : le solveur dépend du repère)
+#         M    = g^-1(M_g)                   (ré-exprimée dans le repère robot)
+#     - simple ré-étiquetage g^-1(g(M)) = M : seul le re-solve apporte des variantes
+#     - chaque M est compilée (robot_required_moves via compile_robot_moves) et
+#       chiffrée (estimate_robot_seconds) ; on garde la moins chère.
+#     - chaque candidat est vérifié sur CubeState (résout bien le cube) avant usage.
+#     - re-résolutions hors cache (use_cache=False) : les solutions de repères
+#       conjugués ne sont pas des entrées utiles pour solution_cache.
+#     - stop_flag (E-STOP) contrôlé entre deux symétries ; le temps de re-résolution
+#       est décompté du gain (net_s) : il est payé avant le premier mouvement.
+#
+#  Entrées principales :
+#     - reexpress_solution(cube, solution, method="kociemba", mirrors=None, budget_s=None,
+#                          start_mode="UFR", stop_flag=None)
+#         -> ReexpressResult (solution, transform, robot_s, base_robot_s, saved_s,
+#                             search_s, net_s, tried, stopped)
+#         start_mode = orientation de départ de l’exécution ("LUB" sur le robot) :
+#         les plans robot comparés sont ceux qui seront réellement exécutés
+#
+#  Config (config.json -> solver.reexpress) :
+#     enabled (false par défaut : jusqu’à budget_s de recherche en plus à chaque
+#     résolution), mirrors (48 au lieu de 24), budget_s (temps max de re-résolution)
+# ============================================================================
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from cube_state import ORIENTATIONS, SYMMETRIES, CubeState
+from cube_symmetry import conjugate, solution_from_canonical
+
+
+@dataclass
+class ReexpressResult:
+    solution: str
+    transform: str                    # nom de la symétrie retenue ("" = solution d’origine)
+    robot_moves: str
+    robot_s: float
+    base_robot_s: float
+    saved_s: float                    # gain servo estimé
+    search_s: float                   # temps passé à re-résoudre
+    net_s: float                      # saved_s - search_s (gain réel sur la durée totale)
+    tried: int
+    stopped: bool = False             # interrompu par stop_flag
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_event(self) -> Dict[str, Any]:
+        return {"transform": self.transform or "identity", "robot_s": round(self.robot_s, 2),
+                "base_robot_s": round(self.base_robot_s, 2), "saved_s": round(self.saved_s, 2),
+                "search_s": round(self.search_s, 2), "net_s": round(self.net_s, 2),
+                "tried": self.tried, "stopped": self.stopped}
+
+
+def _reexpress_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.reexpress.{key}", default)
+    except Exception:
+        return default
+
+
+def reexpress_enabled() -> bool:
+    return bool(_reexpress_cfg("enabled", False))
+
+
+def _solves(cube: str, solution: str) -> bool:
+    try:
+        return CubeState.from_string(cube).apply_moves(solution.split()).is_solved()
+    except KeyError:
+        return False
+
+
+def reexpress_solution(cube: str, solution: str, method: str = "kociemba",
+                       mirrors: Optional[bool] = None, budget_s: Optional[float] = None,
+                       start_mode: str = "UFR", stop_flag=None) -> ReexpressResult:
+    """Meilleure expression (temps servo estimé) parmi les re-résolutions sous symétries.
+
+    stop_flag (threading.Event) : contrôlé entre deux re-résolutions, le meilleur
+    candidat trouvé jusque-là est rendu avec stopped=True.
+    """
+    from robot_moves_cubotino import compile_robot_moves, estimate_robot_seconds
+    from solver_wrapper import solve_cube
+
+    mirrors = bool(_reexpress_cfg("mirrors", False)) if mirrors is None else mirrors
+    budget = float(budget_s if budget_s is not None else _reexpress_cfg("budget_s", 3.0))
+    move_time_s = _reexpress_cfg("move_time_s", None)
+    if method == "portfolio":
+        method = "kociemba"              # re-résolutions : solveur rapide unique
+
+    n_sym = len(SYMMETRIES) if mirrors else len(ORIENTATIONS)
+    t0 = time.perf_counter()
+
+    base_moves, _ = compile_robot_moves(solution, start_mode=start_mode)
+    base_s = estimate_robot_seconds(base_moves, move_time_s)
+    best = (base_s, solution, 0, base_moves)
+    candidates = [{"transform": "identity", "robot_s": round(base_s, 2)}]
+    seen = {solution}
+    stopped = False
+
+    for k in range(1, n_sym):
+        if stop_flag is not None and stop_flag.is_set():
+            stopped = True
+            break
+        if time.perf_counter() - t0 > budget:
+            break
+        try:
+            sol_k = solve_cube(conjugate(cube, k), method=method, validate=False, use_cache=False)
+        except Exception as e:
+            candidates.append({"transform": SYMMETRIES[k].name, "error": str(e)})
+            continue
+        back = solution_from_canonical(sol_k, k)      # g^-1(M_g) : repère robot
+        if back in seen:
+            continue
+        seen.add(back)
+        if not _solves(cube, back):
+            candidates.append({"transform": SYMMETRIES[k].name, "error": "ne résout pas le cube"})
+            continue
+        moves, _n = compile_robot_moves(back, start_mode=start_mode, use_cache=False)
+        cost = estimate_robot_seconds(moves, move_time_s)
+        candidates.append({"transform": SYMMETRIES[k].name, "robot_s": round(cost, 2)})
+        if cost < best[0]:
+            best = (cost, back, k, moves)
+
+    cost, sol, k, moves = best
+    search_s = time.perf_counter() - t0
+    return ReexpressResult(solution=sol, transform=SYMMETRIES[k].name, robot_moves=moves,
+                           robot_s=cost, base_robot_s=base_s, saved_s=base_s - cost,
+                           search_s=search_s, net_s=base_s - cost - search_s,
+                           tried=len(candidates), stopped=stopped, candidates=candidates)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from solver_wrapper import solve_cube
+
+    cube = sys.argv[1] if len(sys.argv) > 1 else "DUUBULDBFRBFRRULLLBRDFFFBLURDBFDFDRFRULBLUFDURRBLBDUDL"
+    sol = solve_cube(cube)
+    res = reexpress_solution(cube, sol, budget_s=30.0)
+    print(f"origine   : {sol}  (~{res.base_robot_s:.1f}s)")
+    print(f"retenue   : {res.solution}  (~{res.robot_s:.1f}s, transform='{res.transform}')")
+    print(f"gain      : {res.saved_s:.1f}s sur {res.tried} expressions "
+          f"(recherche {res.search_s:.1f}s, net {res.net_s:+.1f}s)")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  solver_async.py
+#  ---------------
+#  Objectif :
+#     Résolution **asynchrone et annulable** pour le pipeline robot :
+#     solve_cube() bloque le thread pipeline pendant toute la recherche (jusqu’à
+#     ~5 s en twophase) et un E-STOP n’est vu qu’au retour. Ici la recherche
+#     tourne dans un process worker, que l’on peut tuer à tout instant.
+#
+#  Principe :
+#     - raccourcis immédiats dans le process appelant (aucun worker lancé) :
+#       validation, table shallow, cache de solutions -> Future déjà résolue.
+#     - kociemba / k2 avec le daemon chaud actif (solver.daemon.enabled + ping) :
+#       requête daemon dans un thread du process appelant (pas de spawn, tables
+#       déjà chargées) ; une requête socket n’est pas interruptible, elle est
+#       abandonnée à l’E-STOP (réponse tardive ignorée)
+#     - portfolio : solver_portfolio.solve_portfolio (pool chaud) dans un thread ;
+#       à l’E-STOP la course est arrêtée et ses workers tués (stop_flag du
+#       portfolio) ; bornée par solver.portfolio.deadline_s
+#     - sinon : 1 process "spawn" par résolution, qui publie ses solutions
+#       au fil de l’eau dans une Queue :
+#         * kociemba     : 1 solution
+#         * k2           : resserrement itératif (max_length = meilleure - 1) jusqu’au
+#                          budget -> chaque amélioration est publiée
+#         * kociemba+k2  : kociemba d’abord (rapide), puis resserrement k2 ; le
+#                          parent garde la moins chère en temps servo estimé
+#     - un thread moniteur (process appelant) lit la Queue, met à jour
+#       future.best, et surveille stop_flag + deadline :
+#         * stop_flag levé  -> worker terminé, future annulée (CancelledError)
+#         * deadline        -> worker terminé, meilleure solution connue (ou TimeoutError)
+#
+#  Entrées principales :
+#     - solve_cube_async(cube, method="kociemba", stop_flag=None, on_best=None,
+#                        budget_s=None, deadline_s=None, start_mode="UFR") -> SolveFuture
+#     - SolveFuture (concurrent.futures.Future) :
+#         .result(timeout)   solution finale (Singmaster)
+#         .best / .best_cost meilleure solution reçue jusqu’ici (streaming)
+#         .cancel()          tue le worker
+#
+#  Config (config.json -> solver.async) :
+#     enabled, budget_s (recherche k2), deadline_s (attente max, spawn compris),
+#     park_while_solving (robot_solver : mise en pose d’exécution pendant la recherche)
+#
+#  Notes :
+#     - "spawn" comme solver_portfolio : le worker n’hérite ni de pigpio ni de la caméra.
+#       Le coût de démarrage (import + tables twophase) est payé à chaque recherche
+#       sans daemon ; les cubes fréquents passent par le cache / la table shallow.
+# ============================================================================
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_DEADLINE_S = 20.0
+ASYNC_METHODS = ("kociemba", "k2", "kociemba+k2", "portfolio")
+SERVO_COST_METHODS = ("kociemba+k2", "portfolio")     # coût = temps servo estimé
+_JOIN_ABANDON_S = 0.05
+
+
+def _async_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.async.{key}", default)
+    except Exception:
+        return default
+
+
+def async_enabled() -> bool:
+    return bool(_async_cfg("enabled", False))
+
+
+def park_while_solving() -> bool:
+    return bool(_async_cfg("park_while_solving", True))
+
+
+# ---------------------------------------------------------------------------
+# Worker (process séparé)
+# ---------------------------------------------------------------------------
+def _worker(cube: str, method: str, budget_s: float, out) -> None:
+    """Publie ("best", solution, search_s) à chaque solution, ("error", msg), puis ("done",)."""
+    from solver_wrapper import K2_MAX_DEPTH, solve_with_kociemba, solve_with_kociemba_2_state
+
+    t0 = time.perf_counter()
+    try:
+        if method in ("kociemba", "kociemba+k2"):
+            try:
+                out.put(("best", solve_with_kociemba(cube), time.perf_counter() - t0))
+            except Exception as e:
+                if method == "kociemba":
+                    raise
+                out.put(("error", f"kociemba: {type(e).__name__}: {e}"))
+
+        if method in ("k2", "kociemba+k2"):
+            max_len, best_n = K2_MAX_DEPTH, None
+            while True:
+                remaining = budget_s - (time.perf_counter() - t0)
+                if remaining <= 0:
+                    break
+                sol = solve_with_kociemba_2_state(cube, max_length=max_len, timeout=remaining)
+                n = len(sol.split())
+                if best_n is not None and n >= best_n:
+                    break                      # budget épuisé sans amélioration
+                out.put(("best", sol, time.perf_counter() - t0))
+                if n == 0:
+                    break
+                best_n, max_len = n, n - 1
+    except Exception as e:
+        out.put(("error", f"{type(e).__name__}: {e}"))
+    out.put(("done",))
+
+
+def _thread_worker(search: Callable[[], str], out) -> None:
+    """Même protocole que _worker, pour une recherche faite dans un thread."""
+    t0 = time.perf_counter()
+    try:
+        out.put(("best", search(), time.perf_counter() - t0))
+    except Exception as e:
+        out.put(("error", f"{type(e).__name__}: {e}"))
+    out.put(("done",))
+
+
+class _ThreadJob:
+    """
+    Recherche dans un thread du process appelant (daemon, portfolio), même interface
+    que multiprocessing.Process pour le moniteur. terminate() abandonne la recherche
+    (résultat tardif plus lu) et lève cancel si fourni : le portfolio s’arrête et tue
+    ses workers ; une requête daemon, elle, n’est pas interruptible.
+    """
+
+    exitcode = None
+
+    def __init__(self, search: Callable[[], str], out, name: str,
+                 cancel: Optional[threading.Event] = None):
+        self._thread = threading.Thread(target=_thread_worker, args=(search, out), name=name, daemon=True)
+        self._cancel = cancel
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout=_JOIN_ABANDON_S)       # jamais bloqué par une recherche abandonnée
+
+    def terminate(self) -> None:
+        if self._cancel is not None:
+            self._cancel.set()
+
+
+def _daemon_ok() -> bool:
+    from solver_daemon import daemon_available
+    from solver_wrapper import _use_daemon_default
+    return _use_daemon_default() and daemon_available()
+
+
+# ---------------------------------------------------------------------------
+# Future + moniteur (process appelant)
+# ---------------------------------------------------------------------------
+class SolveFuture(Future):
+    """Future de résolution : meilleure solution courante + annulation qui tue le worker."""
+
+    def __init__(self):
+        super().__init__()
+        self.best: Optional[str] = None
+        self.best_cost: Optional[float] = None
+        self.history: List[Tuple[float, str]] = []      # (search_s, solution) reçues
+        self.source: str = ""                           # shallow / cache / daemon / portfolio / worker
+        self._proc = None
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is not None and proc.is_alive():
+            proc.terminate()
+            proc.join(timeout=1.0)
+
+    def cancel(self) -> bool:
+        self._kill()
+        return super().cancel()
+
+
+def _resolved(solution: str, source: str) -> SolveFuture:
+    fut = SolveFuture()
+    fut.best, fut.source = solution, source
+    fut.set_result(solution)
+    return fut
+
+
+def _cost_fn(method: str, start_mode: str = "UFR") -> Callable[[str], float]:
+    if method not in SERVO_COST_METHODS:
+        return lambda sol: float(len(sol.split()))
+    from robot_moves_cubotino import compile_robot_moves, estimate_robot_seconds
+    move_time_s = _async_cfg("move_time_s", None)
+    return lambda sol: estimate_robot_seconds(
+        compile_robot_moves(sol, start_mode=start_mode, use_cache=False)[0], move_time_s)
+
+
+def _monitor(fut: SolveFuture, proc, out, stop_flag, deadline: float, cost,
+             on_best, on_done) -> None:
+    t_end = time.monotonic() + deadline
+    error = None
+    finished = False
+    while not fut.done():
+        if stop_flag is not None and stop_flag.is_set():
+            fut.cancel()
+            return
+        if time.monotonic() > t_end:
+            fut._kill()
+            break
+        try:
+            msg = out.get(timeout=0.05)
+        except queue.Empty:
+            if not proc.is_alive() and out.empty():
+                error = error or f"worker terminé (code {proc.exitcode})"
+                break
+            continue
+        if msg[0] == "best":
+            _tag, sol, search_s = msg
+            fut.history.append((search_s, sol))
+            try:
+                c = cost(sol)
+            except Exception as e:
+                error = f"coût: {e}"
+                continue
+            if fut.best_cost is None or c < fut.best_cost:
+                fut.best, fut.best_cost = sol, c
+                if on_best:
+                    try:
+                        on_best(sol, c, search_s)
+                    except Exception as e:
+                        print(f"[WARN] on_best failed: {e}")
+        elif msg[0] == "error":
+            error = msg[1]
+        elif msg[0] == "done":
+            finished = True
+            break
+
+    proc.join(timeout=1.0)
+    if fut.done():
+        return
+    if fut.best is not None:
+        fut.set_result(fut.best)
+        if finished and on_done:
+            on_done(fut.best)
+    elif finished or error:
+        fut.set_exception(RuntimeError(error or "aucune solution"))
+    else:
+        fut.set_exception(TimeoutError(f"aucune solution en {deadline:.1f}s"))
+
+
+def solve_cube_async(cube_state: str, method: str = "kociemba", stop_flag=None,
+                     on_best: Optional[Callable[[str, float, float], None]] = None,
+                     budget_s: Optional[float] = None, deadline_s: Optional[float] = None,
+                     validate: bool = True, use_shallow: bool = True,
+                     use_cache: Optional[bool] = None, start_mode: str = "UFR") -> SolveFuture:
+    """
+    Lance la résolution sans bloquer ; retourne une SolveFuture.
+    :param stop_flag: threading.Event (E-STOP) : levé -> worker tué, future annulée
+    :param on_best: callback(solution, coût, search_s) à chaque amélioration (thread moniteur)
+    :param budget_s: temps de recherche k2 (défaut : config solver.async.budget_s / K2_TIMEOUT_S)
+    :param deadline_s: attente max (spawn compris) avant de retenir la meilleure solution
+    :param start_mode: orientation de départ de l’exécution robot (coût servo du portfolio)
+    """
+    from cube_validator import assert_solvable
+    from shallow_table import shallow_solve
+    from solver_wrapper import K2_TIMEOUT_S, _cache_context, cached_solution, store_solution
+
+    if method not in ASYNC_METHODS:
+        raise ValueError(f"Solveur '{method}' non supporté pour le moment.")
+    if validate:
+        assert_solvable(cube_state)
+    if use_shallow:
+        sol = shallow_solve(cube_state)
+        if sol is not None:
+            return _resolved(sol, "shallow")
+
+    ctx = _cache_context(cube_state, method, use_cache)
+    if ctx is not None:
+        hit = cached_solution(ctx)
+        if hit is not None:
+            return _resolved(hit, "cache")
+
+    budget = float(budget_s if budget_s is not None else _async_cfg("budget_s", K2_TIMEOUT_S))
+    deadline = float(deadline_s if deadline_s is not None else _async_cfg("deadline_s", DEFAULT_DEADLINE_S))
+
+    fut = SolveFuture()
+    if method == "portfolio":
+        from solver_portfolio import solve_portfolio
+        out = queue.Queue()
+        cancel = threading.Event()
+        proc = _ThreadJob(lambda: solve_portfolio(cube_state, start_mode=start_mode, stop_flag=cancel).solution,
+                          out, name="solve-portfolio", cancel=cancel)
+        fut.source = "portfolio"
+    elif method in ("kociemba", "k2") and _daemon_ok():
+        from solver_wrapper import _solve_search
+        out = queue.Queue()
+        proc = _ThreadJob(lambda: _solve_search(cube_state, method, True), out, name=f"solve-{method}")
+        fut.source = "daemon"
+    else:
+        mp = multiprocessing.get_context("spawn")
+        out = mp.Queue()
+        proc = mp.Process(target=_worker, args=(cube_state, method, budget, out),
+                          name=f"solve-{method}", daemon=True)
+        fut.source = "worker"
+    fut._proc = proc
+    t0 = time.perf_counter()
+    proc.start()
+
+    on_done = None
+    if ctx is not None:
+        def _store(sol: str) -> None:
+            try:
+                store_solution(ctx, sol, solve_ms=(time.perf_counter() - t0) * 1e3)
+            except Exception as e:
+                print(f"⚠️ cache KO: {e}")
+        on_done = _store
+
+    threading.Thread(target=_monitor, name="solve-monitor", daemon=True,
+                     args=(fut, proc, out, stop_flag, deadline, _cost_fn(method, start_mode), on_best, on_done)).start()
+    return fut
+
+
+if __name__ == "__main__":
+    import sys
+
+    cube = sys.argv[1] if len(sys.argv) > 1 else "DUUBULDBFRBFRRULLLBRDFFFBLURDBFDFDRFRULBLUFDURRBLBDUDL"
+    method = sys.argv[2] if len(sys.argv) > 2 else "k2"
+    stop = threading.Event()
+    t0 = time.perf_counter()
+    f = solve_cube_async(cube, method=method, stop_flag=stop, use_cache=False,
+                         on_best=lambda s, c, t: print(f"  +{time.perf_counter() - t0:.2f}s  coût={c:.1f}  {s}"))
+    try:
+        print(f"✅ {f.result()}  ({f.source}, {time.perf_counter() - t0:.2f}s)")
+    except KeyboardInterrupt:
+        stop.set()
+        print("🔴 annulée")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  solver_daemon.py
+#  ----------------
+#  Objectif :
+#     Garder les solveurs **chauds** dans un process unique (service au boot) :
+#     kociemba + RubikTwoPhase (tables de pruning chargées/générées UNE fois),
+#     au lieu de payer l’import/chargement dans chaque process (text_gui, Ecran…).
+#
+#  Protocole (socket Unix, 1 requête JSON par ligne, 1 réponse JSON par ligne) :
+#     -> {"op": "ping"}
+#     <- {"ok": true, "methods": ["kociemba", "k2"], "pid": 1234, "uptime_s": 12.3}
+#     -> {"op": "solve", "cube": "<54 URFDLB>", "method": "kociemba"|"k2"}
+#     <- {"ok": true, "solution": "R U R' ...", "solve_ms": 3.1}   (Singmaster, k2 compris)
+#     <- {"ok": false, "error": "...", "type": "ValueError"|"ImportError"|...}
+#
+#  Entrées principales :
+#     - serve(socket_path=None, methods=("kociemba", "k2"))    : boucle serveur (bloquante)
+#     - daemon_request(payload, socket_path=None, timeout=None) -> dict
+#     - daemon_solve(cube_state, method="kociemba", ...)        -> str
+#         Lève SolverDaemonUnavailable si le daemon est absent / muet (timeout) ou
+#         si la méthode n’y est pas chargée -> l’appelant bascule en local.
+#     - daemon_available(socket_path=None) -> bool
+#
+#  Exécution directe :
+#     python solver_daemon.py            (service rbx-solver.service, cf. INSTALLER.sh)
+#     python solver_daemon.py --ping
+#
+#  Config (config.json -> solver.daemon) :
+#     enabled (bool), socket (chemin), timeout_s (float)
+#
+#  Notes :
+#     - Les appels solveur sont sérialisés (verrou) : twophase n’est pas prévu
+#       pour du multi-thread, et le Pi n’a de toute façon qu’un solve à la fois.
+#     - Socket en 0o666 : app (root) et écran (utilisateur) partagent le daemon.
+# ============================================================================
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_SOCKET = "/tmp/rbx_solver.sock"
+DEFAULT_TIMEOUT_S = 10.0
+SOLVED = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+_MAX_LINE = 4096
+
+
+class SolverDaemonUnavailable(RuntimeError):
+    """Daemon injoignable / timeout / méthode non chargée : fallback local."""
+
+
+def _daemon_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.daemon.{key}", default)
+    except Exception:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Côté serveur
+# ---------------------------------------------------------------------------
+class _Solvers:
+    """Solveurs importés et préchauffés une fois pour toutes."""
+
+    def __init__(self, methods=("kociemba", "k2")):
+        self.funcs: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.t0 = time.time()
+
+        if "kociemba" in methods:
+            try:
+                import kociemba
+                kociemba.solve(SOLVED)
+                self.funcs["kociemba"] = kociemba.solve
+                print("✅ kociemba prêt")
+            except Exception as e:
+                print(f"⚠️ kociemba indisponible: {e}")
+
+        if "k2" in methods:
+            try:
+                t = time.perf_counter()
+                import twophase.solver as sv     # charge / génère les tables
+                from solver_wrapper import twophase_to_singmaster
+                sv.solve(SOLVED, 21, 5.0)
+                # même sortie que le solve local : Singmaster, "Error: ..." -> RuntimeError
+                self.funcs["k2"] = lambda cube: twophase_to_singmaster(sv.solve(cube, 21, 5.0))
+                print(f"✅ twophase prêt ({time.perf_counter() - t:.1f}s)")
+            except Exception as e:
+                print(f"⚠️ twophase indisponible: {e}")
+
+    def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op")
+        if op == "ping":
+            return {"ok": True, "methods": sorted(self.funcs), "pid": os.getpid(),
+                    "uptime_s": round(time.time() - self.t0, 1)}
+        if op != "solve":
+            return {"ok": False, "error": f"op inconnue: {op!r}", "type": "ValueError"}
+
+        method = req.get("method", "kociemba")
+        fn = self.funcs.get(method)
+        if fn is None:
+            return {"ok": False, "error": f"méthode '{method}' non chargée", "type": "ImportError"}
+
+        t = time.perf_counter()
+        with self.lock:
+            solution = fn(str(req.get("cube", "")))
+        return {"ok": True, "solution": solution, "solve_ms": round((time.perf_counter() - t) * 1e3, 2)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            if len(raw) > _MAX_LINE:
+                resp = {"ok": False, "error": "requête trop longue", "type": "ValueError"}
+            else:
+                try:
+                    resp = self.server.solvers.handle(json.loads(raw))
+                except Exception as e:
+                    resp = {"ok": False, "error": str(e), "type": type(e).__name__}
+            self.wfile.write((json.dumps(resp) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: Optional[str] = None, methods=("kociemba", "k2")) -> None:
+    """Charge les solveurs puis sert les requêtes jusqu’à SIGINT/SIGTERM."""
+    path = socket_path or _daemon_cfg("socket", DEFAULT_SOCKET)
+    solvers = _Solvers(methods)
+
+    if os.path.exists(path):
+        os.unlink(path)                  # socket orpheline d’un run précédent
+    server = _Server(path, _Handler)
+    server.solvers = solvers
+    os.chmod(path, 0o666)
+    print(f"🧩 Solver daemon prêt sur {path} (méthodes: {', '.join(sorted(solvers.funcs)) or 'aucune'})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Côté client
+# ---------------------------------------------------------------------------
+def daemon_request(payload: Dict[str, Any], socket_path: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Une requête / une réponse. Lève SolverDaemonUnavailable si daemon absent ou muet."""
+    path = socket_path or _daemon_cfg("socket", DEFAULT_SOCKET)
+    tmo = float(timeout if timeout is not None else _daemon_cfg("timeout_s", DEFAULT_TIMEOUT_S))
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(tmo)
+            s.connect(path)
+            s.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            buf = b""
+            while not buf.endswith(b"\n"):
+                chunk = s.recv(4096)
+                if not chunk:
+                    break
+                buf += chunk
+    except (OSError, socket.timeout) as e:
+        raise SolverDaemonUnavailable(f"solver daemon ({path}): {e}") from e
+
+    if not buf:
+        raise SolverDaemonUnavailable(f"solver daemon ({path}): réponse vide")
+    return json.loads(buf)
+
+
+def daemon_solve(cube_state: str, method: str = "kociemba", socket_path: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+    resp = daemon_request({"op": "solve", "cube": cube_state, "method": method}, socket_path, timeout)
+    if resp.get("ok"):
+        return resp["solution"]
+    if resp.get("type") == "ImportError":
+        raise SolverDaemonUnavailable(resp.get("error", "méthode indisponible"))
+    raise RuntimeError(f"solver daemon: {resp.get('type')}: {resp.get('error')}")
+
+
+def daemon_available(socket_path: Optional[str] = None) -> bool:
+    try:
+        return bool(daemon_request({"op": "ping"}, socket_path, timeout=0.5).get("ok"))
+    except SolverDaemonUnavailable:
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--ping" in sys.argv:
+        try:
+            print(daemon_request({"op": "ping"}, timeout=1.0))
+        except SolverDaemonUnavailable as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        serve()
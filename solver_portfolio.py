@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  solver_portfolio.py
+#  -------------------
+#  Objectif :
+#     Mode "portfolio" : lancer EN PARALLÈLE plusieurs solveurs / réglages
+#     (kociemba, twophase avec différents max_length / timeouts) dans un pool de
+#     process, compiler chaque solution en mouvements robot
+#     (robot_moves_cubotino.compile_robot_moves) et garder celle qui minimise le
+#     **temps total prédit** = instant où la solution est disponible (temps réel
+#     écoulé depuis le départ de la course) + temps servo estimé.
+#     La course s’arrête dès qu’aucune entrée encore en cours ne peut battre la
+#     meilleure : écoulé + borne basse du temps servo >= meilleur total.
+#
+#     Une solution plus courte en quarts de tour n’implique pas moins de flips
+#     robot : c’est le temps servo qui domine le cycle, pas la recherche.
+#
+#  Entrées principales :
+#     - solve_portfolio(cube, deadline_s=None, entries=None, start_mode="UFR",
+#                       stop_flag=None) -> PortfolioResult
+#         best (PortfolioCandidate) + tous les candidats (erreurs/timeouts inclus) ;
+#         start_mode = orientation de départ de l’EXÉCUTION ("LUB" sur le robot),
+#         le plan robot (donc le temps servo) en dépend ; stop_flag (threading.Event)
+#         levé -> course arrêtée, workers encore en recherche tués
+#     - warm_portfolio_pool() : démarre les workers (non bloquant), à appeler au boot
+#     - solver_wrapper.solve_cube(cube, method="portfolio") délègue ici.
+#
+#  Config (config.json -> solver.portfolio) :
+#     deadline_s   : délai max d’attente des candidats (les retardataires sont ignorés)
+#     max_workers  : taille du pool (0 = une par entrée)
+#     entries      : [{"method": "kociemba"}, {"method": "k2", "max_length": 20, "timeout": 0.5}, ...]
+#     move_time_s  : null -> temps servo du modèle servo_timing (défaut) ;
+#                    {"F": .., "S": .., "R": ..} -> coût moyen par commande robot
+#
+#  Notes :
+#     - Borne basse servo : chaque mouvement Singmaster coûte au moins une rotation R
+#       (la moins chère du modèle) ; longueur >= 1, ou > portée de la table shallow
+#       quand le cube n’y est pas.
+#     - Pool "spawn" : les workers ne héritent ni de la connexion pigpio ni de la
+#       caméra du process robot ; pool gardé entre deux résolutions (tables twophase
+#       chargées une fois par worker).
+#     - Un worker par entrée en cours, chacun avec son Pipe : une entrée abandonnée
+#       (élaguée, deadline, stop_flag) est tuée (terminate) au lieu de continuer à
+#       occuper un cœur pendant l’exécution robot ; le pool la remplace par un
+#       process neuf (tables rechargées à sa première recherche).
+#     - La compilation robot est faite dans le process appelant (Cubotino est léger,
+#       et l’importer dans un worker ouvrirait une connexion pigpio).
+# ============================================================================
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional
+
+DEFAULT_ENTRIES = [
+    {"method": "kociemba"},
+    {"method": "k2", "max_length": 20, "timeout": 0.5},
+    {"method": "k2", "max_length": 19, "timeout": 2.0},
+    {"method": "k2", "max_length": 18, "timeout": 4.0},
+]
+DEFAULT_DEADLINE_S = 5.0
+STOP_POLL_S = 0.05             # période de lecture de stop_flag pendant la course
+
+
+@dataclass
+class PortfolioCandidate:
+    name: str
+    method: str
+    solution: Optional[str] = None
+    search_s: Optional[float] = None     # durée de recherche dans le worker
+    ready_s: Optional[float] = None      # disponible côté appelant (s depuis le départ)
+    robot_moves: Optional[str] = None
+    robot_n: Optional[int] = None
+    servo_s: Optional[float] = None
+    total_s: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class PortfolioResult:
+    best: Optional[PortfolioCandidate]
+    candidates: List[PortfolioCandidate] = field(default_factory=list)
+    wall_s: float = 0.0
+
+    @property
+    def solution(self) -> str:
+        if self.best is None:
+            raise RuntimeError("portfolio: aucune solution dans le délai")
+        return self.best.solution
+
+
+def _portfolio_cfg(key: str, default):
+    try:
+        from config_manager import get_config
+        return get_config().get(f"solver.portfolio.{key}", default)
+    except Exception:
+        return default
+
+
+def _entry_name(e: Dict[str, Any]) -> str:
+    if e.get("method") == "k2":
+        return f"k2(len<={e.get('max_length', 21)},t={e.get('timeout', 5.0)}s)"
+    return str(e.get("method"))
+
+
+# ---------------------------------------------------------------------------
+# Worker (process séparé)
+# ---------------------------------------------------------------------------
+def _solve_entry(cube: str, entry: Dict[str, Any]):
+    """Exécuté dans un worker : (solution, search_s)."""
+    from solver_wrapper import solve_with_kociemba, solve_with_kociemba_2_state
+
+    t0 = time.perf_counter()
+    if entry.get("method") == "k2":
+        sol = solve_with_kociemba_2_state(cube, max_length=int(entry.get("max_length", 21)),
+                                          timeout=float(entry.get("timeout", 5.0)))
+    elif entry.get("method") == "kociemba":
+        sol = solve_with_kociemba(cube)
+    else:
+        raise ValueError(f"méthode portfolio inconnue: {entry.get('method')!r}")
+    return sol, time.perf_counter() - t0
+
+
+def _worker_loop(conn) -> None:
+    """Boucle d’un worker : (cube, entry) -> ("ok", solution, search_s) | ("error", msg)."""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        cube, entry = task
+        try:
+            conn.send(("ok",) + _solve_entry(cube, entry))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _EntryWorker:
+    """Process worker persistant, une entrée à la fois ; kill() libère son cœur."""
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_loop, args=(child,), name="portfolio-worker", daemon=True)
+        self.proc.start()
+        child.close()
+
+    def submit(self, cube: str, entry: Dict[str, Any]) -> None:
+        self.conn.send((cube, entry))
+
+    def kill(self) -> None:
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.proc.join(timeout=1.0)
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.proc.join(timeout=1.0)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.conn.close()
+
+
+class _WorkerPool:
+    """Workers inactifs prêts à l’emploi ; une course les emprunte puis les rend (ou les tue)."""
+
+    def __init__(self, size: int):
+        self.size = max(1, int(size))
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: List[_EntryWorker] = []
+        self._lock = threading.Lock()
+
+    def fill(self) -> None:
+        """Complète les inactifs jusqu’à size (spawn non bloquant)."""
+        with self._lock:
+            while len(self._idle) < self.size:
+                self._idle.append(_EntryWorker(self._ctx))
+
+    def acquire(self) -> _EntryWorker:
+        with self._lock:
+            while self._idle:
+                w = self._idle.pop()
+                if w.proc.is_alive():
+                    return w
+                w.kill()
+        return _EntryWorker(self._ctx)      # course concurrente / worker mort : un de plus
+
+    def release(self, w: _EntryWorker) -> None:
+        with self._lock:
+            if w.proc.is_alive() and len(self._idle) < self.size:
+                self._idle.append(w)
+                return
+        w.close()
+
+    def discard(self, w: _EntryWorker) -> None:
+        """Worker tué en pleine recherche : remplacé par un process neuf."""
+        w.kill()
+        self.fill()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for w in idle:
+            w.close()
+
+
+_POOL: Optional[_WorkerPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> _WorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            n = int(_portfolio_cfg("max_workers", 0)) or len(_portfolio_cfg("entries", DEFAULT_ENTRIES))
+            _POOL = _WorkerPool(n)
+        return _POOL
+
+
+def warm_portfolio_pool() -> None:
+    """Démarre les workers en tâche de fond (le spawn coûte ~0.3 s / worker sur Pi)."""
+    _get_pool().fill()
+
+
+def shutdown_portfolio_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown()
+            _POOL = None
+
+
+# ---------------------------------------------------------------------------
+# Course + scoring temps robot
+# ---------------------------------------------------------------------------
+def _score(c: PortfolioCandidate, move_time_s, start_mode: str = "UFR") -> None:
+    from robot_moves_cubotino import compile_robot_moves, estimate_robot_seconds
+
+    if not c.solution or not c.solution.strip() or c.solution.lstrip().startswith("Error"):
+        c.error = c.error or f"solution invalide: {c.solution!r}"
+        return
+    try:
+        c.robot_moves, c.robot_n = compile_robot_moves(c.solution, start_mode=start_mode,
+                                                        use_cache=False)
+    except Exception as e:
+        c.error = f"compilation robot: {e}"
+        return
+    c.servo_s = estimate_robot_seconds(c.robot_moves, move_time_s)
+    c.total_s = (c.search_s if c.ready_s is None else c.ready_s) + c.servo_s
+
+
+def _servo_lower_bound(cube: str, move_time_s) -> float:
+    """Temps servo minimal de n’importe quelle solution du cube (rotations R seules)."""
+    from robot_moves_cubotino import DEFAULT_MOVE_TIME_S
+    from servo_timing import get_servo_model
+    from shallow_table import _shallow_cfg, get_shallow_table, shallow_solve
+
+    if move_time_s:
+        r_min = float(dict(DEFAULT_MOVE_TIME_S, **move_time_s).get("R", 0.0))
+    else:
+        r_min = get_servo_model().min_command_seconds("R")
+    n_min = 1
+    table = get_shallow_table()
+    if table is not None and shallow_solve(cube) is None:
+        n_min = table.depth + int(_shallow_cfg("extra_depth", 1)) + 1
+    return n_min * r_min
+
+
+def solve_portfolio(cube: str, deadline_s: Optional[float] = None,
+                    entries: Optional[List[Dict[str, Any]]] = None,
+                    start_mode: str = "UFR", stop_flag=None) -> PortfolioResult:
+    """
+    Course des solveurs ; meilleur temps prédit (disponibilité réelle + servo).
+    Les candidats sont scorés à l’arrivée ; la course s’arrête à la deadline, dès
+    qu’aucune entrée en cours ne peut plus battre le meilleur, ou sur stop_flag.
+    Les entrées encore en recherche à l’arrêt sont tuées.
+    :param start_mode: orientation de départ de l’exécution (compile_robot_moves), "LUB" sur le robot
+    :param stop_flag: threading.Event (E-STOP, abandon par solver_async)
+    """
+    entries = entries or _portfolio_cfg("entries", DEFAULT_ENTRIES)
+    deadline = float(deadline_s if deadline_s is not None else _portfolio_cfg("deadline_s", DEFAULT_DEADLINE_S))
+    move_time_s = _portfolio_cfg("move_time_s", None)
+
+    t0 = time.perf_counter()
+    pool = _get_pool()
+    candidates = [PortfolioCandidate(name=_entry_name(e), method=str(e.get("method"))) for e in entries]
+    queued = list(range(len(entries)))
+    running: Dict[Any, tuple] = {}                 # conn -> (worker, index de l’entrée)
+    while queued and len(running) < pool.size:
+        i = queued.pop(0)
+        w = pool.acquire()
+        w.submit(cube, entries[i])
+        running[w.conn] = (w, i)
+
+    best: Optional[PortfolioCandidate] = None
+    servo_lb: Optional[float] = None
+    reason = f"deadline {deadline:.1f}s dépassée"
+
+    while running:
+        now = time.perf_counter() - t0
+        remaining = deadline - now
+        if stop_flag is not None:
+            if stop_flag.is_set():
+                reason = "arrêt demandé"
+                break
+            remaining = min(remaining, STOP_POLL_S)
+        if best is not None:
+            if servo_lb is None:
+                servo_lb = _servo_lower_bound(cube, move_time_s)
+            if now + servo_lb >= best.total_s:
+                reason = "abandonné : ne peut plus battre le meilleur"
+                break
+            remaining = min(remaining, best.total_s - servo_lb - now)
+        if now >= deadline:
+            break
+        ready = wait(list(running), timeout=max(0.0, remaining))
+        now = time.perf_counter() - t0
+        for conn in ready:
+            w, i = running.pop(conn)
+            c = candidates[i]
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError) as ex:
+                c.error = f"worker perdu: {type(ex).__name__}"
+                pool.discard(w)
+                continue
+            if msg[0] == "ok":
+                c.solution, c.search_s = msg[1], msg[2]
+                c.ready_s = now
+                _score(c, move_time_s, start_mode)
+            else:
+                c.error = msg[1]
+            if queued:                                 # entrée suivante sur ce worker
+                j = queued.pop(0)
+                w.submit(cube, entries[j])
+                running[w.conn] = (w, j)
+            else:
+                pool.release(w)
+            if c.total_s is not None and (best is None or (c.total_s, c.robot_n) < (best.total_s, best.robot_n)):
+                best = c
+
+    # Entrées abandonnées : workers tués (sinon ils occupent un cœur pendant l’exécution)
+    for w, i in running.values():
+        candidates[i].error = reason
+        pool.discard(w)
+    for i in queued:
+        candidates[i].error = reason
+    return PortfolioResult(best=best, candidates=candidates, wall_s=time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    import sys
+
+    cube = sys.argv[1] if len(sys.argv) > 1 else "DUUBULDBFRBFRRULLLBRDFFFBLURDBFDFDRFRULBLUFDURRBLBDUDL"
+    res = solve_portfolio(cube)
+    for c in sorted(res.candidates, key=lambda c: (c.total_s is None, c.total_s or 0)):
+        if c.error:
+            print(f"  ✗ {c.name:24s} {c.error}")
+        else:
+            print(f"  {'★' if c is res.best else ' '} {c.name:24s} recherche={c.search_s:.2f}s prêt={c.ready_s:.2f}s "
+                  f"robot={c.robot_n} mvts ~{c.servo_s:.1f}s -> total {c.total_s:.1f}s  [{c.solution}]")
+    print(f"(course {res.wall_s:.2f}s)")
+    shutdown_portfolio_pool()
@@ -15,19 +15,22 @@
 #          ou les erreurs sur les systèmes où le module n’est pas installé.
 #
 #  Entrées principales (API) :
-#     - solve_cube(cube_state: str, method: str = "kociemba") -> str
+#     - solve_cube(cube_state: str, method: str = "kociemba", use_daemon=None,
+#                  use_cache=None) -> str
 #         Fonction générique :
 #           * method="kociemba" -> solve_with_kociemba()
 #           * method="k2"       -> solve_with_kociemba_2_state()
+#           * method="portfolio"-> solver_portfolio.solve_portfolio() (meilleur temps robot)
 #         Retour : solution en notation Singmaster (ex: "R U R' U' ...").
 #
 #  Fonctions internes :
 #     - solve_with_kociemba(cube_state: str) -> str
 #         Appelle kociemba.solve(cube_state) (lève ImportError si kociemba absent).
 #
-#     - solve_with_kociemba_2_state(cube_state: str) -> str
+#     - solve_with_kociemba_2_state(cube_state: str, max_length=None, timeout=None) -> str
 #         Import dynamique : twophase.solver as sv
-#         Appel : sv.solve(cube_state, 21, 5.0)  (max depth 21, timeout 5s)
+#         Appel : sv.solve(cube_state, 21, 5.0)  (max depth 21, timeout 5s par défaut)
+#         Sortie normalisée en Singmaster (twophase_to_singmaster : "R3" -> "R'", "(20f)" retiré).
 #         Lève ImportError avec message clair si RubikTwoPhase non installé.
 #
 #  Exécution directe (__main__) :
@@ -36,8 +39,22 @@
 #         * tente ensuite la résolution via Two-Phase (si installé)
 #
 #  Notes :
-#     - Ce module ne fait aucune validation avancée du cubestring : il suppose que
-#       l’appelant fournit une chaîne valide (54 chars, URFDLB, comptages corrects).
+#     - solve_cube vérifie d’abord la solubilité (cube_validator.assert_solvable :
+#       coins/arêtes, orientations, parité) en quelques µs, et lève UnsolvableCube
+#       (ValueError) au lieu de laisser le solveur échouer / tourner jusqu’au timeout.
+#     - Daemon chaud (solver_daemon.py, config solver.daemon.enabled) : solve_cube
+#       lui envoie la requête (timeout) et retombe sur la résolution locale si le
+#       daemon est absent, muet ou sans la méthode demandée.
+#     - Cache de solutions (solution_cache.py, config solver.cache.enabled) : LRU
+#       mémoire puis sqlite, clé (cubestring, method, SOLVER_PARAMS[method]) ; une
+#       recherche n’a lieu qu’en cas de miss, et son résultat est stocké.
+#       Avec solver.cache.canonical, la clé est la forme canonique (cube_symmetry :
+#       48 symétries + recoloriage) et la solution est transformée à l’aller/retour.
+#     - Table de distances (shallow_table.py, config solver.shallow) : un cube à
+#       <= depth (+ extra_depth) mouvements de l’état résolu reçoit une solution
+#       optimale en quelques dizaines de µs, sans solveur ni cache.
+#     - Version non bloquante / annulable (E-STOP) : solver_async.solve_cube_async,
+#       qui partage le même cache (_cache_context / cached_solution / store_solution).
 #     - L’import lazy de RubikTwoPhase est volontaire pour garder le pipeline rapide
 #       et portable.
 # ============================================================================
@@ -48,6 +65,27 @@ try:
 except ImportError:
     kociemba = None
 
+import time
+from typing import Optional
+
+from cube_symmetry import canonicalize, map_solution, solution_from_canonical
+from cube_validator import assert_solvable
+from shallow_table import shallow_solve
+import solution_cache
+from solver_daemon import SolverDaemonUnavailable, daemon_solve
+
+K2_MAX_DEPTH = 21
+K2_TIMEOUT_S = 5.0
+
+DAEMON_RETRY_S = 30.0
+_daemon_retry_at = 0.0
+
+# Paramètres solveur qui font partie de la clé du cache de solutions
+SOLVER_PARAMS = {
+    "kociemba": "",
+    "k2": f"depth={K2_MAX_DEPTH},timeout={K2_TIMEOUT_S}",
+}
+
 
 # ---------------------------------------------------------------------------
 # Fonction solve_with_kociemba
@@ -66,11 +104,13 @@ def solve_with_kociemba(cube_state: str) -> str:
 # ---------------------------------------------------------------------------
 # Fonction solve_with_kociemba_2_state
 # ---------------------------------------------------------------------------
-def solve_with_kociemba_2_state(cube_state: str) -> str:
+def solve_with_kociemba_2_state(cube_state: str, max_length: int = None, timeout: float = None) -> str:
     """
     Résout le cube avec la variante Kociemba Two-Phase (RubikTwoPhase).
     ⚠️  Le module n'est pas importé automatiquement au démarrage,
        il est chargé dynamiquement ici, uniquement si nécessaire.
+    :param max_length: arrêt dès qu’une solution de longueur <= max_length est trouvée
+    :param timeout: temps max de recherche (s) ; meilleure solution trouvée sinon
     """
     try:
         import twophase.solver as sv
@@ -81,20 +121,56 @@ def solve_with_kociemba_2_state(cube_state: str) -> str:
             "Installe-le avec 'pip install RubikTwoPhase' si tu veux l’utiliser."
         )
 
-    # Paramètres : profondeur maximale = 21, timeout = 5 secondes
-    return sv.solve(cube_state, 21, 5.0)
+    # Paramètres par défaut : profondeur maximale = 21, timeout = 5 secondes
+    raw = sv.solve(cube_state,
+                   K2_MAX_DEPTH if max_length is None else max_length,
+                   K2_TIMEOUT_S if timeout is None else timeout)
+    return twophase_to_singmaster(raw)
+
+
+def twophase_to_singmaster(raw: str) -> str:
+    """
+    Sortie twophase ("R1 U3 F2 (3f)") -> Singmaster ("R U' F2").
+    Lève RuntimeError si twophase renvoie un message d’erreur ("Error: ...").
+    """
+    raw = (raw or "").strip()
+    if raw.startswith("Error"):
+        raise RuntimeError(f"twophase: {raw}")
+    out = []
+    for tok in raw.split():
+        if tok.startswith("("):
+            continue                    # "(20f)" : longueur annoncée
+        face, n = tok[0], tok[1:]
+        out.append(face + {"1": "", "2": "2", "3": "'"}.get(n, n))
+    return " ".join(out)
 
 
 # ---------------------------------------------------------------------------
 # Fonction solve_cube
 # ---------------------------------------------------------------------------
-def solve_cube(cube_state: str, method: str = "kociemba") -> str:
-    """
-    Fonction générique qui choisit quel solveur utiliser.
-    :param cube_state: état du cube en string (URFDLB)
-    :param method: 'kociemba' (par défaut) ou 'k2' (Two-Phase)
-    :return: solution en notation Singmaster
-    """
+def _use_daemon_default() -> bool:
+    try:
+        from config_manager import get_config
+        return bool(get_config().get("solver.daemon.enabled", False))
+    except Exception:
+        return False
+
+
+def _solve_search(cube_state: str, method: str, use_daemon: Optional[bool]) -> str:
+    """Recherche effective : daemon chaud si activé, sinon (ou en secours) en local."""
+    if use_daemon is None:
+        use_daemon = _use_daemon_default()
+    global _daemon_retry_at
+    if use_daemon and method in ("kociemba", "k2") and time.monotonic() >= _daemon_retry_at:
+        try:
+            solution = daemon_solve(cube_state, method=method)
+            # daemon d’une version antérieure : sortie twophase brute ("R1 U3 (2f)")
+            return twophase_to_singmaster(solution) if method == "k2" else solution
+        except SolverDaemonUnavailable as e:
+            # daemon absent : on ne retente pas à chaque appel (prewarm, rafales)
+            _daemon_retry_at = time.monotonic() + DAEMON_RETRY_S
+            print(f"⚠️ {e} -> résolution locale")
+
     if method == "kociemba":
         return solve_with_kociemba(cube_state)
     elif method == "k2":
@@ -103,6 +179,99 @@ def solve_cube(cube_state: str, method: str = "kociemba") -> str:
         raise ValueError(f"Solveur '{method}' non supporté pour le moment.")
 
 
+def solve_cube(cube_state: str, method: str = "kociemba", validate: bool = True,
+               use_daemon: Optional[bool] = None, use_cache: Optional[bool] = None,
+               cache=None, canonical: Optional[bool] = None,
+               use_shallow: bool = True, start_mode: str = "UFR") -> str:
+    """
+    Fonction générique qui choisit quel solveur utiliser.
+    :param cube_state: état du cube en string (URFDLB)
+    :param method: 'kociemba' (par défaut), 'k2' (Two-Phase) ou 'portfolio' (course parallèle)
+    :param validate: contrôle de solubilité cubies avant appel (UnsolvableCube)
+    :param use_daemon: passer par le daemon chaud (défaut : config solver.daemon.enabled)
+    :param use_cache: cache LRU + sqlite (défaut : config solver.cache.enabled)
+    :param cache: SolutionCache explicite (défaut : singleton process)
+    :param canonical: clé de cache canonique (défaut : config solver.cache.canonical) ;
+                      False quand la solution exacte de CE repère compte (re-expression)
+    :param use_shallow: table de distances (shallow_table, si config solver.shallow.enabled
+                        et fichier présent) avant tout solveur
+    :param start_mode: orientation de départ de l’exécution robot ; sert au score
+                       servo du portfolio ("LUB" pour le pipeline robot)
+    :return: solution en notation Singmaster
+    """
+    if validate:
+        assert_solvable(cube_state)
+
+    # Cube peu mélangé : solution optimale directe depuis la table de distances
+    if use_shallow:
+        sol = shallow_solve(cube_state)
+        if sol is not None:
+            return sol
+
+    if method == "portfolio":
+        # course parallèle kociemba / twophase, score = recherche + temps servo estimé
+        from solver_portfolio import solve_portfolio
+        return solve_portfolio(cube_state, start_mode=start_mode).solution
+
+    if method not in SOLVER_PARAMS:
+        raise ValueError(f"Solveur '{method}' non supporté pour le moment.")
+
+    ctx = _cache_context(cube_state, method, use_cache, cache, canonical)
+    if ctx is None:
+        return _solve_search(cube_state, method, use_daemon)
+
+    hit = cached_solution(ctx)
+    if hit is not None:
+        return hit
+
+    t0 = time.perf_counter()
+    solution = _solve_search(cube_state, method, use_daemon)
+    store_solution(ctx, solution, solve_ms=(time.perf_counter() - t0) * 1e3)
+    return solution
+
+
+# ---------------------------------------------------------------------------
+# Cache de solutions (partagé avec solver_async)
+# ---------------------------------------------------------------------------
+def _cache_context(cube_state: str, method: str, use_cache: Optional[bool] = None,
+                   cache=None, canonical: Optional[bool] = None):
+    """(cache, clé, symétrie, params) si le cache s’applique à cette requête, sinon None."""
+    if method not in SOLVER_PARAMS:
+        return None
+    if use_cache is None:
+        use_cache = cache is not None or solution_cache.cache_enabled()
+    if not use_cache:
+        return None
+    if cache is None:
+        cache = solution_cache.get_solution_cache()
+
+    # Clé canonique (48 symétries + recoloriage) : même problème vu autrement -> même entrée
+    if canonical is None:
+        canonical = solution_cache.canonical_keys()
+    if canonical:
+        key, sym = canonicalize(cube_state)
+    else:
+        key, sym = cube_state, 0
+    return cache, key, sym, method, SOLVER_PARAMS[method]
+
+
+def cached_solution(ctx) -> Optional[str]:
+    """Solution en cache (ramenée au repère du cube), None si miss."""
+    cache, key, sym, method, params = ctx
+    hit = cache.get(key, method, params)
+    if hit is None:
+        return None
+    return solution_from_canonical(hit["solution"], sym) if sym else hit["solution"]
+
+
+def store_solution(ctx, solution: str, solve_ms: Optional[float] = None) -> None:
+    cache, key, sym, method, params = ctx
+    stored = map_solution(solution, sym) if sym else solution
+    cache.put(key, method, params, stored,
+              solve_ms=None if solve_ms is None else round(solve_ms, 2),
+              robot_moves=solution_cache.robot_move_count(stored))
+
+
 # ---------------------------------------------------------------------------
 # Mode exécution directe (debug manuel)
 # ---------------------------------------------------------------------------
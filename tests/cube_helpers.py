@@ -0,0 +1,35 @@
+# tests/cube_helpers.py
+# Helpers partagés par les tests pytest (importés après l’ajout du dépôt au sys.path)
+import random
+
+from cube_state import MOVE_PERMS, SOLVED, CubeState
+
+MOVES = sorted(MOVE_PERMS)
+_INVERSE = {"": "'", "'": "", "2": "2"}
+
+
+def inverse(moves):
+    """Séquence inverse (liste de mouvements Singmaster)."""
+    return [m[0] + _INVERSE[m[1:]] for m in reversed(moves)]
+
+
+def apply(moves) -> str:
+    """Facelets URFDLB du cube résolu après la séquence."""
+    return CubeState.from_string(SOLVED).apply_moves(list(moves)).to_string()
+
+
+def scramble(seed: int, n: int = 20):
+    """(cube, mouvements) : mélange aléatoire reproductible de n mouvements."""
+    rng = random.Random(seed)
+    moves = [rng.choice(MOVES) for _ in range(n)]
+    return apply(moves), moves
+
+
+def solves(cube: str, solution: str) -> bool:
+    return CubeState.from_string(cube).apply_moves(solution.split()).is_solved()
+
+
+def scrambled(seed: int, n: int = 20):
+    """(cube, solution Singmaster qui le résout) : inverse du mélange."""
+    cube, moves = scramble(seed, n)
+    return cube, " ".join(inverse(moves))
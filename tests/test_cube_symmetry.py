@@ -0,0 +1,46 @@
+# tests/test_cube_symmetry.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from cube_helpers import inverse, scramble, solves
+from cube_state import SYMMETRIES
+from cube_symmetry import (canonical_key, canonicalize, conjugate, map_solution,
+                           solution_from_canonical)
+
+
+@pytest.mark.parametrize("k", range(len(SYMMETRIES)))
+def test_solution_round_trip(k):
+    cube, moves = scramble(k)
+    solution = " ".join(inverse(moves))
+    assert solves(cube, solution)
+    # g(M) résout conj_g(cube), et g^-1(g(M)) redonne M
+    mapped = map_solution(solution, k)
+    assert solves(conjugate(cube, k), mapped)
+    assert solution_from_canonical(mapped, k) == solution
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_canonical_form_is_invariant(seed):
+    cube, _ = scramble(seed)
+    key = canonical_key(cube)
+    for k in range(len(SYMMETRIES)):
+        assert canonical_key(conjugate(cube, k)) == key
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_canonical_solution_maps_back(seed):
+    cube, moves = scramble(seed)
+    canon, k = canonicalize(cube)
+    assert canon == conjugate(cube, k)
+    # solution trouvée sur la forme canonique -> repère d’origine
+    canon_solution = map_solution(" ".join(inverse(moves)), k)
+    assert solves(canon, canon_solution)
+    assert solves(cube, solution_from_canonical(canon_solution, k))
+
+
+def test_twophase_format_preserved():
+    assert map_solution("R1 U3 F2 (3f)", 0) == "R1 U3 F2 (3f)"
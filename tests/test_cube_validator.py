@@ -0,0 +1,75 @@
+# tests/test_cube_validator.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from cube_helpers import scramble
+from cube_state import SOLVED
+from cube_validator import UnsolvableCube, assert_solvable, check_solvable
+
+# Facelets URFDLB : U9=8, R1=9, F3=20 (coin URF) ; U6=5, R2=10 (arête UR) ; U8=7, F2=19 (arête UF)
+URF_CORNER = (8, 9, 20)
+UR_EDGE = (5, 10)
+UF_EDGE = (7, 19)
+
+
+def _edit(cube: str, mapping) -> str:
+    s = list(cube)
+    for dst, src in mapping.items():
+        s[dst] = cube[src]
+    return "".join(s)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scrambles_are_solvable(seed):
+    rep = check_solvable(scramble(seed, 25)[0])
+    assert rep.ok and rep.code == "OK"
+
+
+def test_solved_is_solvable():
+    assert check_solvable(SOLVED).ok
+
+
+def test_corner_twist():
+    a, b, c = URF_CORNER
+    rep = check_solvable(_edit(SOLVED, {a: b, b: c, c: a}))
+    assert not rep.ok
+    assert rep.code == "CORNER_TWIST"
+
+
+def test_edge_flip():
+    a, b = UR_EDGE
+    rep = check_solvable(_edit(SOLVED, {a: b, b: a}))
+    assert not rep.ok
+    assert rep.code == "EDGE_FLIP"
+
+
+def test_parity_two_edges_swapped():
+    (ua, ra), (ub, fb) = UR_EDGE, UF_EDGE
+    rep = check_solvable(_edit(SOLVED, {ua: ub, ra: fb, ub: ua, fb: ra}))
+    assert not rep.ok
+    assert rep.code == "PARITY"
+    assert rep.suspect_faces
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_defects_detected_on_scrambled_cube(seed):
+    cube = scramble(seed, 25)[0]
+    a, b, c = URF_CORNER
+    assert check_solvable(_edit(cube, {a: b, b: c, c: a})).code == "CORNER_TWIST"
+    a, b = UR_EDGE
+    assert check_solvable(_edit(cube, {a: b, b: a})).code == "EDGE_FLIP"
+
+
+def test_assert_solvable_raises_with_report():
+    a, b = UR_EDGE
+    with pytest.raises(UnsolvableCube) as exc:
+        assert_solvable(_edit(SOLVED, {a: b, b: a}))
+    assert exc.value.report.code == "EDGE_FLIP"
+
+
+def test_bad_length():
+    assert check_solvable(SOLVED[:-1]).code == "BAD_LENGTH"
@@ -0,0 +1,28 @@
+# tests/test_robot_move_compiler.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+import Cubotino_T_moves
+from cube_helpers import scrambled
+from move_seq import MoveSeq
+from robot_move_compiler import compile_moves, robot_required_moves
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("simulation", [True, False])
+def test_compiler_matches_cubotino(seed, simulation):
+    _cube, solution = scrambled(seed)
+    compact = MoveSeq.from_singmaster(solution).to_compact()
+    ref_robot, ref_moves, ref_tot, ref_opt = Cubotino_T_moves.robot_required_moves(compact, "", simulation)
+    robot, moves, tot, opt = robot_required_moves(compact, "", simulation)
+    assert (moves, tot, opt) == (ref_moves, ref_tot, ref_opt)
+    assert list(robot.values()) == list(ref_robot.values())
+    assert compile_moves(compact, simulation=simulation) == (ref_moves, ref_tot, ref_opt)
+
+
+def test_compiler_error_text():
+    assert robot_required_moves("", "Error", True) == ({}, "", 0, (0, 0))
@@ -0,0 +1,29 @@
+# tests/test_robot_move_planner.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from cube_helpers import scrambled
+from move_seq import MoveSeq
+from robot_move_compiler import compile_moves
+from robot_move_planner import plan_moves
+from robot_move_sim import verify_plan
+from servo_timing import get_servo_model
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("simulation,start_mode", [(True, "UFR"), (False, "LUB")])
+def test_planner_plan_verifies(seed, simulation, start_mode):
+    cube, solution = scrambled(seed)
+    seq = MoveSeq.from_singmaster(solution)
+    moves, _tot = plan_moves(seq, simulation=simulation)
+    res = verify_plan(moves, cube=cube, solution=seq, start_mode=start_mode)
+    assert res.ok and res.solved
+    assert res.holder == "mid"
+    # temps servo (modèle servo_timing) jamais supérieur au plan Cubotino
+    ref_moves, _ref_tot, _opt = compile_moves(seq, simulation=simulation)
+    model = get_servo_model()
+    assert model.sequence_seconds(moves) <= model.sequence_seconds(ref_moves) + 1e-9
@@ -0,0 +1,37 @@
+# tests/test_robot_move_sim.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from cube_helpers import scrambled
+from move_seq import MoveSeq
+from robot_move_compiler import compile_moves
+from robot_move_planner import plan_moves
+from robot_move_sim import PlanVerificationError, simulate, verify_plan
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("simulation,start_mode", [(True, "UFR"), (False, "LUB")])
+def test_compiled_plan_verifies(seed, simulation, start_mode):
+    cube, solution = scrambled(seed)
+    moves, _tot, _opt = compile_moves(MoveSeq.from_singmaster(solution).to_compact(), simulation=simulation)
+    res = verify_plan(moves, cube=cube, solution=solution, start_mode=start_mode)
+    assert res.ok and res.solved
+
+
+def test_verify_rejects_illegal_plan():
+    # R4 (-180°) n’est possible que depuis la droite
+    assert not simulate("R4").ok
+    with pytest.raises(PlanVerificationError):
+        verify_plan("R4")
+
+
+def test_verify_rejects_plan_for_other_solution():
+    cube, solution = scrambled(0)
+    _other_cube, other = scrambled(1)
+    moves, _tot = plan_moves(MoveSeq.from_singmaster(other))
+    with pytest.raises(PlanVerificationError):
+        verify_plan(moves, cube=cube, solution=solution)
@@ -0,0 +1,73 @@
+# tests/test_shallow_table.py
+import itertools
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from cube_helpers import MOVES, apply, solves
+from cube_state import SOLVED
+from shallow_table import ShallowTable, build_table
+
+DEPTH = 3
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = tmp_path_factory.mktemp("shallow") / "shallow_d3.bin"
+    n = build_table(DEPTH, path, verbose=False)
+    assert n > 1
+    t = ShallowTable(path)
+    yield t
+    t.close()
+
+
+def _distance_bfs(cube: str, max_depth: int) -> int:
+    """Distance HTM exacte par recherche brute (petites profondeurs)."""
+    for d in range(max_depth + 1):
+        for seq in itertools.product(MOVES, repeat=d):
+            if solves(cube, " ".join(seq)):
+                return d
+    return max_depth + 1
+
+
+def test_header(table):
+    assert table.depth == DEPTH
+    # états distincts à distance <= 3 en HTM : 1 + 18 + 243 + 3240
+    assert table.count == 1 + 18 + 243 + 3240
+
+
+def test_solved(table):
+    assert table.solve(SOLVED, extra_depth=0) == ""
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_in_table_solutions_are_optimal(table, seed):
+    rng = random.Random(seed)
+    cube = apply(rng.choice(MOVES) for _ in range(DEPTH))
+    sol = table.solve(cube, extra_depth=0)
+    assert sol is not None
+    assert solves(cube, sol)
+    assert len(sol.split()) == _distance_bfs(cube, DEPTH)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_extra_depth_reaches_one_more_level(table, seed):
+    rng = random.Random(100 + seed)
+    moves = []
+    while len(moves) < DEPTH + 1:                     # faces consécutives distinctes
+        m = rng.choice(MOVES)
+        if not moves or moves[-1][0] != m[0]:
+            moves.append(m)
+    cube = apply(moves)
+    sol = table.solve(cube, extra_depth=1)
+    assert sol is not None and solves(cube, sol)
+    assert len(sol.split()) <= DEPTH + 1
+
+
+def test_out_of_reach_returns_none(table):
+    cube = apply("R U F L D B R U F L".split())
+    assert table.solve(cube, extra_depth=0) is None
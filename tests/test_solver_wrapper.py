@@ -0,0 +1,34 @@
+# tests/test_solver_wrapper.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from solver_wrapper import twophase_to_singmaster
+
+
+def test_twophase_tokens():
+    assert twophase_to_singmaster("R1 U3 F2 D1 L3 B2 (6f)") == "R U' F2 D L' B2"
+
+
+def test_twophase_length_marker_only():
+    assert twophase_to_singmaster("(0f)") == ""
+    assert twophase_to_singmaster("") == ""
+
+
+def test_twophase_surrounding_spaces():
+    assert twophase_to_singmaster("  U1  R2 (2f)\n") == "U R2"
+
+
+def test_singmaster_input_is_unchanged():
+    # sortie déjà normalisée (daemon récent) : idempotent
+    sol = "R U' F2 D L' B2"
+    assert twophase_to_singmaster(sol) == sol
+    assert twophase_to_singmaster(twophase_to_singmaster("R3 U1 (2f)")) == "R' U"
+
+
+def test_twophase_error_raises():
+    with pytest.raises(RuntimeError):
+        twophase_to_singmaster("Error: Cube definition string contains 10 facelets U")
@@ -39,7 +39,7 @@
 #     - CAP U capturing 1/6
 #     - DET F ... 2/6
 #     - Conv OK: UFRDLB…   (aperçu cube_string)
-#     - EXE 12/42 R2 executing
+#     - EXE 12/42 R2 executing ~38s   (eta_s : temps restant prédit)
 #     - SOL 23: R U R' ...
 #     - ...FAILED: <msg | err>
 #
@@ -79,13 +79,15 @@ MAJOR_EVENTS = {
 
     # execute
     "execute_move", "execution_finished", "execution_stopped", "execution_failed",
+    "execution_refused",
 
     # generic
     "error",
 }
 
 FINAL_EVENTS = {"already_solved", "solving_completed", "solving_failed",
-                "conversion_failed", "execution_finished", "execution_failed", "execution_stopped"}
+                "conversion_failed", "execution_finished", "execution_failed", "execution_stopped",
+                "execution_refused"}
 
 def make_tft_listener(
     tft,
@@ -216,13 +218,18 @@ def make_tft_listener(
             tot = data.get("total", "")
             move = data.get("move", "")
             status = data.get("status", "")
+            eta = data.get("eta_s")
             msg = f"EXE {idx}/{tot} {move} {status}"
+            if isinstance(eta, (int, float)):
+                msg += f" ~{eta:.0f}s"
         elif event == "execution_finished":
             msg = data.get("msg") or "Execution done"
         elif event == "execution_stopped":
             msg = data.get("msg") or "Execution stopped"
         elif event == "execution_failed":
             msg = "EXE FAIL: " + _err_hint(data)
+        elif event == "execution_refused":
+            msg = "PLAN KO: " + _err_hint(data)
 
         # Generic
         elif event == "error":
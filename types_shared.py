@@ -22,6 +22,10 @@
 #           * cells  : liste [9] de Cell alignées (row-major, 3×3)
 #           * warped : image normalisée 300×300 (np.ndarray) ou None
 #           * roi    : ROI utilisée pour extraire la face
+#           * confidences : liste [9] de confiances 0..1 (ou None)
+#           * features    : vecteurs compacts (9×6 float32 : BGR médian + Lab moyen)
+#         Politique keep_pixels : drop_pixels() libère warped/cells après
+#         classification (production) ; labels/confidences/features restent.
 #
 #     - FacesDict :
 #         Dictionnaire {face_name → FaceResult}
@@ -53,7 +57,9 @@
 #   ├── colors : [ "red", "blue", ... ]   # 9 éléments
 #   ├── cells  : [ Cell × 9 ]             # 3×3 en row-major
 #   ├── warped : np.ndarray (300×300) ou None
-#   └── roi    : (x1, y1, x2, y2)
+#   ├── roi    : (x1, y1, x2, y2)
+#   ├── confidences : [ 0.93, ... ] ou None   # 9 éléments
+#   └── features    : np.ndarray (9×6) ou None
 #
 #   Cell (tuple)
 #   ├── (i, j) : indices dans la grille 3×3
@@ -75,5 +81,17 @@ class FaceResult:
     cells:  List[Cell]              # 9 cellules alignées (row-major)
     warped: Optional[Any]           # image 300x300 (np.ndarray) ou None
     roi:    ROI                     # ROI utilisée pour extraire la face
+    confidences: Optional[List[float]] = None  # 9 confiances 0..1 (row-major)
+    features:    Optional[Any] = None          # (9,6) float32 : B,G,R médians + L,a,b moyens
+
+    @property
+    def has_pixels(self) -> bool:
+        return self.warped is not None or bool(self.cells)
+
+    def drop_pixels(self) -> "FaceResult":
+        """Libère warped + cells (vues sur warped) ; garde labels/confidences/features."""
+        self.warped = None
+        self.cells = []
+        return self
 
 FacesDict = Dict[str, FaceResult]   # clés 'F','R','B','L','U','D'